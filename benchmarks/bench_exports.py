@@ -0,0 +1,57 @@
+"""Benchmarks for the manifest exports: JSON conversion, API bundle, roll narratives."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+
+
+from conftest import ROOT, load_script
+from manifest_loader import default_loader
+
+ROLL_GENERATOR = ROOT / "docs" / "manifest" / "narratives" / "rolls" / "generate_roll.py"
+ROLL_ID = "hosomaki.ollama"
+
+
+def test_export_manifest_json(benchmark, catalog, tmp_path):
+    module = load_script("export-manifest-json")
+    sources = sorted(module.discover_yaml_files(catalog.directory))
+    output_root = tmp_path / "json"
+
+    benchmark.extra_info["services"] = catalog.service_count
+    results = benchmark.pedantic(
+        module.convert_sources,
+        args=(sources, catalog.directory, output_root, False, 1),
+        setup=default_loader().clear_memory,
+        rounds=3,
+        warmup_rounds=1,
+    )
+    assert all(record is not None for record, _ in results)
+
+
+def test_api_bundle_generate(benchmark, catalog):
+    module = load_script("generate-api-bundle")
+
+    def setup():
+        default_loader().clear_memory()
+        return (module.APIBundleGenerator(catalog.directory),), {}
+
+    benchmark.extra_info["services"] = catalog.service_count
+    bundle = benchmark.pedantic(
+        lambda generator: generator.generate(), setup=setup, rounds=3, warmup_rounds=1
+    )
+    assert len(bundle["services"]) == catalog.service_count
+
+
+def test_roll_markdown(benchmark, catalog):
+    spec = importlib.util.spec_from_file_location("roll_generator", ROLL_GENERATOR)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    generator = module.RollTemplateGenerator(manifest_root=catalog.directory)
+    # Synthetic catalogs reuse the real menu, so only some services have a roll
+    rolls = [service_id for service_id in generator.services if service_id in generator.roll_catalog]
+    roll_id = ROLL_ID if ROLL_ID in rolls else rolls[0]
+    markdown = benchmark(generator.build_roll_markdown, roll_id)
+    assert roll_id in markdown
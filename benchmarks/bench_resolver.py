@@ -0,0 +1,82 @@
+"""Benchmarks for the manifest resolvers and the compose pipeline stages."""
+
+from __future__ import annotations
+
+import copy
+
+from conftest import load_script
+from generate_compose import ManifestResolver
+
+
+def _resolver(catalog, environment_template, network_profile) -> ManifestResolver:
+    return ManifestResolver(
+        contracts=catalog.contracts,
+        combos=catalog.combos,
+        bento=catalog.bento,
+        platters=catalog.platters,
+        env_template=environment_template,
+        network_profile=network_profile,
+    )
+
+
+def test_resolver_construction(benchmark, catalog, environment_template, network_profile):
+    benchmark.extra_info["services"] = catalog.service_count
+    benchmark(_resolver, catalog, environment_template, network_profile)
+
+
+def test_resolve_services_cold(benchmark, catalog, environment_template, network_profile):
+    """Resolution with an empty closure cache, as after a manifest change."""
+    resolver = _resolver(catalog, environment_template, network_profile)
+    selection = [catalog.largest_platter()]
+    benchmark.extra_info["services"] = catalog.service_count
+    benchmark.pedantic(
+        resolver.resolve_services,
+        args=(selection,),
+        setup=resolver.closures.clear,
+        rounds=50,
+        warmup_rounds=1,
+    )
+
+
+def test_resolve_services_warm(benchmark, catalog, environment_template, network_profile):
+    resolver = _resolver(catalog, environment_template, network_profile)
+    selection = [catalog.largest_platter()]
+    resolver.resolve_services(selection)
+    benchmark(resolver.resolve_services, selection)
+
+
+def test_build_compose(benchmark, catalog, environment_template, network_profile):
+    resolver = _resolver(catalog, environment_template, network_profile)
+    selection = [catalog.largest_platter()]
+    compose = benchmark(resolver.build_compose, selection)
+    assert compose["services"]
+
+
+def test_legacy_resolution(benchmark, catalog):
+    """``scripts/generate-compose.py``: platter -> dependencies -> compose dict."""
+    module = load_script("generate-compose")
+    resolver = module.ManifestResolver(catalog.directory)
+    platter_id = catalog.largest_platter()
+
+    def resolve():
+        rolls = resolver.resolve_dependencies(resolver.resolve_platter(platter_id))
+        return resolver.generate_compose(rolls)
+
+    benchmark.extra_info["services"] = catalog.service_count
+    compose = benchmark(resolve)
+    assert compose["services"]
+
+
+def test_network_config(benchmark, catalog):
+    module = load_script("generate-compose")
+    resolver = module.ManifestResolver(catalog.directory)
+    rolls = resolver.resolve_dependencies(resolver.resolve_platter(catalog.largest_platter()))
+    compose = resolver.generate_compose(rolls)
+    generator = load_script("generate-network-config").NetworkConfigGenerator()
+
+    benchmark.pedantic(
+        generator.generate,
+        setup=lambda: ((copy.deepcopy(compose), "inari"), {}),
+        rounds=200,
+        warmup_rounds=1,
+    )
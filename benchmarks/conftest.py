@@ -0,0 +1,130 @@
+"""Shared fixtures for the benchmark suite.
+
+Every benchmark runs against the real ``docs/manifest/core`` catalog and
+against scaled copies of it.  The scales default to 1k and 10k services and
+can be narrowed with ``SUSHI_BENCH_SCALES`` (e.g. ``SUSHI_BENCH_SCALES=1000``
+or ``SUSHI_BENCH_SCALES=`` for the real catalog only).  Entries prefixed with
+``syn:`` (e.g. ``syn:10000``) use ``scripts/generate-synthetic-manifests.py``
+instead of replicating the real catalog.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Tuple
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Benchmarks measure YAML parsing, not the on-disk manifest cache.  Must be
+# set before manifest_loader creates its shared loader.
+os.environ.setdefault("SUSHI_MANIFEST_CACHE", "0")
+
+from manifest_scaling import MANIFEST_FILES, load_core_catalog, scale_catalog, write_catalog  # noqa: E402
+
+TEMPLATES = ROOT / "docs" / "manifest" / "templates"
+DEFAULT_SCALES = "1000,10000"
+
+
+def _scales() -> Dict[str, Tuple[str, int]]:
+    """Map fixture IDs to (source, service count); source is core, scaled or synthetic."""
+    raw = os.environ.get("SUSHI_BENCH_SCALES", DEFAULT_SCALES)
+    scales = {"core": ("core", 0)}
+    for value in filter(None, (part.strip() for part in raw.split(","))):
+        source, _, count_text = value.rpartition(":")
+        count = int(count_text)
+        label = f"{count // 1000}k" if count % 1000 == 0 else str(count)
+        if source == "syn":
+            scales[f"syn-{label}"] = ("synthetic", count)
+        else:
+            scales[label] = ("scaled", count)
+    return scales
+
+
+SCALES = _scales()
+
+
+def load_script(name: str) -> ModuleType:
+    """Import a hyphenated script from ``scripts/`` as a module."""
+    path = ROOT / "scripts" / f"{name}.py"
+    module_name = "sushi_scripts." + name.replace("-", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Unable to load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class ScaledCatalog:
+    """Parsed manifests for one scale plus, on demand, a directory of them."""
+
+    def __init__(self, label: str, documents: Any, factory: pytest.TempPathFactory) -> None:
+        self.label = label
+        self.contracts, self.combos, self.bento, self.platters = documents
+        self._factory = factory
+        self._directory: Path | None = None
+
+    @property
+    def service_count(self) -> int:
+        return len(self.contracts.get("services", {}))
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is None:
+            self._directory = write_catalog(
+                (self.contracts, self.combos, self.bento, self.platters),
+                self._factory.mktemp(f"catalog-{self.label}"),
+            )
+        return self._directory
+
+    def largest_platter(self) -> str:
+        """ID of the platter with the most direct members."""
+        return max(
+            self.platters.get("platters", []),
+            key=lambda spec: len(spec.get("combos", [])) + len(spec.get("additional_services", [])),
+        )["id"]
+
+
+_CATALOGS: Dict[str, ScaledCatalog] = {}
+
+
+@pytest.fixture(scope="session", params=list(SCALES), ids=list(SCALES))
+def catalog(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> ScaledCatalog:
+    label = request.param
+    if label not in _CATALOGS:
+        source, count = SCALES[label]
+        if source == "synthetic":
+            generator = load_script("generate-synthetic-manifests")
+            generated = generator.generate_catalog(generator.SyntheticSpec(services=count))
+            documents = tuple(generated[name] for name in MANIFEST_FILES)
+        else:
+            documents = load_core_catalog()
+            if source == "scaled":
+                documents = scale_catalog(documents, count)
+        _CATALOGS[label] = ScaledCatalog(label, documents, tmp_path_factory)
+    return _CATALOGS[label]
+
+
+@pytest.fixture(scope="session")
+def environment_template() -> Dict[str, Any]:
+    import yaml
+
+    return yaml.safe_load((TEMPLATES / "environment-configs" / "development.yml").read_text()) or {}
+
+
+@pytest.fixture(scope="session")
+def network_profile() -> Dict[str, Any]:
+    import yaml
+
+    return yaml.safe_load((TEMPLATES / "network-profiles" / "business-confidential.yml").read_text()) or {}
@@ -0,0 +1,112 @@
+"""Scaled copies of the core manifest catalog for benchmarks.
+
+The real catalog is replicated until it reaches the requested number of
+services.  Replica ``k`` of a service or bundle gets the suffix ``-r<k>``
+and its service references point at the same replica, while capability IDs
+stay shared, so every capability ends up with one provider per replica and
+the default providers remain those of the original catalog.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+CORE_DIR = ROOT / "docs" / "manifest" / "core"
+MENU_MANIFEST = ROOT / "docs" / "manifest" / "menu-manifest.md"
+MANIFEST_FILES = ("contracts.yml", "combos.yml", "bento-box.yml", "platters.yml")
+
+Catalog = Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]
+
+
+def load_core_catalog() -> Catalog:
+    """Parse the four core manifests (contracts, combos, bento, platters)."""
+    return tuple(  # type: ignore[return-value]
+        yaml.safe_load((CORE_DIR / name).read_text(encoding="utf-8")) or {}
+        for name in MANIFEST_FILES
+    )
+
+
+def _replica(identifier: str, replica: int) -> str:
+    return identifier if replica == 0 else f"{identifier}-r{replica}"
+
+
+def scale_catalog(catalog: Catalog, services: int) -> Catalog:
+    """Return a copy of *catalog* replicated to roughly *services* services."""
+    contracts, combos, bento, platters = catalog
+    base_services = contracts.get("services", {})
+    replicas = max(1, math.ceil(services / max(1, len(base_services))))
+    service_ids = set(base_services)
+    bundle_ids = {
+        spec["id"]
+        for section, key in ((combos, "combos"), (bento, "bento_boxes"), (platters, "platters"))
+        for spec in section.get(key, [])
+    }
+
+    def rename(ref: Any, replica: int) -> Any:
+        if isinstance(ref, str) and (ref in service_ids or ref in bundle_ids):
+            return _replica(ref, replica)
+        return ref
+
+    def rename_list(values: Any, replica: int) -> Any:
+        if not isinstance(values, list):
+            return values
+        return [rename(value, replica) for value in values]
+
+    scaled_contracts = copy.deepcopy(contracts)
+    scaled_services: Dict[str, Any] = {}
+    for replica in range(replicas):
+        for service_id, contract in base_services.items():
+            clone = copy.deepcopy(contract)
+            for key in ("requires", "suggests", "conflicts"):
+                if key in clone:
+                    clone[key] = rename_list(clone[key], replica)
+            scaled_services[_replica(service_id, replica)] = clone
+    scaled_contracts["services"] = scaled_services
+
+    for cap_data in (scaled_contracts.get("capabilities") or {}).values():
+        providers = (cap_data or {}).get("providers")
+        if isinstance(providers, list):
+            cap_data["providers"] = [
+                rename(provider, replica) for replica in range(replicas) for provider in providers
+            ]
+
+    def scale_bundles(section: Dict[str, Any], key: str, member_keys: Tuple[str, ...]) -> Dict[str, Any]:
+        scaled = {name: value for name, value in section.items() if name != key}
+        scaled[key] = []
+        for replica in range(replicas):
+            for spec in section.get(key, []):
+                clone = copy.deepcopy(spec)
+                clone["id"] = _replica(spec["id"], replica)
+                for member_key in member_keys:
+                    if member_key in clone:
+                        clone[member_key] = rename_list(clone[member_key], replica)
+                scaled[key].append(clone)
+        return scaled
+
+    return (
+        scaled_contracts,
+        scale_bundles(combos, "combos", ("includes", "optional")),
+        scale_bundles(bento, "bento_boxes", ("includes", "optional")),
+        scale_bundles(platters, "platters", ("combos", "additional_services", "includes", "optional")),
+    )
+
+
+def write_catalog(catalog: Catalog, directory: Path) -> Path:
+    """Write *catalog* as a manifest directory usable by the scripts."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, document in zip(MANIFEST_FILES, catalog):
+        with (directory / name).open("w", encoding="utf-8") as handle:
+            yaml.safe_dump(document, handle, sort_keys=False, allow_unicode=True)
+    badges = CORE_DIR / "badges.yml"
+    if badges.exists():
+        shutil.copy2(badges, directory / badges.name)
+    if MENU_MANIFEST.exists():
+        shutil.copy2(MENU_MANIFEST, directory / MENU_MANIFEST.name)
+    return directory
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Cold-start import cost of the generator CLIs, measured with ``-X importtime``.
+
+The orchestrator starts these scripts once per request, so every module they
+import before doing any work is paid on the request path.  Each entry point is
+run as ``python -X importtime <script> <args>``; modules the bare interpreter
+already imports (``python -X importtime -c pass``) are subtracted, leaving the
+import time the script itself adds.
+
+    python benchmarks/startup.py                 # report
+    python benchmarks/startup.py --check         # fail when over budget
+    python benchmarks/startup.py --update-budget # rewrite the ms budgets
+
+Budgets live in ``startup-budget.json``: a ceiling on the added import time
+and modules that must not be imported at all (the "forbidden" list, which is
+machine independent).  ``SUSHI_STARTUP_BUDGET_SCALE`` multiplies the ms
+ceilings for slower machines.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_FILE = Path(__file__).resolve().parent / "startup-budget.json"
+CORE = "docs/manifest/core"
+
+# name -> argv after the interpreter; ``--help`` measures pure start-up, the
+# real invocations also cover what a request imports before producing output.
+ENTRY_POINTS: Dict[str, List[str]] = {
+    "generate_compose --help": ["generate_compose.py", "--help"],
+    "generate-compose --help": ["scripts/generate-compose.py", "--help"],
+    "generate-compose platter": [
+        "scripts/generate-compose.py", "--platter=platter.hosomaki-core", "--manifest-dir", CORE,
+    ],
+    "generate-network-config --help": ["scripts/generate-network-config.py", "--help"],
+    "export-manifest-json --help": ["scripts/export-manifest-json.py", "--help"],
+    "generate_roll --help": ["docs/manifest/narratives/rolls/generate_roll.py", "--help"],
+}
+
+# Headroom applied by --update-budget: generous enough for run-to-run noise
+# and a busier machine, tight enough that a new eager import of PyYAML or
+# multiprocessing trips it.  The ceiling is set from the slowest of
+# UPDATE_PASSES independent measurements, never from a single lucky run.
+BUDGET_FACTOR = 2.5
+BUDGET_SLACK_MS = 10.0
+UPDATE_PASSES = 3
+
+
+class ImportProfile:
+    """Modules imported by one run and their self time in microseconds."""
+
+    def __init__(self, modules: Dict[str, int], returncode: int) -> None:
+        self.modules = modules
+        self.returncode = returncode
+
+    @classmethod
+    def parse(cls, stderr: str, returncode: int) -> "ImportProfile":
+        modules: Dict[str, int] = {}
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _cumulative, name = line[len("import time:"):].split("|", 2)
+            modules[name.strip()] = modules.get(name.strip(), 0) + int(self_us)
+        return cls(modules, returncode)
+
+    def added(self, baseline: "ImportProfile") -> Dict[str, int]:
+        return {name: us for name, us in self.modules.items() if name not in baseline.modules}
+
+
+def _importtime(argv: Sequence[str]) -> ImportProfile:
+    env = {name: value for name, value in os.environ.items() if name != "PYTHONPROFILEIMPORTTIME"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return ImportProfile.parse(result.stderr, result.returncode)
+
+
+def measure(argv: Sequence[str], runs: int = 5) -> Dict[str, object]:
+    """Import time (ms) the entry point adds over a bare interpreter.
+
+    The fastest of *runs* is reported: interference from other processes only
+    ever adds time, so the minimum is the most repeatable figure.
+    """
+    baseline = _importtime(["-c", "pass"])
+    _importtime(argv)  # warm the bytecode and filesystem caches
+    samples: List[float] = []
+    last: Optional[ImportProfile] = None
+    for _ in range(runs):
+        last = _importtime(argv)
+        samples.append(sum(last.added(baseline).values()) / 1000)
+    assert last is not None
+    added = last.added(baseline)
+    return {
+        "import_ms": min(samples),
+        "modules": sorted(added),
+        "slowest": sorted(added.items(), key=lambda item: item[1], reverse=True)[:8],
+        # A script that does not even compile imports nothing worth budgeting
+        "compiles": compiles(ROOT / argv[0]),
+    }
+
+
+def compiles(script: Path) -> bool:
+    try:
+        compile(script.read_text(encoding="utf-8"), str(script), "exec")
+    except SyntaxError:
+        return False
+    return True
+
+
+def load_budget(path: Path = BUDGET_FILE) -> Dict[str, Dict]:
+    return json.loads(path.read_text(encoding="utf-8"))["entry_points"]
+
+
+def check(
+    name: str, result: Dict[str, object], budget: Dict, scale: float = 1.0, timing: bool = True
+) -> List[str]:
+    """Return budget violations for one measured entry point.
+
+    With ``timing=False`` only the forbidden-module lists are checked; the
+    ms ceilings are wall-clock figures and too noisy for every test run.
+    """
+    problems = []
+    imported = set(result["modules"])  # type: ignore[arg-type]
+    for module in budget.get("forbidden", []):
+        hits = sorted(m for m in imported if m == module or m.startswith(module + "."))
+        if hits:
+            problems.append(f"{name}: imports {', '.join(hits)} at start-up")
+    limit = budget.get("max_import_ms", float("inf")) * scale
+    if timing and result["import_ms"] > limit:  # type: ignore[operator]
+        problems.append(f"{name}: {result['import_ms']:.1f} ms of imports exceeds the {limit:.1f} ms budget")
+    return problems
+
+
+def budget_scale() -> float:
+    return float(os.environ.get("SUSHI_STARTUP_BUDGET_SCALE", "1"))
+
+
+def timing_enabled() -> bool:
+    """Whether the test suite should enforce the ms ceilings (opt-in)."""
+    return os.environ.get("SUSHI_STARTUP_BUDGET", "") not in ("", "0")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure generator CLI start-up imports")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per entry point (the fastest is used).")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when an entry point is over budget.")
+    parser.add_argument("--update-budget", action="store_true", help="Rewrite the ms ceilings from this run.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args(argv)
+
+    budgets = load_budget()
+    results = {name: measure(entry, args.runs) for name, entry in ENTRY_POINTS.items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            note = "" if result["compiles"] else "  (does not compile)"
+            print(f"{name:<34} {result['import_ms']:7.1f} ms  {len(result['modules']):3d} modules{note}")
+            for module, us in result["slowest"][:4]:  # type: ignore[index]
+                print(f"    {module:<40} {us / 1000:6.1f} ms")
+
+    if args.update_budget:
+        document = json.loads(BUDGET_FILE.read_text(encoding="utf-8"))
+        for name, result in results.items():
+            if not result["compiles"]:
+                continue
+            slowest = max(
+                [result["import_ms"]]
+                + [measure(ENTRY_POINTS[name], args.runs)["import_ms"] for _ in range(UPDATE_PASSES - 1)]
+            )
+            entry = document["entry_points"].setdefault(name, {"forbidden": []})
+            entry["max_import_ms"] = round(slowest * BUDGET_FACTOR + BUDGET_SLACK_MS, 1)  # type: ignore[operator]
+        BUDGET_FILE.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"Budget written to {BUDGET_FILE}")
+
+    if args.check:
+        problems = [
+            problem
+            for name, result in results.items()
+            if result["compiles"]
+            for problem in check(name, result, budgets.get(name, {}), budget_scale())
+        ]
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,29 +15,51 @@ extraction and rendering helpers.
 
 from __future__ import annotations
 
-import argparse
 import datetime as _dt
+import sys
 import textwrap
 from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
-import yaml
+# PyYAML and argparse are imported where they are used, keeping the import
+# of this module (tests, exporters) and the CLI's start-up cheap.
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from manifest_graph import KIND_BENTO, KIND_COMBO, KIND_PLATTER, ManifestGraph
+from manifest_loader import load_manifest_documents
 
 
 MANIFEST_ROOT = Path("docs/manifest/core")
+MENU_FILENAME = "menu-manifest.md"
 NARRATIVE_ROOT = Path("docs/manifest/narratives/rolls")
 FRONT_MATTER_SCHEMA_VERSION = "1.0.0"
 DEFAULT_CONTENT_VERSION = "0.1.0"
 
 
 def _load_yaml(path: Path) -> Any:
-    with path.open("r", encoding="utf-8") as handle:
-        loader = yaml.safe_load_all(handle)
-        try:
-            return next(loader)
-        except StopIteration:
-            return {}
+    documents = load_manifest_documents(path)
+    return documents[0] if documents else {}
+
+
+def _load_front_matter(path: Path) -> Any:
+    """Parse the YAML front matter of a Markdown file such as the menu."""
+    import yaml
+
+    text = path.read_text(encoding="utf-8")
+    if not text.startswith("---"):
+        return {}
+    block = text[3:].split("\n---", 1)[0]
+    return yaml.safe_load(block) or {}
+
+
+def _default_menu_path(manifest_root: Path) -> Path:
+    """The menu sits beside the core manifests or one level above them."""
+    candidate = manifest_root / MENU_FILENAME
+    return candidate if candidate.exists() else manifest_root.parent / MENU_FILENAME
 
 
 class RollMenuEntry:
@@ -67,15 +89,17 @@ class RollTemplateGenerator:
         self,
         manifest_root: Path | str = MANIFEST_ROOT,
         narrative_root: Path | str = NARRATIVE_ROOT,
+        menu_path: Path | str | None = None,
     ) -> None:
         self.manifest_root = Path(manifest_root)
         self.narrative_root = Path(narrative_root)
+        self.menu_path = Path(menu_path) if menu_path else _default_menu_path(self.manifest_root)
         self.contracts = _load_yaml(self.manifest_root / "contracts.yml")
         self.services: Mapping[str, Any] = self.contracts.get("services", {})
         self.combos_data = _load_yaml(self.manifest_root / "combos.yml")
         self.bento_data = _load_yaml(self.manifest_root / "bento-box.yml")
         self.platters_data = _load_yaml(self.manifest_root / "platters.yml")
-        self.menu_data = _load_yaml(self.manifest_root / "menu-manifest.md")
+        self.menu_data = _load_front_matter(self.menu_path)
 
         self.combos: Dict[str, Mapping[str, Any]] = {
             combo["id"]: combo for combo in self.combos_data.get("combos", [])
@@ -86,6 +110,9 @@ class RollTemplateGenerator:
         self.platters: Dict[str, Mapping[str, Any]] = {
             platter["id"]: platter for platter in self.platters_data.get("platters", [])
         }
+        self.graph = ManifestGraph.from_manifests(
+            self.contracts, self.combos_data, self.bento_data, self.platters_data
+        )
 
         self.roll_catalog: Dict[str, RollMenuEntry] = {}
         for style in self.menu_data.get("styles", []):
@@ -105,6 +132,8 @@ class RollTemplateGenerator:
         bundle_membership = self._collect_bundle_membership(service_id)
         front_matter = self._build_front_matter(service_id, service, menu_entry, bundle_membership)
         body = self._render_body(service_id, service, menu_entry, bundle_membership)
+        import yaml
+
         yaml_block = yaml.safe_dump(front_matter, sort_keys=False, allow_unicode=True).strip()
         return f"---\n{yaml_block}\n---\n\n{body}"
 
@@ -130,34 +159,34 @@ class RollTemplateGenerator:
         return self.roll_catalog[service_id]
 
     def _collect_bundle_membership(self, service_id: str) -> Dict[str, List[Dict[str, str]]]:
-        combos: List[Dict[str, str]] = []
-        for combo in self.combos.values():
-            includes = combo.get("includes", []) + combo.get("optional", [])
-            if service_id in includes:
-                combos.append({"id": combo["id"], "name": combo.get("name", "")})
-        bento_boxes: List[Dict[str, str]] = []
-        for box in self.bentos.values():
-            includes = box.get("includes", []) + box.get("optional", [])
-            if service_id in includes:
-                bento_boxes.append({"id": box["id"], "name": box.get("name", "")})
-        platters: List[Dict[str, str]] = []
-        combos_with_service = {combo["id"] for combo in combos}
-        for platter in self.platters.values():
-            combo_ids = platter.get("combos", [])
-            additional_services = platter.get("additional_services", [])
-            include = False
-            if service_id in additional_services:
-                include = True
-            elif combos_with_service and any(cid in combos_with_service for cid in combo_ids):
-                include = True
-            if include:
-                platters.append({"id": platter["id"], "name": platter.get("name", "")})
+        graph = self.graph
+        combo_ids = graph.containing_bundles(service_id, KIND_COMBO)
+        combos = [{"id": cid, "name": self.combos[cid].get("name", "")} for cid in combo_ids]
+        bento_boxes = [
+            {"id": bid, "name": self.bentos[bid].get("name", "")}
+            for bid in graph.containing_bundles(service_id, KIND_BENTO)
+        ]
+        # A platter counts when it lists the service itself or one of its combos.
+        platter_ids = set(graph.containing_bundles(service_id, KIND_PLATTER))
+        for cid in combo_ids:
+            platter_ids.update(graph.containing_bundles(cid, KIND_PLATTER))
+        platters = [
+            {"id": pid, "name": self.platters[pid].get("name", "")}
+            for pid in platter_ids
+            if self._platter_lists(pid, service_id, combo_ids)
+        ]
         return {
             "combos": sorted(combos, key=lambda item: item["id"]),
             "bento_boxes": sorted(bento_boxes, key=lambda item: item["id"]),
             "platters": sorted(platters, key=lambda item: item["id"]),
         }
 
+    def _platter_lists(self, platter_id: str, service_id: str, combo_ids: Sequence[str]) -> bool:
+        platter = self.platters[platter_id]
+        if service_id in platter.get("additional_services", []):
+            return True
+        return any(cid in combo_ids for cid in platter.get("combos", []))
+
     def _build_front_matter(
         self,
         service_id: str,
@@ -218,7 +247,7 @@ class RollTemplateGenerator:
             "last_updated": _dt.date.today().isoformat(),
             "manifest_ref": {
                 "contracts": f"{self.manifest_root / 'contracts.yml'}#services.{service_id}",
-                "menu": f"{self.manifest_root / 'menu-manifest.md'}#styles.{menu_entry.style}.{service_id}",
+                "menu": f"{self.menu_path}#styles.{menu_entry.style}.{service_id}",
             },
             "assets": [],
             "export": {"sections": export_sections},
@@ -503,6 +532,8 @@ class RollTemplateGenerator:
         if legacy_path.exists():
             text = legacy_path.read_text(encoding="utf-8")
             try:
+                import yaml
+
                 data = yaml.safe_load(text.split("---", 2)[1])
                 return data.get("source", {}) if isinstance(data, dict) else {}
             except Exception:  # pragma: no cover - fallback for malformed legacy docs
@@ -564,6 +595,8 @@ class RollTemplateGenerator:
         if legacy_path.exists():
             text = legacy_path.read_text(encoding="utf-8")
             try:
+                import yaml
+
                 data = yaml.safe_load(text.split("---", 2)[1])
                 return data.get("timeline", {}) if isinstance(data, dict) else {}
             except Exception:  # pragma: no cover
@@ -595,26 +628,20 @@ class RollTemplateGenerator:
         bundles: Mapping[str, Sequence[Mapping[str, str]]],
         env_vars: Mapping[str, Any],
     ) -> Dict[str, Any]:
-        snippets = []
+        snippets = [snippet.render() for snippet in _CONFIGURATION_SNIPPETS.get(service_id, [])]
         if env_vars:
             example_env = "\n".join(f"      {key}: {value}" for key, value in list(env_vars.items())[:3])
             snippets.append(
                 {
                     "title": "Compose environment overrides",
                     "description": "Bootstrap environment variables within docker-compose overrides.",
-                    "example": textwrap.dedent(
-                        f"""
-                        services:
-                          {service_id}:
-                            environment:
-                        {example_env if example_env else '      # add overrides here'}
-                        """
-                    ).strip(),
+                    "example": f"services:\n  {_service_key(service_id)}:\n    environment:\n{example_env}",
                 }
             )
-        automation_patterns = [
+        automation_patterns = list(_AUTOMATION_PATTERNS.get(service_id, []))
+        automation_patterns.append(
             f"Use generate_compose.py to include {service_id} alongside {' and '.join(b['id'] for b in bundles.get('combos', [])) or 'companion services'}.",
-        ]
+        )
         return {
             "configuration_snippets": snippets,
             "automation_patterns": automation_patterns,
@@ -856,40 +883,9 @@ class RollTemplateGenerator:
         return "\n".join(lines)
 
 
-def main(argv: Optional[Sequence[str]] = None) -> int:
-    parser = argparse.ArgumentParser(description="Generate Sushi Kitchen roll narratives from manifests")
-    parser.add_argument("service_ids", nargs="+", help="One or more manifest service identifiers")
-    parser.add_argument(
-        "--manifest-root",
-        default=str(MANIFEST_ROOT),
-        help="Path to the manifest core directory (default: docs/manifest/core)",
-    )
-    parser.add_argument(
-        "--output-dir",
-        default=str(NARRATIVE_ROOT),
-        help="Directory where Markdown files should be written",
-    )
-    args = parser.parse_args(argv)
-
-    generator = RollTemplateGenerator(manifest_root=Path(args.manifest_root), narrative_root=Path(args.output_dir))
-    for service_id in args.service_ids:
-        path = generator.write_roll(service_id)
-        print(f"Wrote {path}")
-    return 0
-
-
-if __name__ == "__main__":
-    raise SystemExit(main())
-=======
-"""Utilities for generating narrative roll documentation."""
-
-from __future__ import annotations
-
-import textwrap
-from dataclasses import dataclass
-from typing import Any, Dict, List
-
-
+# ---------------------------------------------------------------------------
+# Curated integration notes
+# ---------------------------------------------------------------------------
 @dataclass
 class _ConfigurationSnippet:
     """Metadata describing a Compose override example for a roll."""
@@ -923,35 +919,6 @@ def _render_example(template: str, service_id: str) -> str:
     return textwrap.dedent(example).rstrip()
 
 
-class RollTemplateGenerator:
-    """Generate metadata blocks for roll narrative documents."""
-
-    def __init__(self, service_id: str) -> None:
-        self.service_id = service_id
-
-    def build(self) -> Dict[str, Any]:
-        """Return the metadata dictionary for the configured roll."""
-
-        return {
-            "integration_notes": self._integration_metadata(),
-        }
-
-    # ------------------------------------------------------------------
-    # Metadata helpers
-    # ------------------------------------------------------------------
-    def _integration_metadata(self) -> Dict[str, Any]:
-        """Return integration metadata for the configured roll."""
-
-        snippets = _CONFIGURATION_SNIPPETS.get(self.service_id, [])
-        automation = _AUTOMATION_PATTERNS.get(self.service_id, [])
-
-        rendered_snippets: List[Dict[str, str]] = [snippet.render() for snippet in snippets]
-        return {
-            "configuration_snippets": rendered_snippets,
-            "automation_patterns": automation,
-        }
-
-
 _CONFIGURATION_SNIPPETS: Dict[str, List[_ConfigurationSnippet]] = {
     "hosomaki.n8n": [
         _ConfigurationSnippet(
@@ -1002,3 +969,31 @@ _AUTOMATION_PATTERNS: Dict[str, List[str]] = {
         "Use `futomaki.qdrant` to store embeddings produced by Ollama for downstream semantic search",
     ],
 }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate Sushi Kitchen roll narratives from manifests")
+    parser.add_argument("service_ids", nargs="+", help="One or more manifest service identifiers")
+    parser.add_argument(
+        "--manifest-root",
+        default=str(MANIFEST_ROOT),
+        help="Path to the manifest core directory (default: docs/manifest/core)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=str(NARRATIVE_ROOT),
+        help="Directory where Markdown files should be written",
+    )
+    args = parser.parse_args(argv)
+
+    generator = RollTemplateGenerator(manifest_root=Path(args.manifest_root), narrative_root=Path(args.output_dir))
+    for service_id in args.service_ids:
+        path = generator.write_roll(service_id)
+        print(f"Wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
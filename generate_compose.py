@@ -14,19 +14,30 @@ as a foundation that other tools (CLI, API, UI) can build upon.
 
 from __future__ import annotations
 
-import argparse
 import copy
+import hashlib
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-import yaml
+# PyYAML, argparse, json, the manifest graph and loader, the process pool and
+# the resource budget model are imported where they are used: the CLI runs
+# once per request, and an import it does not need is start-up time on that
+# path (budgets: benchmarks/startup-budget.json).
+if TYPE_CHECKING:
+    import argparse
+
+    from manifest_graph import ManifestGraph
+    from resource_budget import BudgetReport, HostBudget, ResourceModel
 
 
 def load_yaml(path: Path) -> Any:
-    """Load YAML from *path* and return the parsed structure."""
-    with path.open("r", encoding="utf-8") as handle:
-        return yaml.safe_load(handle)
+    """Load YAML from *path* (through the shared manifest cache)."""
+    from manifest_loader import load_manifest
+
+    return load_manifest(path)
 
 
 def _stringify_env_value(value: Any) -> str:
@@ -49,7 +60,14 @@ class ManifestResolver:
         platters: Dict[str, Any],
         env_template: Dict[str, Any],
         network_profile: Dict[str, Any],
+        graph: Optional[ManifestGraph] = None,
     ) -> None:
+        from manifest_graph import KIND_BENTO, KIND_COMBO, ClosureIndex, ManifestGraph
+
+        self.graph = graph or ManifestGraph.from_manifests(contracts, combos, bento, platters)
+        # Combos and bento boxes contribute their optional items; platters
+        # only their combos and additional services.
+        self.closures = ClosureIndex(self.graph, frozenset({KIND_COMBO, KIND_BENTO}))
         self.services: Dict[str, Dict[str, Any]] = contracts.get("services", {})
         self.combos: Dict[str, Dict[str, Any]] = {
             combo["id"]: combo for combo in combos.get("combos", [])
@@ -66,10 +84,11 @@ class ManifestResolver:
             cap_id: list(cap_data.get("providers", []))
             for cap_id, cap_data in capabilities.items()
         }
-        dependency_resolution = contracts.get("dependency_resolution", {})
-        self.default_providers: Dict[str, str] = dependency_resolution.get(
+        self.dependency_resolution: Dict[str, Any] = contracts.get("dependency_resolution", {})
+        self.default_providers: Dict[str, str] = self.dependency_resolution.get(
             "default_providers", {}
         )
+        self._resources: Optional[ResourceModel] = None
 
         self.env_template = env_template or {}
         self.network_profile = network_profile or {}
@@ -84,74 +103,83 @@ class ManifestResolver:
     # ------------------------------------------------------------------
     def _expand_bundle(self, bundle_id: str) -> List[str]:
         """Expand a bundle (combo, bento, platter) into service IDs."""
-        if bundle_id in self.combos:
-            combo = self.combos[bundle_id]
-            items = list(combo.get("includes", [])) + list(combo.get("optional", []))
-        elif bundle_id in self.bentos:
-            box = self.bentos[bundle_id]
-            items = list(box.get("includes", [])) + list(box.get("optional", []))
-        elif bundle_id in self.platters:
-            platter = self.platters[bundle_id]
-            items = list(platter.get("combos", [])) + list(
-                platter.get("additional_services", [])
-            )
-        else:
+        graph = self.graph
+        node = graph.id_of(bundle_id)
+        if node is None or not graph.is_bundle(bundle_id):
             return [bundle_id]
-
-        expanded: List[str] = []
-        for item in items:
-            if item in self.services:
-                expanded.append(item)
-            else:
-                expanded.extend(self._expand_bundle(item))
-        return expanded
+        return graph.names(self.closures.bundle_closure(node))
 
     def resolve_services(self, selected: Sequence[str]) -> List[str]:
         """Resolve *selected* IDs (services or bundles) to concrete services."""
         if not selected:
             raise ValueError("No services or bundles were selected")
+        return sorted(self.closures.resolve(selected))
 
-        resolved: Set[str] = set()
-        queue: List[str] = list(selected)
-        while queue:
-            current = queue.pop()
-            if current in self.combos or current in self.bentos or current in self.platters:
-                queue.extend(self._expand_bundle(current))
-                continue
+    def resolve_within_budget(
+        self, selected: Sequence[str], budget: HostBudget
+    ) -> Tuple[List[str], BudgetReport]:
+        """Resolve *selected* for a host with *budget* and report the fit.
 
-            if current not in self.services:
-                raise ValueError(f"Unknown service or bundle ID: {current}")
+        Alternative providers are ranked by their cost against the budget
+        (see :mod:`resource_budget`) instead of by catalog preference alone.
+        Selections are not memoized here since the ranking depends on the
+        budget.
+        """
+        from resource_budget import HostBudget, ResourceModel
 
-            if current in resolved:
+        if not selected:
+            raise ValueError("No services or bundles were selected")
+        if self._resources is None:
+            self._resources = ResourceModel(self.graph, self.services, self.dependency_resolution)
+        graph = self.graph
+        nodes = graph.solve(self.closures.leaves(selected), rank=self._resources.rank(budget))
+
+        warnings: List[str] = []
+        for item in selected:
+            requirements = self.platters.get(item, {}).get("resource_requirements")
+            if not isinstance(requirements, dict):
                 continue
-
-            resolved.add(current)
-            service = self.services[current]
-            for requirement in service.get("requires", []) or []:
-                if requirement in self.services:
-                    queue.append(requirement)
-                elif requirement.startswith("cap."):
-                    provider = self._select_capability_provider(requirement)
-                    if provider is None:
-                        raise ValueError(
-                            f"No provider found for capability '{requirement}' required by '{current}'"
-                        )
-                    queue.append(provider)
-                else:
-                    raise ValueError(
-                        f"Requirement '{requirement}' referenced by '{current}' does not match a service ID or capability"
-                    )
-        return sorted(resolved)
-
-    def _select_capability_provider(self, capability: str) -> Optional[str]:
-        """Return the preferred provider for *capability* if available."""
-        preferred = self.default_providers.get(capability)
-        if preferred and preferred in self.services:
-            return preferred
-        for candidate in self.capability_providers.get(capability, []):
-            if candidate in self.services:
-                return candidate
-        return None
+            for shortfall in budget.shortfall(HostBudget.from_platter(requirements)):
+                warnings.append(f"{item} declares {shortfall}")
+            if requirements.get("gpu_required") and budget.gpu_memory_mb == 0:
+                warnings.append(f"{item} requires a GPU")
+        return sorted(graph.names(nodes)), self._resources.report(nodes, budget, warnings)
+
+    def update_service(self, service_id: str, contract: Dict[str, Any]) -> int:
+        """Apply an edited service contract without rebuilding the resolver.
+
+        Returns the number of memoized closures that were invalidated.
+        """
+        self.services[service_id] = contract
+        self._resources = None
+        return self.closures.update_service(service_id, contract)
+
+    def update_bundle(self, bundle: Dict[str, Any]) -> int:
+        """Apply an edited combo, bento box or platter definition."""
+        from manifest_graph import KIND_BENTO, KIND_COMBO, KIND_PLATTER
+
+        bundle_id = bundle["id"]
+        if bundle_id.startswith("combo."):
+            kind, table = KIND_COMBO, self.combos
+        elif bundle_id.startswith("bento."):
+            kind, table = KIND_BENTO, self.bentos
+        elif bundle_id.startswith("platter."):
+            kind, table = KIND_PLATTER, self.platters
+        else:
+            raise ValueError(f"Unknown bundle ID: {bundle_id}")
+        table[bundle_id] = bundle
+        self._resources = None
+        return self.closures.update_bundle(kind, bundle)
+
+    def _select_capability_provider(self, capability: str, selected: Iterable[str] = ()) -> Optional[str]:
+        """Return the provider for *capability* that fits the *selected* services."""
+        graph = self.graph
+        node = graph.id_of(capability)
+        if node is None:
+            return None
+        nodes = {graph.index[service_id] for service_id in selected if service_id in graph.index}
+        provider = graph.choose_provider(node, nodes, graph.mask_of(nodes))
+        return None if provider < 0 else graph.ids[provider]
 
     # ------------------------------------------------------------------
     # Environment handling
@@ -227,8 +255,12 @@ class ManifestResolver:
     # ------------------------------------------------------------------
     # Compose service construction
     # ------------------------------------------------------------------
-    def build_compose(self, selected_ids: Sequence[str]) -> Dict[str, Any]:
-        service_ids = self.resolve_services(selected_ids)
+    def build_compose(
+        self, selected_ids: Sequence[str], service_ids: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Compose spec for *selected_ids*, or for already resolved *service_ids*."""
+        if service_ids is None:
+            service_ids = self.resolve_services(selected_ids)
         compose: Dict[str, Any] = {"version": "3.9", "services": {}}
 
         networks = self.network_profile.get("networks")
@@ -441,7 +473,176 @@ class ManifestResolver:
         return None
 
 
+# ---------------------------------------------------------------------------
+# Matrix generation
+# ---------------------------------------------------------------------------
+MATRIX_INDEX_NAME = "matrix-index.json"
+
+# Per-process state for matrix workers: the shared manifests and graph are
+# installed once by the pool initializer, resolvers are built lazily per
+# (environment, network) pair.
+_MATRIX_STATE: Dict[str, Any] = {}
+
+
+def _init_matrix_worker(
+    contracts: Dict[str, Any],
+    combos: Dict[str, Any],
+    bento: Dict[str, Any],
+    platters: Dict[str, Any],
+    environments: Dict[str, Dict[str, Any]],
+    networks: Dict[str, Dict[str, Any]],
+    output_dir: str,
+    graph: Optional[ManifestGraph] = None,
+) -> None:
+    from manifest_graph import ManifestGraph
+
+    _MATRIX_STATE.clear()
+    _MATRIX_STATE.update(
+        manifests=(contracts, combos, bento, platters),
+        graph=graph or ManifestGraph.from_manifests(contracts, combos, bento, platters),
+        environments=environments,
+        networks=networks,
+        output_dir=Path(output_dir),
+        resolvers={},
+    )
+
+
+def _matrix_resolver(environment: str, network: str) -> ManifestResolver:
+    resolvers: Dict[Tuple[str, str], ManifestResolver] = _MATRIX_STATE["resolvers"]
+    resolver = resolvers.get((environment, network))
+    if resolver is None:
+        contracts, combos, bento, platters = _MATRIX_STATE["manifests"]
+        resolver = ManifestResolver(
+            contracts=contracts,
+            combos=combos,
+            bento=bento,
+            platters=platters,
+            env_template=_MATRIX_STATE["environments"][environment],
+            network_profile=_MATRIX_STATE["networks"][network],
+            graph=_MATRIX_STATE["graph"],
+        )
+        resolvers[(environment, network)] = resolver
+    return resolver
+
+
+def _generate_matrix_entry(task: Tuple[str, str, str]) -> Dict[str, Any]:
+    """Generate one (platter, environment, network) combination and write it."""
+    platter_id, environment, network = task
+    relative = Path(environment) / network / f"{platter_id}.yml"
+    entry: Dict[str, Any] = {
+        "platter": platter_id,
+        "environment": environment,
+        "network": network,
+        "path": relative.as_posix(),
+    }
+    started = time.perf_counter()
+    try:
+        compose = _matrix_resolver(environment, network).build_compose([platter_id])
+    except ValueError as exc:
+        entry.update(error=str(exc), seconds=round(time.perf_counter() - started, 6))
+        return entry
+
+    import yaml
+
+    rendered = yaml.safe_dump(compose, sort_keys=False).encode("utf-8")
+    target = _MATRIX_STATE["output_dir"] / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(rendered)
+    entry.update(
+        services=len(compose.get("services", {})),
+        sha256=hashlib.sha256(rendered).hexdigest(),
+        bytes=len(rendered),
+        seconds=round(time.perf_counter() - started, 6),
+    )
+    return entry
+
+
+def generate_matrix(
+    contracts: Dict[str, Any],
+    combos: Dict[str, Any],
+    bento: Dict[str, Any],
+    platters: Dict[str, Any],
+    environments: Dict[str, Dict[str, Any]],
+    networks: Dict[str, Dict[str, Any]],
+    output_dir: Path,
+    platter_ids: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+    graph: Optional[ManifestGraph] = None,
+) -> Dict[str, Any]:
+    """Generate every platter × environment × network combination.
+
+    *environments* and *networks* map a short name (used in output paths) to
+    the parsed template.  Manifests are parsed once by the caller and shipped
+    to each worker process a single time.  Outputs are written below
+    *output_dir* as ``<environment>/<network>/<platter>.yml`` next to a
+    ``matrix-index.json`` summary, which is also returned.  A precompiled
+    *graph* is shipped along with them; otherwise each worker compiles one.
+    """
+    started = time.perf_counter()
+    if platter_ids is None:
+        platter_ids = [platter["id"] for platter in platters.get("platters", [])]
+    tasks = [
+        (platter_id, environment, network)
+        for environment in sorted(environments)
+        for network in sorted(networks)
+        for platter_id in platter_ids
+    ]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    initargs = (contracts, combos, bento, platters, environments, networks, str(output_dir), graph)
+
+    if workers == 1:
+        _init_matrix_worker(*initargs)
+        entries = [_generate_matrix_entry(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_matrix_worker, initargs=initargs
+        ) as pool:
+            entries = list(pool.map(_generate_matrix_entry, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    import json
+    from datetime import datetime, timezone
+
+    index = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "workers": workers,
+        "total_seconds": round(time.perf_counter() - started, 6),
+        "combinations": len(entries),
+        "failures": sum(1 for entry in entries if "error" in entry),
+        "entries": entries,
+    }
+    (output_dir / MATRIX_INDEX_NAME).write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+    return index
+
+
+def _compiled_graph(args: argparse.Namespace) -> Optional[ManifestGraph]:
+    """The cached compiled graph, when the four manifests form one manifest directory.
+
+    Manifests passed from different directories or under other names fall
+    back to compiling in memory.
+    """
+    from manifest_graph import MANIFEST_FILES, ManifestGraph
+
+    paths = [args.contracts, args.combos, args.bento, args.platters]
+    directory = args.contracts.resolve().parent
+    if [path.name for path in paths] != list(MANIFEST_FILES):
+        return None
+    if any(path.resolve().parent != directory for path in paths):
+        return None
+    return ManifestGraph.compile(directory)
+
+
+def _load_template_dir(directory: Path) -> Dict[str, Dict[str, Any]]:
+    return {path.stem: load_yaml(path) or {} for path in sorted(directory.glob("*.yml"))}
+
+
 def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Generate a Docker Compose specification from Sushi Kitchen manifests"
     )
@@ -452,13 +653,11 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     parser.add_argument(
         "--environment",
         type=Path,
-        required=True,
         help="Environment template to apply (e.g. development.yml)",
     )
     parser.add_argument(
         "--network",
         type=Path,
-        required=True,
         help="Network profile to apply (e.g. open-research.yml)",
     )
     parser.add_argument(
@@ -467,13 +666,100 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         default=[],
         help="Service or bundle IDs to include in the generated Compose file",
     )
+    parser.add_argument(
+        "--budget",
+        help="Host budget such as cpu=4,memory=8G,disk=200G,vram=0; providers are "
+        "chosen to fit it and generation fails when the selection does not",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Report manifest cache hits and the YAML parsing time they saved",
+    )
+    matrix = parser.add_argument_group("matrix mode")
+    matrix.add_argument(
+        "--matrix",
+        action="store_true",
+        help="Generate every platter against every environment config and network profile",
+    )
+    matrix.add_argument(
+        "--environment-dir",
+        type=Path,
+        help="Directory of environment configs (default: templates/environment-configs next to the manifests)",
+    )
+    matrix.add_argument(
+        "--network-dir",
+        type=Path,
+        help="Directory of network profiles (default: templates/network-profiles next to the manifests)",
+    )
+    matrix.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("generated/matrix"),
+        help="Where matrix outputs and matrix-index.json are written",
+    )
+    matrix.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for matrix mode (default: CPU count)",
+    )
 
     args = parser.parse_args(argv)
+    if not args.matrix and (args.environment is None or args.network is None):
+        parser.error("--environment and --network are required unless --matrix is given")
+    if args.budget is not None:
+        if args.matrix:
+            parser.error("--budget cannot be combined with --matrix")
+        from resource_budget import HostBudget
+
+        try:
+            args.budget = HostBudget.parse(args.budget)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    try:
+        return _run(args)
+    finally:
+        if args.cache_stats:
+            from manifest_loader import report_stats
 
+            report_stats()
+
+
+def _run(args: argparse.Namespace) -> int:
     contracts_data = load_yaml(args.contracts)
     combos_data = load_yaml(args.combos)
     bento_data = load_yaml(args.bento)
     platters_data = load_yaml(args.platters)
+    graph = _compiled_graph(args)
+
+    if args.matrix:
+        templates_dir = args.contracts.resolve().parent.parent / "templates"
+        environment_dir = args.environment_dir or templates_dir / "environment-configs"
+        network_dir = args.network_dir or templates_dir / "network-profiles"
+        index = generate_matrix(
+            contracts_data,
+            combos_data,
+            bento_data,
+            platters_data,
+            environments=_load_template_dir(environment_dir),
+            networks=_load_template_dir(network_dir),
+            output_dir=args.output_dir,
+            platter_ids=args.select or None,
+            workers=args.workers,
+            graph=graph,
+        )
+        print(
+            f"Generated {index['combinations'] - index['failures']}/{index['combinations']} "
+            f"combinations in {index['total_seconds']:.2f}s with {index['workers']} workers "
+            f"-> {args.output_dir / MATRIX_INDEX_NAME}",
+            file=sys.stderr,
+        )
+        for entry in index["entries"]:
+            if "error" in entry:
+                print(f"Error: {entry['path']}: {entry['error']}", file=sys.stderr)
+        return 1 if index["failures"] else 0
+
     env_data = load_yaml(args.environment)
     network_data = load_yaml(args.network)
 
@@ -484,12 +770,23 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         platters=platters_data,
         env_template=env_data,
         network_profile=network_data,
+        graph=graph,
     )
     try:
-        compose_dict = resolver.build_compose(args.select)
+        service_ids = None
+        if args.budget is not None:
+            service_ids, report = resolver.resolve_within_budget(args.select, args.budget)
+            for line in report.describe():
+                print(f"Budget: {line}", file=sys.stderr)
+            if not report.fits:
+                print("Error: the selection does not fit the host budget", file=sys.stderr)
+                return 1
+        compose_dict = resolver.build_compose(args.select, service_ids)
     except ValueError as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
+    import yaml
+
     yaml.safe_dump(compose_dict, sys.stdout, sort_keys=False)
     return 0
 
@@ -0,0 +1,873 @@
+#!/usr/bin/env python3
+"""Compiled, integer-indexed view of the Sushi Kitchen manifests.
+
+The manifest YAML files describe services (contracts), capabilities and
+curated bundles (combos, bento boxes, platters) as nested dictionaries.
+Resolvers used to re-walk those dictionaries on every call.  This module
+compiles them once into a :class:`ManifestGraph`:
+
+* every service, capability and bundle ID is interned to an integer;
+* ``requires``/``suggests``/``provides``/``conflicts`` and bundle
+  membership are stored as compact CSR adjacency arrays;
+* reverse indexes (node → containing bundles, capability → providers,
+  service → dependents), each capability's preferred provider and a
+  conflict bitmask per service are precomputed;
+* :meth:`ManifestGraph.solve` picks capability providers against what is
+  already selected: an already-selected provider is reused and providers
+  in a declared conflict with the selection are avoided;
+* the compiled graph can be written to disk and loaded by later runs
+  without touching YAML, keyed by a digest of the source files;
+* :class:`ClosureIndex` memoizes bundle expansions and dependency
+  closures on top of the graph and invalidates only the affected entries
+  when a single service or bundle changes.
+
+``generate_compose.py``, ``scripts/generate-compose.py`` and the roll
+narrative generator all build on this object.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from array import array
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from manifest_loader import DEFAULT_CACHE_DIR, _cache_enabled_from_env, load_manifest
+
+KIND_UNKNOWN = 0
+KIND_SERVICE = 1
+KIND_CAPABILITY = 2
+KIND_COMBO = 3
+KIND_BENTO = 4
+KIND_PLATTER = 5
+
+BUNDLE_KINDS = frozenset({KIND_COMBO, KIND_BENTO, KIND_PLATTER})
+
+GRAPH_FORMAT_VERSION = 3
+MANIFEST_FILES = ("contracts.yml", "combos.yml", "bento-box.yml", "platters.yml")
+
+
+class Adjacency:
+    """Compressed sparse row adjacency: ``targets[offsets[i]:offsets[i + 1]]``."""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, offsets: array, targets: array) -> None:
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_lists(cls, rows: Sequence[Iterable[int]]) -> "Adjacency":
+        offsets = array("i", [0])
+        targets = array("i")
+        for row in rows:
+            targets.extend(row)
+            offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node: int) -> array:
+        if node >= len(self.offsets) - 1:
+            return array("i")
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def to_lists(self) -> List[List[int]]:
+        return [list(self[node]) for node in range(len(self))]
+
+    def pad(self, size: int) -> None:
+        """Append empty rows until there are *size* of them."""
+        missing = size - len(self)
+        if missing > 0:
+            self.offsets.extend([len(self.targets)] * missing)
+
+    def replace_row(self, node: int, row: Sequence[int]) -> None:
+        """Replace one row in place, shifting the offsets of the rows after it."""
+        start, end = self.offsets[node], self.offsets[node + 1]
+        self.targets[start:end] = array("i", row)
+        shift = len(row) - (end - start)
+        if shift:
+            for index in range(node + 1, len(self.offsets)):
+                self.offsets[index] += shift
+
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return value
+    if value is None:
+        return []
+    return [value]
+
+
+def _mask(nodes: Iterable[int]) -> int:
+    mask = 0
+    for node in nodes:
+        mask |= 1 << node
+    return mask
+
+
+def digest_manifest_dir(manifest_dir: Path) -> str:
+    """Return a sha256 digest over the core manifest files in *manifest_dir*."""
+    digest = hashlib.sha256()
+    for name in MANIFEST_FILES:
+        path = manifest_dir / name
+        digest.update(name.encode("utf-8"))
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ManifestGraph:
+    """Interned, adjacency-array representation of the manifest catalog."""
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.kinds = array("b")
+        self.source_digest = ""
+
+        # Relations taken straight from the manifests
+        self.requires = Adjacency.from_lists([])
+        self.suggests = Adjacency.from_lists([])
+        self.provides = Adjacency.from_lists([])
+        self.declared_conflicts = Adjacency.from_lists([])
+        self.declared_providers = Adjacency.from_lists([])
+        self.members = Adjacency.from_lists([])
+        self.optional_members = Adjacency.from_lists([])
+        self.default_providers = array("i")
+        self.conflict_groups: List[array] = []
+
+        # Derived by _rebuild_derived()
+        self.conflicts = Adjacency.from_lists([])
+        self.providers = Adjacency.from_lists([])
+        self.preferred_providers = array("i")
+        self.provider_candidates = Adjacency.from_lists([])
+        self.bundles_of = Adjacency.from_lists([])
+        self.dependents = Adjacency.from_lists([])
+        # Node bitsets (bit n = node n): services each service conflicts
+        # with, and the candidate providers of each capability
+        self.conflict_masks: List[int] = []
+        self.provider_masks: List[int] = []
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_manifests(
+        cls,
+        contracts: Mapping[str, Any],
+        combos: Mapping[str, Any],
+        bento: Mapping[str, Any],
+        platters: Mapping[str, Any],
+    ) -> "ManifestGraph":
+        """Compile parsed manifest documents into a graph."""
+        graph = cls()
+        contracts = contracts or {}
+        services: Mapping[str, Any] = contracts.get("services") or contracts.get("rolls") or {}
+        capabilities: Mapping[str, Any] = contracts.get("capabilities") or {}
+        dependency_resolution = contracts.get("dependency_resolution") or {}
+        default_providers: Mapping[str, str] = dependency_resolution.get("default_providers") or {}
+
+        bundle_specs: List[Tuple[int, Mapping[str, Any]]] = []
+        for combo in (combos or {}).get("combos", []) or []:
+            bundle_specs.append((KIND_COMBO, combo))
+        for box in (bento or {}).get("bento_boxes", []) or []:
+            bundle_specs.append((KIND_BENTO, box))
+        for platter in (platters or {}).get("platters", []) or []:
+            bundle_specs.append((KIND_PLATTER, platter))
+
+        # Intern declared nodes first so their kinds win over references.
+        for service_id in services:
+            graph._intern(service_id, KIND_SERVICE)
+        for cap_id in capabilities:
+            graph._intern(cap_id, KIND_CAPABILITY)
+        for kind, spec in bundle_specs:
+            graph._intern(spec["id"], kind)
+
+        rows: Dict[str, Dict[int, List[int]]] = {
+            name: {} for name in ("requires", "suggests", "provides", "declared_conflicts",
+                                  "declared_providers", "members", "optional_members")
+        }
+
+        for service_id, contract in services.items():
+            node = graph.index[service_id]
+            for field, refs in graph._service_rows(contract).items():
+                rows[field][node] = refs
+
+        for cap_id, cap_data in capabilities.items():
+            node = graph.index[cap_id]
+            providers = _as_list((cap_data or {}).get("providers"))
+            rows["declared_providers"][node] = [graph._intern_ref(provider) for provider in providers]
+
+        for kind, spec in bundle_specs:
+            node = graph.index[spec["id"]]
+            members, optional = graph._bundle_rows(kind, spec)
+            rows["members"][node] = members
+            rows["optional_members"][node] = optional
+
+        graph.conflict_groups = [
+            array("i", [graph._intern_ref(ref) for ref in _as_list((group or {}).get("services"))])
+            for group in _as_list(dependency_resolution.get("conflicts"))
+        ]
+
+        defaults = {
+            graph._intern_ref(cap_id): graph._intern_ref(provider)
+            for cap_id, provider in default_providers.items()
+        }
+
+        size = len(graph.ids)
+        for name, table in rows.items():
+            setattr(graph, name, Adjacency.from_lists([table.get(node, []) for node in range(size)]))
+        graph.default_providers = array("i", [defaults.get(node, -1) for node in range(size)])
+
+        graph._rebuild_derived()
+        return graph
+
+    @classmethod
+    def from_manifest_dir(cls, manifest_dir: Path) -> "ManifestGraph":
+        """Parse the core manifest files in *manifest_dir* and compile them."""
+        documents: List[Any] = []
+        for name in MANIFEST_FILES:
+            path = manifest_dir / name
+            documents.append((load_manifest(path) or {}) if path.exists() else {})
+        graph = cls.from_manifests(*documents)
+        graph.source_digest = digest_manifest_dir(manifest_dir)
+        return graph
+
+    @classmethod
+    def compile(
+        cls, manifest_dir: Path, cache_path: Optional[Path] = None
+    ) -> "ManifestGraph":
+        """Return the graph for *manifest_dir*, reusing a compiled copy on disk.
+
+        The on-disk copy is only used when its recorded source digest matches
+        the current manifest files; otherwise the YAML is parsed and the
+        cache rewritten (best effort; read-only locations are ignored).
+        ``SUSHI_MANIFEST_CACHE=0`` skips the on-disk copy entirely.
+        """
+        manifest_dir = Path(manifest_dir)
+        if not _cache_enabled_from_env():
+            return cls.from_manifest_dir(manifest_dir)
+        if cache_path is None:
+            cache_path = default_cache_path(manifest_dir)
+        digest = digest_manifest_dir(manifest_dir)
+        cached = cls.load(cache_path)
+        if cached is not None and cached.source_digest == digest:
+            return cached
+
+        graph = cls.from_manifest_dir(manifest_dir)
+        try:
+            graph.save(cache_path)
+        except OSError:
+            pass
+        return graph
+
+    def _intern(self, node_id: str, kind: int) -> int:
+        node = self.index.get(node_id)
+        if node is None:
+            node = len(self.ids)
+            self.ids.append(node_id)
+            self.index[node_id] = node
+            self.kinds.append(kind)
+        elif self.kinds[node] == KIND_UNKNOWN and kind != KIND_UNKNOWN:
+            self.kinds[node] = kind
+        return node
+
+    def _intern_ref(self, ref: str) -> int:
+        return self._intern(ref, KIND_CAPABILITY if ref.startswith("cap.") else KIND_UNKNOWN)
+
+    def _service_rows(self, contract: Optional[Mapping[str, Any]]) -> Dict[str, List[int]]:
+        contract = contract or {}
+        rows: Dict[str, List[int]] = {}
+        for field, row in (
+            ("requires", "requires"),
+            ("suggests", "suggests"),
+            ("provides", "provides"),
+            ("conflicts", "declared_conflicts"),
+        ):
+            refs = [ref for ref in _as_list(contract.get(field)) if isinstance(ref, str)]
+            rows[row] = [self._intern_ref(ref) for ref in refs]
+        return rows
+
+    def _bundle_rows(self, kind: int, spec: Mapping[str, Any]) -> Tuple[List[int], List[int]]:
+        if kind == KIND_PLATTER:
+            required = (
+                _as_list(spec.get("combos"))
+                + _as_list(spec.get("additional_services"))
+                + _as_list(spec.get("includes"))
+            )
+        else:
+            required = _as_list(spec.get("includes"))
+        return (
+            [self._intern_ref(item) for item in required],
+            [self._intern_ref(item) for item in _as_list(spec.get("optional"))],
+        )
+
+    def _pad_relations(self) -> None:
+        """Give base relations a row for every node interned after they were built."""
+        size = len(self.ids)
+        for name in ("requires", "suggests", "provides", "declared_conflicts",
+                     "declared_providers", "members", "optional_members"):
+            getattr(self, name).pad(size)
+        if len(self.default_providers) < size:
+            self.default_providers.extend([-1] * (size - len(self.default_providers)))
+
+    def _rebuild_derived(self) -> None:
+        """Recompute conflicts, providers and reverse indexes from the base relations."""
+        size = len(self.ids)
+        self._pad_relations()
+
+        # Conflicts: per-contract lists plus declared groups, made symmetric.
+        conflicts: List[List[int]] = [list(self.declared_conflicts[node]) for node in range(size)]
+        for node in range(size):
+            for other in self.declared_conflicts[node]:
+                conflicts[other].append(node)
+        for group in self.conflict_groups:
+            for left in group:
+                conflicts[left].extend(right for right in group if right != left)
+        self.conflicts = Adjacency.from_lists([list(dict.fromkeys(row)) for row in conflicts])
+
+        # Providers: the declared list, then services that list the capability
+        # under ``provides``.
+        providers: List[List[int]] = [list(self.declared_providers[node]) for node in range(size)]
+        for node in range(size):
+            if self.kinds[node] == KIND_SERVICE:
+                for cap in self.provides[node]:
+                    providers[cap].append(node)
+        self.providers = Adjacency.from_lists([list(dict.fromkeys(row)) for row in providers])
+
+        # Preferred provider: the default if it is a known service, otherwise
+        # the first declared provider that is.
+        self.preferred_providers = array("i", [-1] * size)
+        for node in range(size):
+            if self.kinds[node] != KIND_CAPABILITY:
+                continue
+            preferred = self.default_providers[node]
+            if preferred >= 0 and self.kinds[preferred] == KIND_SERVICE:
+                self.preferred_providers[node] = preferred
+                continue
+            for candidate in self.declared_providers[node]:
+                if self.kinds[candidate] == KIND_SERVICE:
+                    self.preferred_providers[node] = candidate
+                    break
+
+        # Provider candidates in preference order: the preferred provider, then
+        # the remaining known services that provide the capability.
+        candidates: List[List[int]] = [[] for _ in range(size)]
+        for node in range(size):
+            if self.kinds[node] != KIND_CAPABILITY:
+                continue
+            row = candidates[node]
+            if self.preferred_providers[node] >= 0:
+                row.append(self.preferred_providers[node])
+            row.extend(
+                provider for provider in self.providers[node]
+                if self.kinds[provider] == KIND_SERVICE and provider not in row
+            )
+        self.provider_candidates = Adjacency.from_lists(candidates)
+        self.provider_masks = [_mask(row) for row in candidates]
+        self.conflict_masks = [
+            _mask(other for other in self.conflicts[node] if self.kinds[other] == KIND_SERVICE)
+            if self.kinds[node] == KIND_SERVICE else 0
+            for node in range(size)
+        ]
+
+        bundles_of: List[List[int]] = [[] for _ in range(size)]
+        for node in range(size):
+            if self.kinds[node] not in BUNDLE_KINDS:
+                continue
+            for member in self.members[node]:
+                bundles_of[member].append(node)
+            for member in self.optional_members[node]:
+                bundles_of[member].append(node)
+        self.bundles_of = Adjacency.from_lists([list(dict.fromkeys(row)) for row in bundles_of])
+
+        # Dependents: services requiring a node directly, or requiring a
+        # capability (listed on the capability and on each of its providers).
+        dependents: List[List[int]] = [[] for _ in range(size)]
+        for node in range(size):
+            if self.kinds[node] != KIND_SERVICE:
+                continue
+            for target in self.requires[node]:
+                dependents[target].append(node)
+                if self.kinds[target] == KIND_CAPABILITY:
+                    for provider in self.providers[target]:
+                        dependents[provider].append(node)
+        self.dependents = Adjacency.from_lists([list(dict.fromkeys(row)) for row in dependents])
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def replace_service(self, service_id: str, contract: Mapping[str, Any]) -> int:
+        """Replace (or add) one service contract in place and return its node."""
+        node = self._intern(service_id, KIND_SERVICE)
+        rows = self._service_rows(contract)
+        self._pad_relations()
+        for name, row in rows.items():
+            getattr(self, name).replace_row(node, row)
+        self._rebuild_derived()
+        return node
+
+    def replace_bundle(self, kind: int, spec: Mapping[str, Any]) -> int:
+        """Replace (or add) one combo, bento box or platter and return its node."""
+        if kind not in BUNDLE_KINDS:
+            raise ValueError(f"Not a bundle kind: {kind}")
+        node = self._intern(spec["id"], kind)
+        members, optional = self._bundle_rows(kind, spec)
+        self._pad_relations()
+        self.members.replace_row(node, members)
+        self.optional_members.replace_row(node, optional)
+        self._rebuild_derived()
+        return node
+
+    def ancestors(self, nodes: Iterable[int]) -> Set[int]:
+        """Nodes whose closure may include any of *nodes* (including themselves)."""
+        seen: Set[int] = set()
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend(self.dependents[node])
+            stack.extend(self.bundles_of[node])
+            if self.kinds[node] == KIND_SERVICE:
+                # Consumers of a capability this service provides may pick it.
+                for cap in self.provides[node]:
+                    stack.extend(self.dependents[cap])
+        return seen
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Only builtins and arrays are pickled, so the file loads regardless of
+        # whether this module ran as ``__main__`` or was imported.
+        state: Dict[str, Any] = {"format_version": GRAPH_FORMAT_VERSION}
+        for key, value in self.__dict__.items():
+            if isinstance(value, Adjacency):
+                value = ("adjacency", value.offsets, value.targets)
+            state[key] = value
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as handle:
+            pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ManifestGraph"]:
+        """Load a graph written by :meth:`save`; ``None`` if missing or stale."""
+        try:
+            with Path(path).open("rb") as handle:
+                state = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.pop("format_version", None) != GRAPH_FORMAT_VERSION:
+            return None
+        graph = cls.__new__(cls)
+        for key, value in state.items():
+            if isinstance(value, tuple) and len(value) == 3 and value[0] == "adjacency":
+                value = Adjacency(value[1], value[2])
+            setattr(graph, key, value)
+        return graph
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def id_of(self, node_id: str) -> Optional[int]:
+        return self.index.get(node_id)
+
+    def kind_of(self, node_id: str) -> int:
+        node = self.index.get(node_id)
+        return KIND_UNKNOWN if node is None else self.kinds[node]
+
+    def is_service(self, node_id: str) -> bool:
+        return self.kind_of(node_id) == KIND_SERVICE
+
+    def is_bundle(self, node_id: str) -> bool:
+        return self.kind_of(node_id) in BUNDLE_KINDS
+
+    def names(self, nodes: Iterable[int]) -> List[str]:
+        return [self.ids[node] for node in nodes]
+
+    def nodes_of_kind(self, kind: int) -> List[int]:
+        return [node for node, node_kind in enumerate(self.kinds) if node_kind == kind]
+
+    def preferred_provider(self, capability: str) -> Optional[str]:
+        """Return the default (or first declared) service providing *capability*."""
+        node = self.index.get(capability)
+        if node is None:
+            return None
+        provider = self.preferred_providers[node]
+        return None if provider < 0 else self.ids[provider]
+
+    def choose_provider(
+        self,
+        capability: int,
+        selected: Set[int],
+        selected_mask: int = 0,
+        rank: Optional[Sequence[float]] = None,
+    ) -> int:
+        """Provider of *capability* given the services already *selected*.
+
+        An already-selected candidate is reused; otherwise the first candidate
+        (preferred provider first) that conflicts with nothing selected wins.
+        With *rank* (a value per node, lower is better) the best-ranked
+        non-conflicting candidate wins instead, ties going to the earlier one.
+        When every candidate conflicts, the preferred one is returned anyway.
+        Returns -1 for a capability without providers.
+        """
+        candidates = self.provider_candidates[capability]
+        if self.provider_masks[capability] & selected_mask:
+            for candidate in candidates:
+                if candidate in selected:
+                    return candidate
+        free = [candidate for candidate in candidates if not self.conflict_masks[candidate] & selected_mask]
+        if free:
+            return free[0] if rank is None else min(free, key=rank.__getitem__)
+        return candidates[0] if len(candidates) else -1
+
+    def solve(
+        self,
+        seeds: Iterable[int],
+        follow_suggests: bool = False,
+        strict: bool = True,
+        rank: Optional[Sequence[float]] = None,
+    ) -> Set[int]:
+        """Services needed by *seeds*, choosing capability providers as a whole.
+
+        Direct service requirements are forced and followed first; capability
+        requirements wait until nothing is forced, then get a provider from
+        :meth:`choose_provider` against everything selected so far.  With
+        *strict*, unresolvable requirements raise ``ValueError`` (as
+        :meth:`ClosureIndex.service_closure` does); otherwise unknown IDs are
+        kept as-is and capabilities without providers are skipped.  *rank* is
+        passed on to :meth:`choose_provider`.
+        """
+        selected: Set[int] = set()
+        mask = 0
+        stack = list(seeds)
+        pending: List[Tuple[int, int]] = []
+        next_pending = 0
+        while stack or next_pending < len(pending):
+            if not stack:
+                service, capability = pending[next_pending]
+                next_pending += 1
+                provider = self.choose_provider(capability, selected, mask, rank)
+                if provider >= 0:
+                    stack.append(provider)
+                elif strict:
+                    raise ValueError(
+                        f"No provider found for capability '{self.ids[capability]}' "
+                        f"required by '{self.ids[service]}'"
+                    )
+                continue
+
+            node = stack.pop()
+            if node in selected:
+                continue
+            selected.add(node)
+            if self.kinds[node] != KIND_SERVICE:
+                continue
+            mask |= 1 << node
+            requirements = list(self.requires[node])
+            if follow_suggests:
+                requirements.extend(self.suggests[node])
+            for requirement in requirements:
+                kind = self.kinds[requirement]
+                if kind == KIND_SERVICE:
+                    stack.append(requirement)
+                elif kind == KIND_CAPABILITY:
+                    pending.append((node, requirement))
+                elif strict:
+                    raise ValueError(
+                        f"Requirement '{self.ids[requirement]}' referenced by '{self.ids[node]}' "
+                        "does not match a service ID or capability"
+                    )
+                else:
+                    stack.append(requirement)
+        return selected
+
+    def mask_of(self, nodes: Iterable[int]) -> int:
+        return _mask(nodes)
+
+    def bundle_items(self, bundle: int, include_optional: bool = True) -> List[int]:
+        """Direct items of *bundle* (services or nested bundles)."""
+        items = list(self.members[bundle])
+        if include_optional:
+            items.extend(self.optional_members[bundle])
+        return items
+
+    def expand_bundle(
+        self, bundle: int, optional_kinds: Iterable[int] = BUNDLE_KINDS
+    ) -> List[int]:
+        """Expand *bundle* recursively into the service (or unknown) nodes it names.
+
+        Optional items are followed only for bundles whose kind is listed in
+        *optional_kinds*.
+        """
+        optional_kinds = frozenset(optional_kinds)
+        expanded: List[int] = []
+        stack = [bundle]
+        seen = {bundle}
+        while stack:
+            current = stack.pop()
+            for item in self.bundle_items(current, self.kinds[current] in optional_kinds):
+                if self.kinds[item] in BUNDLE_KINDS:
+                    if item not in seen:
+                        seen.add(item)
+                        stack.append(item)
+                else:
+                    expanded.append(item)
+        return expanded
+
+    def containing_bundles(self, node_id: str, kind: Optional[int] = None) -> List[str]:
+        """Bundles that list *node_id* directly, optionally filtered by kind."""
+        node = self.index.get(node_id)
+        if node is None:
+            return []
+        return [
+            self.ids[bundle]
+            for bundle in self.bundles_of[node]
+            if kind is None or self.kinds[bundle] == kind
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Memoized closures
+# ---------------------------------------------------------------------------
+class ClosureIndex:
+    """Memoized bundle expansions and dependency closures over a graph.
+
+    ``bundle_closure`` caches the leaf items a bundle expands to and
+    ``service_closure`` caches the set of services a service pulls in through
+    ``requires`` (capabilities resolve to their preferred provider).  Closures
+    computed later reuse earlier ones instead of re-walking shared subgraphs.
+    ``resolve`` caches whole selections; it falls back to the
+    conflict-aware :meth:`ManifestGraph.solve` when the plain union of
+    closures would contain a declared conflict or a redundant provider.
+
+    Manifest edits go through :meth:`update_service` / :meth:`update_bundle`,
+    which patch the graph and drop only the memoized entries whose closure
+    could contain the edited node.
+    """
+
+    def __init__(self, graph: ManifestGraph, optional_kinds: Iterable[int] = BUNDLE_KINDS) -> None:
+        self.graph = graph
+        self.optional_kinds = frozenset(optional_kinds)
+        self._bundles: Dict[Tuple[int, FrozenSet[int]], Tuple[int, ...]] = {}
+        self._services: Dict[int, FrozenSet[int]] = {}
+        # Whole selections; provider choices depend on the selection, so
+        # these are dropped on any invalidation
+        self._selections: Dict[Tuple[FrozenSet[str], FrozenSet[int]], FrozenSet[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.solved = 0
+
+    def __len__(self) -> int:
+        return len(self._bundles) + len(self._services)
+
+    def bundle_closure(self, bundle: int, optional_kinds: Optional[Iterable[int]] = None) -> Tuple[int, ...]:
+        """Leaf items of *bundle*, following optionals for *optional_kinds*."""
+        kinds = self.optional_kinds if optional_kinds is None else frozenset(optional_kinds)
+        key = (bundle, kinds)
+        cached = self._bundles.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        closure = tuple(self.graph.expand_bundle(bundle, kinds))
+        self._bundles[key] = closure
+        return closure
+
+    def service_closure(self, service: int) -> FrozenSet[int]:
+        """*service* plus every service it transitively requires.
+
+        Raises ``ValueError`` for requirements that are neither a known
+        service nor a capability with a provider; failures are not memoized.
+        """
+        cached = self._services.get(service)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        graph = self.graph
+        closure: Set[int] = set()
+        stack = [service]
+        while stack:
+            current = stack.pop()
+            if current in closure:
+                continue
+            known = self._services.get(current)
+            if known is not None:
+                # Shared dependency already resolved by an earlier call.
+                closure.update(known)
+                continue
+            closure.add(current)
+            for requirement in graph.requires[current]:
+                stack.append(self._requirement_target(current, requirement))
+
+        frozen = frozenset(closure)
+        self._services[service] = frozen
+        return frozen
+
+    def _requirement_target(self, service: int, requirement: int) -> int:
+        graph = self.graph
+        kind = graph.kinds[requirement]
+        if kind == KIND_SERVICE:
+            return requirement
+        name = graph.ids[requirement]
+        if name.startswith("cap."):
+            provider = graph.preferred_providers[requirement]
+            if provider < 0:
+                raise ValueError(
+                    f"No provider found for capability '{name}' required by '{graph.ids[service]}'"
+                )
+            return provider
+        raise ValueError(
+            f"Requirement '{name}' referenced by '{graph.ids[service]}' does not match a service ID or capability"
+        )
+
+    def resolve(self, selected: Iterable[str], optional_kinds: Optional[Iterable[int]] = None) -> Set[str]:
+        """Services needed by *selected* service and bundle IDs.
+
+        The union of the memoized closures is returned when it is already
+        consistent: no declared conflict inside it and at most one provider of
+        each required capability.  Otherwise providers are re-chosen for the
+        selection as a whole with :meth:`ManifestGraph.solve`, which reuses
+        selected providers and steers around conflicts.
+        """
+        selected = list(selected)
+        kinds = self.optional_kinds if optional_kinds is None else frozenset(optional_kinds)
+        key = (frozenset(selected), kinds)
+        cached = self._selections.get(key)
+        if cached is not None:
+            self.hits += 1
+            return set(cached)
+
+        graph = self.graph
+        leaves = self.leaves(selected, kinds)
+        resolved: Set[int] = set()
+        for leaf in leaves:
+            if leaf not in resolved:
+                resolved.update(self.service_closure(leaf))
+
+        if self._needs_solving(resolved):
+            self.solved += 1
+            # solve() picks providers in seed order; the cache key is a set
+            resolved = graph.solve(sorted(set(leaves)))
+        names = frozenset(graph.names(resolved))
+        self._selections[key] = names
+        return set(names)
+
+    def leaves(self, selected: Iterable[str], optional_kinds: Optional[Iterable[int]] = None) -> List[int]:
+        """Service nodes *selected* IDs stand for, with bundles expanded."""
+        graph = self.graph
+        leaves: List[int] = []
+        for item in selected:
+            node = graph.index.get(item)
+            if node is not None and graph.kinds[node] in BUNDLE_KINDS:
+                items: Iterable[Optional[int]] = self.bundle_closure(node, optional_kinds)
+            else:
+                items = (node,)
+            for leaf in items:
+                if leaf is None or graph.kinds[leaf] != KIND_SERVICE:
+                    name = item if leaf is None else graph.ids[leaf]
+                    raise ValueError(f"Unknown service or bundle ID: {name}")
+                leaves.append(leaf)
+        return leaves
+
+    def _needs_solving(self, resolved: Set[int]) -> bool:
+        graph = self.graph
+        mask = graph.mask_of(resolved)
+        for node in resolved:
+            if graph.conflict_masks[node] & mask:
+                return True
+            for requirement in graph.requires[node]:
+                if graph.kinds[requirement] == KIND_CAPABILITY:
+                    providers = graph.provider_masks[requirement] & mask
+                    if providers & (providers - 1):
+                        return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, nodes: Iterable[int]) -> int:
+        """Drop memoized closures that may include *nodes*; return how many."""
+        affected = self.graph.ancestors(nodes)
+        dropped = 0
+        for node in affected:
+            if self._services.pop(node, None) is not None:
+                dropped += 1
+        for key in [key for key in self._bundles if key[0] in affected]:
+            del self._bundles[key]
+            dropped += 1
+        self._selections.clear()
+        return dropped
+
+    def clear(self) -> None:
+        self._bundles.clear()
+        self._services.clear()
+        self._selections.clear()
+
+    def update_service(self, service_id: str, contract: Mapping[str, Any]) -> int:
+        """Replace one service contract and invalidate what depended on it."""
+        before = self.graph.id_of(service_id)
+        dropped = self.invalidate([before]) if before is not None else 0
+        node = self.graph.replace_service(service_id, contract)
+        return dropped + self.invalidate([node])
+
+    def update_bundle(self, kind: int, spec: Mapping[str, Any]) -> int:
+        """Replace one bundle definition and invalidate the bundles containing it."""
+        before = self.graph.id_of(spec["id"])
+        dropped = self.invalidate([before]) if before is not None else 0
+        node = self.graph.replace_bundle(kind, spec)
+        return dropped + self.invalidate([node])
+
+
+def default_cache_path(manifest_dir: Path) -> Path:
+    """Per-manifest-directory location of the compiled graph cache."""
+    key = hashlib.sha256(str(Path(manifest_dir).resolve()).encode("utf-8")).hexdigest()[:16]
+    return DEFAULT_CACHE_DIR / f"manifest-graph-{key}.pickle"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile Sushi Kitchen manifests into a manifest graph")
+    parser.add_argument(
+        "manifest_dir", type=Path, nargs="?", default=Path("docs/manifest/core"),
+        help="Directory containing contracts.yml, combos.yml, bento-box.yml and platters.yml",
+    )
+    parser.add_argument("--output", type=Path, help="Where to write the compiled graph (default: cache dir)")
+    args = parser.parse_args(argv)
+
+    graph = ManifestGraph.compile(args.manifest_dir, cache_path=args.output)
+    counts = {
+        label: len(graph.nodes_of_kind(kind))
+        for label, kind in (
+            ("services", KIND_SERVICE),
+            ("capabilities", KIND_CAPABILITY),
+            ("combos", KIND_COMBO),
+            ("bento_boxes", KIND_BENTO),
+            ("platters", KIND_PLATTER),
+            ("unresolved", KIND_UNKNOWN),
+        )
+    }
+    print(f"Compiled {len(graph)} nodes from {args.manifest_dir} (digest {graph.source_digest[:12]})")
+    for label, count in counts.items():
+        print(f"  {label}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Whole-catalog static analysis of the Sushi Kitchen manifests.
+
+Resolvers report catalog mistakes one selection at a time, and only the
+first one they hit.  This linter compiles ``contracts.yml``, ``combos.yml``,
+``bento-box.yml`` and ``platters.yml`` into a :class:`ManifestGraph` and
+checks everything in one pass:
+
+* ``dependency-cycle``: strongly connected components of the service
+  dependency graph (Tarjan), where a capability requirement points at the
+  provider resolution would pick; cycles that only exist through other
+  providers of a capability are warnings;
+* ``unresolved-requirement``: a ``requires`` entry that names neither a
+  service nor a capability;
+* ``capability-without-provider``: a capability no known service provides
+  (an error when something requires it);
+* ``missing-bundle-member``: a combo, bento box or platter item that is not
+  a service or bundle;
+* ``platter-conflict``: a platter whose dependency closure contains both
+  services of a declared conflict (``dependency_resolution.conflicts`` or a
+  contract's ``conflicts``); pairs pulled in only by optional items are
+  warnings;
+* ``unknown-conflict-service``: a conflict group naming an unknown service.
+
+Tarjan emits components sinks-first, so the same pass builds each
+service's closure as an integer bitset, which keeps the platter check linear
+in the size of the graph plus its output.
+
+    python manifest_lint.py [docs/manifest/core] [--json] [--fail-on warning] [--allow CODE]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from manifest_graph import (
+    BUNDLE_KINDS,
+    KIND_CAPABILITY,
+    KIND_PLATTER,
+    KIND_SERVICE,
+    KIND_UNKNOWN,
+    ManifestGraph,
+)
+
+ERROR = "error"
+WARNING = "warning"
+SEVERITIES = (ERROR, WARNING)
+
+KIND_LABELS = {KIND_SERVICE: "service", KIND_CAPABILITY: "capability", KIND_UNKNOWN: "unknown ID"}
+
+
+class Finding(NamedTuple):
+    """One lint result; ``subject`` is the catalog ID the finding is about."""
+
+    code: str
+    severity: str
+    subject: str
+    message: str
+    related: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {**self._asdict(), "related": list(self.related)}
+
+
+def strongly_connected_components(edges: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Tarjan's algorithm, iteratively; components come out sinks-first."""
+    size = len(edges)
+    index = [-1] * size
+    lowlink = [0] * size
+    on_stack = [False] * size
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(size):
+        if index[root] >= 0:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            successors = edges[node]
+            while edge < len(successors):
+                target = successors[edge]
+                edge += 1
+                if index[target] < 0:
+                    work.append((node, edge))
+                    work.append((target, 0))
+                    break
+                if on_stack[target]:
+                    lowlink[node] = min(lowlink[node], index[target])
+            else:
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+
+def _is_cycle(component: Sequence[int], edges: Sequence[Sequence[int]]) -> bool:
+    return len(component) > 1 or component[0] in edges[component[0]]
+
+
+def _summarize(names: Sequence[str], limit: int = 8) -> str:
+    if len(names) <= limit:
+        return ", ".join(names)
+    return f"{', '.join(names[:limit])} and {len(names) - limit} more"
+
+
+class CatalogLinter:
+    """Runs every check over one compiled graph."""
+
+    def __init__(self, graph: ManifestGraph) -> None:
+        self.graph = graph
+        self.findings: List[Finding] = []
+        self._closures: List[int] = []
+
+    def run(self) -> List[Finding]:
+        self.findings = []
+        self._check_cycles(*self._dependency_edges())
+        self._check_capabilities()
+        self._check_bundles()
+        self._check_conflict_groups()
+        self._check_platter_conflicts()
+        self.findings.sort(key=lambda finding: (SEVERITIES.index(finding.severity), finding.code, finding.subject))
+        return self.findings
+
+    def _add(self, code: str, severity: str, subject: str, message: str, related: Iterable[str] = ()) -> None:
+        self.findings.append(Finding(code, severity, subject, message, tuple(related)))
+
+    # ------------------------------------------------------------------
+    # Dependencies
+    # ------------------------------------------------------------------
+    def _dependency_edges(self) -> Tuple[List[List[int]], List[List[int]]]:
+        """Service -> service edges: as resolution follows them, and via any provider."""
+        graph = self.graph
+        resolved: List[List[int]] = [[] for _ in range(len(graph))]
+        possible: List[List[int]] = [[] for _ in range(len(graph))]
+        for node in graph.nodes_of_kind(KIND_SERVICE):
+            for requirement in graph.requires[node]:
+                kind = graph.kinds[requirement]
+                if kind == KIND_SERVICE:
+                    resolved[node].append(requirement)
+                    possible[node].append(requirement)
+                elif kind == KIND_CAPABILITY:
+                    provider = graph.preferred_providers[requirement]
+                    if provider >= 0:
+                        resolved[node].append(provider)
+                    possible[node].extend(
+                        candidate for candidate in graph.providers[requirement]
+                        if graph.kinds[candidate] == KIND_SERVICE
+                    )
+                else:
+                    self._add(
+                        "unresolved-requirement", ERROR, graph.ids[node],
+                        f"'{graph.ids[node]}' requires '{graph.ids[requirement]}', "
+                        "which is neither a service nor a capability",
+                        [graph.ids[requirement]],
+                    )
+        return resolved, possible
+
+    def _check_cycles(self, resolved: List[List[int]], possible: List[List[int]]) -> None:
+        graph = self.graph
+        closures = [0] * len(graph)
+        cyclic = set()
+        for component in strongly_connected_components(resolved):
+            bits = 0
+            for member in component:
+                bits |= 1 << member
+            for member in component:
+                for target in resolved[member]:
+                    bits |= closures[target]
+            for member in component:
+                closures[member] = bits
+
+            if _is_cycle(component, resolved):
+                cyclic.update(component)
+                names = sorted(graph.names(component))
+                self._add("dependency-cycle", ERROR, names[0], f"Dependency cycle: {_summarize(names)}", names)
+        self._closures = closures
+
+        for component in strongly_connected_components(possible):
+            if _is_cycle(component, possible) and not cyclic.issuperset(component):
+                names = sorted(graph.names(component))
+                self._add(
+                    "dependency-cycle", WARNING, names[0],
+                    f"Dependency cycle through alternative capability providers: {_summarize(names)}",
+                    names,
+                )
+
+    def _check_capabilities(self) -> None:
+        graph = self.graph
+        required_by: Dict[int, List[str]] = {}
+        for node in graph.nodes_of_kind(KIND_SERVICE):
+            for requirement in graph.requires[node]:
+                required_by.setdefault(requirement, []).append(graph.ids[node])
+
+        for node in graph.nodes_of_kind(KIND_CAPABILITY):
+            if graph.preferred_providers[node] >= 0:
+                continue
+            capability = graph.ids[node]
+            requirers = sorted(required_by.get(node, []))
+            if requirers:
+                self._add(
+                    "capability-without-provider", ERROR, capability,
+                    f"No service provides '{capability}', required by {', '.join(requirers)}",
+                    requirers,
+                )
+            else:
+                self._add(
+                    "capability-without-provider", WARNING, capability,
+                    f"No service provides '{capability}'",
+                )
+
+    # ------------------------------------------------------------------
+    # Bundles
+    # ------------------------------------------------------------------
+    def _check_bundles(self) -> None:
+        graph = self.graph
+        for node, kind in enumerate(graph.kinds):
+            if kind not in BUNDLE_KINDS:
+                continue
+            for members, severity, label in (
+                (graph.members[node], ERROR, "item"),
+                (graph.optional_members[node], WARNING, "optional item"),
+            ):
+                for member in members:
+                    member_kind = graph.kinds[member]
+                    if member_kind == KIND_SERVICE or member_kind in BUNDLE_KINDS:
+                        continue
+                    self._add(
+                        "missing-bundle-member", severity, graph.ids[node],
+                        f"'{graph.ids[node]}' lists {label} '{graph.ids[member]}', "
+                        f"which is a {KIND_LABELS[member_kind]}, not a service or bundle",
+                        [graph.ids[member]],
+                    )
+
+    def _check_conflict_groups(self) -> None:
+        graph = self.graph
+        for group in graph.conflict_groups:
+            for member in group:
+                if graph.kinds[member] != KIND_SERVICE:
+                    names = graph.names(group)
+                    self._add(
+                        "unknown-conflict-service", WARNING, graph.ids[member],
+                        f"Conflict group {', '.join(names)} names unknown service '{graph.ids[member]}'",
+                        names,
+                    )
+
+    def _closure_of(self, leaves: Iterable[int]) -> int:
+        bits = 0
+        for leaf in leaves:
+            if self.graph.kinds[leaf] == KIND_SERVICE:
+                bits |= self._closures[leaf]
+        return bits
+
+    def _conflict_pairs(self, bits: int) -> List[Tuple[int, int]]:
+        graph = self.graph
+        pairs = []
+        remaining = bits
+        while remaining:
+            low = remaining & -remaining
+            node = low.bit_length() - 1
+            remaining ^= low
+            for other in graph.conflicts[node]:
+                if other > node and bits >> other & 1:
+                    pairs.append((node, other))
+        return pairs
+
+    def _check_platter_conflicts(self) -> None:
+        graph = self.graph
+        for platter in graph.nodes_of_kind(KIND_PLATTER):
+            required = self._closure_of(graph.expand_bundle(platter, ()))
+            full = self._closure_of(graph.expand_bundle(platter, BUNDLE_KINDS))
+            required_pairs = set(self._conflict_pairs(required))
+            for pair in self._conflict_pairs(full):
+                names = graph.names(pair)
+                if pair in required_pairs:
+                    severity, via = ERROR, ""
+                else:
+                    severity, via = WARNING, " through optional items"
+                self._add(
+                    "platter-conflict", severity, graph.ids[platter],
+                    f"'{graph.ids[platter]}' pulls in conflicting services {names[0]} and {names[1]}{via}",
+                    names,
+                )
+
+
+def lint_graph(graph: ManifestGraph) -> List[Finding]:
+    """All findings for *graph*, errors first."""
+    return CatalogLinter(graph).run()
+
+
+def lint_manifest_dir(manifest_dir: Path) -> List[Finding]:
+    """Compile the manifests in *manifest_dir* (reusing the graph cache) and lint them."""
+    return lint_graph(ManifestGraph.compile(Path(manifest_dir)))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the whole Sushi Kitchen catalog for consistency")
+    parser.add_argument(
+        "manifest_dir", type=Path, nargs="?", default=Path("docs/manifest/core"),
+        help="Directory containing contracts.yml, combos.yml, bento-box.yml and platters.yml",
+    )
+    parser.add_argument("--json", action="store_true", help="Print findings as JSON.")
+    parser.add_argument(
+        "--fail-on", choices=SEVERITIES, default=ERROR,
+        help="Exit 1 when a finding of this severity (or worse) is reported (default: error).",
+    )
+    parser.add_argument(
+        "--allow", action="append", default=[], metavar="CODE",
+        help="Report findings with this code without failing on them (repeatable).",
+    )
+    args = parser.parse_args(argv)
+
+    if not (args.manifest_dir / "contracts.yml").exists():
+        print(f"Error: no contracts.yml in '{args.manifest_dir}'", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    findings = lint_manifest_dir(args.manifest_dir)
+    elapsed = time.perf_counter() - started
+
+    failing = SEVERITIES[: SEVERITIES.index(args.fail_on) + 1]
+    counts = {severity: sum(1 for finding in findings if finding.severity == severity) for severity in SEVERITIES}
+    if args.json:
+        import json
+
+        print(json.dumps({
+            "manifest_dir": str(args.manifest_dir),
+            "seconds": round(elapsed, 4),
+            "counts": counts,
+            "findings": [finding.to_dict() for finding in findings],
+        }, indent=2))
+    else:
+        for finding in findings:
+            print(f"{finding.severity}: [{finding.code}] {finding.message}")
+        print(
+            f"{counts[ERROR]} error(s), {counts[WARNING]} warning(s) in {args.manifest_dir} ({elapsed * 1000:.0f} ms)",
+            file=sys.stderr,
+        )
+    return 1 if any(finding.severity in failing and finding.code not in args.allow for finding in findings) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Shared, cached loading of Sushi Kitchen manifest YAML.
+
+Every tool that reads manifests (the compose generators, the API bundle
+builder, the JSON exporter, the roll narrative generator) goes through
+:func:`load_manifest`.  It:
+
+* parses with libyaml's ``CSafeLoader`` when PyYAML was built against it,
+  falling back to the pure-Python ``SafeLoader``;
+* stores the parsed structure as a pickle under the cache directory, keyed
+  by the file path and verified against the sha256 of its contents, so a
+  later run over unchanged files skips YAML parsing (and importing PyYAML)
+  entirely;
+* keeps the pickled bytes of each file's latest version in memory as well,
+  so repeated loads within a process hand out fresh, independent copies
+  without re-reading the cache.
+
+Set ``SUSHI_MANIFEST_CACHE=0`` to bypass the on-disk cache and
+``SUSHI_MANIFEST_CACHE_DIR`` to move it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("SUSHI_MANIFEST_CACHE_DIR")
+    or Path.home() / ".cache" / "sushi-kitchen"
+)
+
+
+def _cache_enabled_from_env() -> bool:
+    return os.environ.get("SUSHI_MANIFEST_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def yaml_safe_loader() -> Any:
+    """Return the fastest available PyYAML safe loader class."""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class LoadStats:
+    """Counters describing what the loader did and how long it took."""
+
+    __slots__ = ("parsed", "disk_hits", "memory_hits", "parse_seconds", "load_seconds", "saved_seconds")
+
+    def __init__(self) -> None:
+        self.parsed = 0
+        self.disk_hits = 0
+        self.memory_hits = 0
+        self.parse_seconds = 0.0
+        self.load_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def summary(self) -> str:
+        hits = self.disk_hits + self.memory_hits
+        return (
+            f"manifest cache: {hits} hit(s) ({self.memory_hits} in memory), {self.parsed} parsed "
+            f"in {self.parse_seconds * 1000:.1f} ms; cached loads took {self.load_seconds * 1000:.1f} ms, "
+            f"saving ~{self.saved_seconds * 1000:.1f} ms of YAML parsing"
+        )
+
+
+class ManifestLoader:
+    """Parse YAML files through an in-memory and on-disk pickle cache."""
+
+    def __init__(self, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR, use_disk_cache: Optional[bool] = None) -> None:
+        if use_disk_cache is None:
+            use_disk_cache = _cache_enabled_from_env()
+        self.cache_dir = Path(cache_dir) / "yaml" if cache_dir is not None and use_disk_cache else None
+        # (path, all_documents) -> (sha256, pickled data, seconds the original
+        # parse took); like the disk cache, only the latest content is kept
+        self._memory: Dict[Tuple[str, bool], Tuple[str, bytes, float]] = {}
+        self.stats = LoadStats()
+
+    def load(self, path: Path, all_documents: bool = False) -> Any:
+        """Load the first YAML document in *path* (or a list of all of them)."""
+        path = Path(path)
+        return self.load_bytes(path.read_bytes(), path, all_documents=all_documents)
+
+    def load_bytes(self, data: bytes, path: Path, all_documents: bool = False) -> Any:
+        """Parse *data*, already read from *path*, through the cache."""
+        key_path = str(Path(path).resolve())
+        digest = hashlib.sha256(data).hexdigest()
+        memo_key = (key_path, all_documents)
+
+        started = time.perf_counter()
+        memo = self._memory.get(memo_key)
+        if memo is not None and memo[0] == digest:
+            result = pickle.loads(memo[1])
+            self._record_hit(memo[2], started, memory=True)
+            return result
+
+        cache_file = self._cache_file(key_path, all_documents)
+        entry = self._read_cache(cache_file, key_path, digest)
+        if entry is not None:
+            payload, parse_seconds = entry
+            result = pickle.loads(payload)
+            self._memory[memo_key] = (digest, payload, parse_seconds)
+            self._record_hit(parse_seconds, started, memory=False)
+            return result
+
+        result = self._parse(data, all_documents)
+        parse_seconds = time.perf_counter() - started
+        self.stats.parsed += 1
+        self.stats.parse_seconds += parse_seconds
+
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._memory[memo_key] = (digest, payload, parse_seconds)
+        self._write_cache(cache_file, key_path, digest, payload, parse_seconds)
+        return result
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _parse(data: bytes, all_documents: bool) -> Any:
+        import yaml
+
+        text = data.decode("utf-8")
+        loader = yaml_safe_loader()
+        if all_documents:
+            return list(yaml.load_all(text, Loader=loader))
+        return yaml.load(text, Loader=loader)
+
+    def _record_hit(self, parse_seconds: float, started: float, memory: bool) -> None:
+        elapsed = time.perf_counter() - started
+        if memory:
+            self.stats.memory_hits += 1
+        else:
+            self.stats.disk_hits += 1
+        self.stats.load_seconds += elapsed
+        self.stats.saved_seconds += max(0.0, parse_seconds - elapsed)
+
+    def _cache_file(self, key_path: str, all_documents: bool) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        name = hashlib.sha256(f"{key_path}\0{int(all_documents)}".encode("utf-8")).hexdigest()[:24]
+        return self.cache_dir / f"{name}.pickle"
+
+    @staticmethod
+    def _read_cache(cache_file: Optional[Path], key_path: str, digest: str) -> Optional[Tuple[bytes, float]]:
+        if cache_file is None:
+            return None
+        try:
+            with cache_file.open("rb") as handle:
+                header = pickle.load(handle)
+                if (
+                    not isinstance(header, dict)
+                    or header.get("version") != CACHE_FORMAT_VERSION
+                    or header.get("path") != key_path
+                    or header.get("sha256") != digest
+                ):
+                    return None
+                return handle.read(), float(header.get("parse_seconds", 0.0))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    @staticmethod
+    def _write_cache(
+        cache_file: Optional[Path], key_path: str, digest: str, payload: bytes, parse_seconds: float
+    ) -> None:
+        if cache_file is None:
+            return
+        header = {
+            "version": CACHE_FORMAT_VERSION,
+            "path": key_path,
+            "sha256": digest,
+            "parse_seconds": parse_seconds,
+        }
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with tmp_path.open("wb") as handle:
+                pickle.dump(header, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                handle.write(payload)
+            os.replace(tmp_path, cache_file)
+        except OSError:
+            # Read-only home or full disk: caching is best effort.
+            pass
+
+
+_default_loader: Optional[ManifestLoader] = None
+
+
+def default_loader() -> ManifestLoader:
+    """Process-wide loader shared by all manifest tools."""
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = ManifestLoader()
+    return _default_loader
+
+
+def load_manifest(path: Path) -> Any:
+    """Load the first YAML document in *path* through the shared cache."""
+    return default_loader().load(path)
+
+
+def load_manifest_documents(path: Path) -> List[Any]:
+    """Load every YAML document in *path* through the shared cache."""
+    return default_loader().load(path, all_documents=True)
+
+
+def report_stats(stream: TextIO = sys.stderr) -> None:
+    """Write a one-line summary of the shared loader's work to *stream*."""
+    print(default_loader().stats.summary(), file=stream)
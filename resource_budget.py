@@ -0,0 +1,239 @@
+"""Host resource budgets for resolved service selections.
+
+Service contracts declare ``resource_requirements`` (``cpu_cores``,
+``memory_mb``, ``storage_gb``, ``gpu_memory_mb``) and platters declare
+aggregate requirements in the same spirit.  A :class:`HostBudget` describes
+what a target host offers; :class:`ResourceModel` turns the contracts into
+per-node usage so the resolver can rank alternative capability providers by
+cost and report whether the final selection fits, and by how much.
+
+``dependency_resolution.prefer_lightweight`` makes the cheapest provider win
+(cost is each requirement as a fraction of the budget, summed); without it
+the preferred provider wins unless it cannot fit on its own.  Services listed
+under ``scaling_rules.gpu-services`` need VRAM even when their contract does
+not say how much.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from manifest_graph import KIND_SERVICE, ManifestGraph
+
+RESOURCES = ("cpu_cores", "memory_mb", "storage_gb", "gpu_memory_mb")
+UNITS = {"cpu_cores": "cores", "memory_mb": "MB", "storage_gb": "GB", "gpu_memory_mb": "MB"}
+GPU_RULE = "gpu-services"
+
+# --budget keys; sizes take an M/G/T suffix (memory and VRAM default to MB,
+# disk to GB)
+_BUDGET_KEYS = {
+    "cpu": "cpu_cores",
+    "cpus": "cpu_cores",
+    "cores": "cpu_cores",
+    "cpu_cores": "cpu_cores",
+    "memory": "memory_mb",
+    "mem": "memory_mb",
+    "ram": "memory_mb",
+    "memory_mb": "memory_mb",
+    "disk": "storage_gb",
+    "storage": "storage_gb",
+    "storage_gb": "storage_gb",
+    "vram": "gpu_memory_mb",
+    "gpu": "gpu_memory_mb",
+    "gpu_memory_mb": "gpu_memory_mb",
+}
+_SIZE_IN_MB = {"m": 1, "mb": 1, "g": 1024, "gb": 1024, "t": 1024 ** 2, "tb": 1024 ** 2}
+_QUANTITY = re.compile(r"^\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[a-zA-Z]*)\s*$")
+
+# Platter resource_requirements field -> (resource, factor to its unit)
+_PLATTER_FIELDS = {
+    "cpu_cores": ("cpu_cores", 1),
+    "memory_gb": ("memory_mb", 1024),
+    "storage_gb": ("storage_gb", 1),
+    "gpu_vram_gb": ("gpu_memory_mb", 1024),
+}
+
+
+def _quantity(resource: str, text: str) -> float:
+    match = _QUANTITY.match(text)
+    if not match:
+        raise ValueError(f"Invalid amount for {resource}: {text!r}")
+    value = float(match.group("value"))
+    unit = match.group("unit").lower()
+    if resource == "cpu_cores":
+        if unit:
+            raise ValueError(f"CPU cores take no unit: {text!r}")
+        return value
+    if not unit:
+        return value
+    if unit not in _SIZE_IN_MB:
+        raise ValueError(f"Unknown size unit in {text!r}")
+    megabytes = value * _SIZE_IN_MB[unit]
+    return megabytes / 1024 if resource == "storage_gb" else megabytes
+
+
+def _format(resource: str, amount: float) -> str:
+    return f"{amount:g} {UNITS[resource]}"
+
+
+class HostBudget(NamedTuple):
+    """Resources a target host offers; ``None`` means unconstrained."""
+
+    cpu_cores: Optional[float] = None
+    memory_mb: Optional[float] = None
+    storage_gb: Optional[float] = None
+    gpu_memory_mb: Optional[float] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "HostBudget":
+        """Parse ``cpu=4,memory=8G,disk=200G,vram=0`` style budgets."""
+        values: Dict[str, float] = {}
+        for part in filter(None, (part.strip() for part in text.split(","))):
+            key, separator, amount = part.partition("=")
+            resource = _BUDGET_KEYS.get(key.strip().lower())
+            if not separator or resource is None:
+                raise ValueError(f"Invalid budget entry {part!r}; expected one of cpu, memory, disk, vram")
+            values[resource] = _quantity(resource, amount)
+        return cls(**values)
+
+    @classmethod
+    def from_platter(cls, requirements: Mapping[str, Any]) -> "HostBudget":
+        """The aggregate requirements a platter declares, as a budget."""
+        values: Dict[str, float] = {}
+        for field, (resource, factor) in _PLATTER_FIELDS.items():
+            if isinstance(requirements.get(field), (int, float)):
+                values[resource] = float(requirements[field]) * factor
+        return cls(**values)
+
+    def shortfall(self, needed: "HostBudget") -> List[str]:
+        """Resources where *needed* asks for more than this budget offers."""
+        problems = []
+        for resource in RESOURCES:
+            available, wanted = getattr(self, resource), getattr(needed, resource)
+            if available is not None and wanted is not None and wanted > available:
+                problems.append(f"{resource} {_format(resource, wanted)} > {_format(resource, available)}")
+        return problems
+
+
+class BudgetReport(NamedTuple):
+    """How a resolved selection compares with a :class:`HostBudget`."""
+
+    budget: HostBudget
+    used: Dict[str, float]
+    gpu_services: Tuple[str, ...]
+    problems: Tuple[str, ...]
+    warnings: Tuple[str, ...] = ()
+
+    @property
+    def fits(self) -> bool:
+        return not self.problems
+
+    @property
+    def headroom(self) -> Dict[str, Optional[float]]:
+        """Spare amount per resource (negative when over budget)."""
+        return {
+            resource: None if getattr(self.budget, resource) is None
+            else getattr(self.budget, resource) - self.used[resource]
+            for resource in RESOURCES
+        }
+
+    def describe(self) -> List[str]:
+        lines = []
+        for resource, spare in self.headroom.items():
+            used = _format(resource, self.used[resource])
+            if spare is None:
+                lines.append(f"{resource}: {used} (no limit)")
+            else:
+                state = f"{spare:g} spare" if spare >= 0 else f"{-spare:g} over"
+                lines.append(f"{resource}: {used} of {_format(resource, getattr(self.budget, resource))} ({state})")
+        return lines + list(self.problems) + [f"Warning: {warning}" for warning in self.warnings]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fits": self.fits,
+            "budget": self.budget._asdict(),
+            "used": dict(self.used),
+            "headroom": self.headroom,
+            "gpu_services": list(self.gpu_services),
+            "problems": list(self.problems),
+            "warnings": list(self.warnings),
+        }
+
+
+class ResourceModel:
+    """Per-node resource usage of a graph's services, from their contracts."""
+
+    def __init__(
+        self,
+        graph: ManifestGraph,
+        services: Mapping[str, Mapping[str, Any]],
+        dependency_resolution: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        rules = dependency_resolution or {}
+        self.graph = graph
+        self.prefer_lightweight = bool(rules.get("prefer_lightweight", False))
+        gpu_rule = (rules.get("scaling_rules") or {}).get(GPU_RULE) or {}
+        gpu_ids = set(gpu_rule.get("services") or [])
+
+        self.usage: List[Tuple[float, ...]] = []
+        self.gpu: List[bool] = []
+        for node, node_id in enumerate(graph.ids):
+            contract = services.get(node_id) if graph.kinds[node] == KIND_SERVICE else None
+            requirements = (contract or {}).get("resource_requirements") or {}
+            if not isinstance(requirements, Mapping):
+                requirements = {}
+            usage = tuple(
+                float(requirements[resource]) if isinstance(requirements.get(resource), (int, float)) else 0.0
+                for resource in RESOURCES
+            )
+            self.usage.append(usage)
+            self.gpu.append(contract is not None and (node_id in gpu_ids or usage[3] > 0))
+
+    def cost(self, node: int, budget: HostBudget) -> float:
+        """*node*'s requirements as fractions of *budget*, summed.
+
+        Infinite when the node alone cannot fit, including GPU services on a
+        host without VRAM; unconstrained resources cost nothing.
+        """
+        if self.gpu[node] and budget.gpu_memory_mb == 0:
+            return math.inf
+        total = 0.0
+        for needed, available in zip(self.usage[node], budget):
+            if available is None or not needed:
+                continue
+            if needed > available:
+                return math.inf
+            total += needed / available
+        return total
+
+    def rank(self, budget: HostBudget) -> List[float]:
+        """Provider ranking for :meth:`ManifestGraph.choose_provider`."""
+        costs = [self.cost(node, budget) for node in range(len(self.usage))]
+        if self.prefer_lightweight:
+            return costs
+        # Keep the catalog's preference order among providers that fit at all
+        return [0.0 if cost < math.inf else math.inf for cost in costs]
+
+    def report(
+        self, nodes: Iterable[int], budget: HostBudget, warnings: Sequence[str] = ()
+    ) -> BudgetReport:
+        nodes = sorted(nodes)
+        used = {resource: sum(self.usage[node][column] for node in nodes) for column, resource in enumerate(RESOURCES)}
+        gpu_services = tuple(self.graph.ids[node] for node in nodes if self.gpu[node])
+
+        no_gpu = budget.gpu_memory_mb == 0
+        problems = []
+        for resource in RESOURCES:
+            available = getattr(budget, resource)
+            if resource == "gpu_memory_mb" and no_gpu and gpu_services:
+                continue  # reported below, by service
+            if available is not None and used[resource] > available:
+                problems.append(
+                    f"Needs {_format(resource, used[resource])} of {resource} but the budget has "
+                    f"{_format(resource, available)} ({used[resource] - available:g} over)"
+                )
+        if gpu_services and no_gpu:
+            problems.append(f"GPU services need VRAM but the budget has none: {', '.join(gpu_services)}")
+        return BudgetReport(budget, used, gpu_services, tuple(problems), tuple(warnings))
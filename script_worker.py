@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Long-lived worker mode for the command-line scripts.
+
+A script started with ``--worker`` as its only argument imports once and then
+serves calls over a JSON-lines protocol instead of exiting after one run:
+
+* on start it writes ``{"ready": true, "script": ..., "pid": ...}``;
+* each request line is ``{"id": ..., "argv": [...]}`` and runs the script's
+  ``main(argv)`` exactly as ``script.py *argv`` would;
+* each response line is ``{"id": ..., "returncode": ..., "stdout": ...,
+  "stderr": ...}`` with everything the call printed.
+
+Module-level state (imported libraries, the manifest loader's in-memory
+cache) survives between calls, which is the point: a call costs one pipe
+round-trip instead of interpreter start-up plus imports.  The scripts stay
+independently runnable; without ``--worker`` nothing changes.
+"""
+
+from __future__ import annotations
+
+# Every script imports this module on start-up, worker mode or not, so the
+# protocol's own imports are deferred to the functions that need them.
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO
+
+WORKER_FLAG = "--worker"
+
+MainFunction = Callable[[Optional[List[str]]], Any]
+
+
+def worker_requested(argv: Optional[Sequence[str]] = None) -> bool:
+    """Return True when the script was started as ``script.py --worker``."""
+    argv = sys.argv[1:] if argv is None else argv
+    return list(argv) == [WORKER_FLAG]
+
+
+def run_call(main: MainFunction, argv: List[str]) -> Dict[str, Any]:
+    """Run ``main(argv)`` with its output captured, mapping exits to return codes."""
+    import io
+    import traceback
+    from contextlib import redirect_stderr, redirect_stdout
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            result = main(argv)
+            if isinstance(result, int):
+                returncode = result
+        except SystemExit as exc:
+            if exc.code is None:
+                returncode = 0
+            elif isinstance(exc.code, int):
+                returncode = exc.code
+            else:
+                # ``raise SystemExit("message")`` prints the message and exits 1
+                print(exc.code, file=sys.stderr)
+                returncode = 1
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+    return {"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def serve(main: MainFunction, script: str, requests: Optional[TextIO] = None, responses: Optional[TextIO] = None) -> None:
+    """Answer JSON-lines requests until the input is closed."""
+    import json
+
+    if responses is None:
+        # Keep the real stdout for the protocol and point fd 1 at stderr, so
+        # stray writes (C extensions, child processes) cannot corrupt it.
+        responses = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+        sys.stdout.flush()
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    requests = sys.stdin if requests is None else requests
+
+    _send(responses, {"ready": True, "script": Path(script).name, "pid": os.getpid()})
+    for line in requests:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            argv = [str(arg) for arg in request["argv"]]
+        except (ValueError, KeyError, TypeError) as exc:
+            _send(responses, {"id": None, "returncode": 2, "stdout": "", "stderr": f"Bad worker request: {exc}\n"})
+            continue
+        response = run_call(main, argv)
+        response["id"] = request.get("id")
+        _send(responses, response)
+
+
+def _send(stream: TextIO, payload: Dict[str, Any]) -> None:
+    import json
+
+    stream.write(json.dumps(payload) + "\n")
+    stream.flush()
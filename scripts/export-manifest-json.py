@@ -14,15 +14,24 @@ import hashlib
 import json
 from datetime import datetime, timezone
 import os
+import sys
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from manifest_loader import default_loader
+
 MANIFEST_METADATA_FILE = "_metadata.json"
+INDEX_FILE = "manifest-index.json"
+HASH_CHUNK_SIZE = 1024 * 1024
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Convert manifest YAML to JSON")
     parser.add_argument(
         "--manifest-root",
@@ -46,7 +55,26 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Pretty-print JSON output with indentation (default is compact).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Report manifest cache hits and the YAML parsing time they saved.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only convert sources whose sha256 differs from the previous index or whose "
+            "output is missing, and delete outputs of removed sources."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Convert files in N worker processes (0 = one per CPU; default 1).",
+    )
+    return parser.parse_args(argv)
 
 
 def discover_yaml_files(
@@ -72,16 +100,29 @@ def convert_yaml_file(
     source_path: Path, manifest_root: Path, output_root: Path, pretty: bool
 ) -> Optional[Tuple[Path, Dict]]:
     """Convert a single YAML file to JSON and return output path + index record."""
+    record, error = convert_source(source_path, manifest_root, output_root, pretty)
+    if record is None:
+        print(error)
+        return None
+    return output_root.parent / record["output"], record
+
+
+def convert_source(
+    source_path: Path, manifest_root: Path, output_root: Path, pretty: bool
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """Convert one file; return its index record, or None and a skip message.
+
+    The source is read once; parsing and hashing both work from that buffer.
+    """
     relative_path = source_path.relative_to(manifest_root)
     target_path = (output_root / relative_path).with_suffix(".json")
     target_path.parent.mkdir(parents=True, exist_ok=True)
 
+    raw = source_path.read_bytes()
     try:
-        with source_path.open("r", encoding="utf-8") as src:
-            content = yaml.safe_load(src) or {}
+        content = default_loader().load_bytes(raw, source_path) or {}
     except yaml.YAMLError as err:
-        print(f"Skipping {relative_path} (YAML parse error: {err})")
-        return None
+        return None, f"Skipping {relative_path} (YAML parse error: {err})"
 
     with target_path.open("w", encoding="utf-8") as dest:
         if pretty:
@@ -90,36 +131,116 @@ def convert_yaml_file(
         else:
             json.dump(content, dest, separators=(",", ":"), ensure_ascii=False)
 
-    with source_path.open("rb") as src_bytes:
-        sha256 = hashlib.sha256(src_bytes.read()).hexdigest()
+    sha256 = hashlib.sha256(raw).hexdigest()
 
     record = {
         "source": str(relative_path).replace("\\", "/"),
         "output": str(target_path.relative_to(output_root.parent)).replace("\\", "/"),
         "sha256": sha256,
     }
-    return target_path, record
+    return record, None
+
+
+def _convert_job(task: Tuple[Path, Path, Path, bool]) -> Tuple[Optional[Dict], Optional[str], Dict[str, Any]]:
+    """Pool entry point: convert one file and report the loader work it did."""
+    stats = default_loader().stats
+    before = stats.as_dict()
+    record, error = convert_source(*task)
+    after = stats.as_dict()
+    return record, error, {name: after[name] - before[name] for name in after}
+
+
+def convert_sources(
+    sources: List[Path], manifest_root: Path, output_root: Path, pretty: bool, jobs: int
+) -> List[Tuple[Optional[Dict], Optional[str]]]:
+    """Convert *sources*, in a process pool when *jobs* > 1, preserving order."""
+    tasks = [(path, manifest_root, output_root, pretty) for path in sources]
+    if jobs <= 1 or len(tasks) <= 1:
+        return [convert_source(*task) for task in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    loader_stats = default_loader().stats
+    results: List[Tuple[Optional[Dict], Optional[str]]] = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        for record, error, delta in pool.map(_convert_job, tasks, chunksize=max(1, len(tasks) // (jobs * 4))):
+            results.append((record, error))
+            for name, value in delta.items():
+                setattr(loader_stats, name, getattr(loader_stats, name) + value)
+    return results
+
 
+def file_sha256(path: Path) -> str:
+    """Hash *path* in fixed-size chunks without loading it whole."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-def write_index(
+
+def read_previous_index(index_path: Path) -> Dict:
+    """Return the index written by the last run, or {} if unusable."""
+    try:
+        with index_path.open("r", encoding="utf-8") as fh:
+            payload = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def build_index(
     index_path: Path,
     records: List[Dict],
     manifest_metadata: Dict,
     manifest_root: Path,
-) -> None:
-    index_payload = {
+    pretty: bool,
+) -> Dict:
+    return {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "manifest_metadata": manifest_metadata.get("manifest_system", {}),
         "source_root": os.path.relpath(manifest_root, start=index_path.parent),
+        "options": {"pretty": pretty},
         "files": records,
     }
+
+
+def write_index(index_path: Path, index_payload: Dict) -> None:
     with index_path.open("w", encoding="utf-8") as fh:
         json.dump(index_payload, fh, indent=2, ensure_ascii=False)
         fh.write("\n")
 
 
-def main() -> None:
-    args = parse_args()
+def _without_timestamp(payload: Dict) -> Dict:
+    return {key: value for key, value in payload.items() if key != "generated_at"}
+
+
+def index_unchanged(previous: Dict, current: Dict) -> bool:
+    """True when *current* differs from *previous* only by its timestamp."""
+    return bool(previous) and _without_timestamp(previous) == _without_timestamp(current)
+
+
+def remove_stale_outputs(
+    previous_records: Dict[str, Dict], current_sources: Iterable[str], output_root: Path
+) -> int:
+    """Delete outputs whose source no longer exists; return how many were removed."""
+    removed = 0
+    stale = set(previous_records) - set(current_sources)
+    for source in sorted(stale):
+        target = (output_root.parent / previous_records[source]["output"]).resolve()
+        if output_root not in target.parents or not target.is_file():
+            continue
+        target.unlink()
+        removed += 1
+        parent = target.parent
+        while parent != output_root and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return removed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
     manifest_root = args.manifest_root.resolve()
     output_root = args.output_dir.resolve()
 
@@ -127,26 +248,75 @@ def main() -> None:
         raise SystemExit(f"Manifest root not found: {manifest_root}")
 
     output_root.mkdir(parents=True, exist_ok=True)
+    index_path = output_root.parent / INDEX_FILE
+
+    previous_index = read_previous_index(index_path) if args.incremental else {}
+    previous_records: Dict[str, Dict] = {}
+    if previous_index.get("options") == {"pretty": args.pretty}:
+        # Outputs written with other formatting options cannot be reused.
+        previous_records = {
+            record["source"]: record
+            for record in previous_index.get("files", [])
+            if isinstance(record, dict) and "source" in record and "output" in record
+        }
 
     records: List[Dict] = []
-    skipped = 0
+    sources: List[str] = []
+    pending: List[Path] = []
     for yaml_file in sorted(discover_yaml_files(manifest_root, args.include_archives)):
-        result = convert_yaml_file(yaml_file, manifest_root, output_root, args.pretty)
-        if result is None:
+        source = yaml_file.relative_to(manifest_root).as_posix()
+        sources.append(source)
+        previous = previous_records.get(source)
+        if (
+            previous is not None
+            and (output_root.parent / previous["output"]).is_file()
+            and previous.get("sha256") == file_sha256(yaml_file)
+        ):
+            records.append(previous)
+            continue
+        pending.append(yaml_file)
+    unchanged = len(records)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    skipped = 0
+    for record, error in convert_sources(pending, manifest_root, output_root, args.pretty, jobs):
+        if record is None:
+            print(error)
             skipped += 1
             continue
-        _, record = result
         records.append(record)
+    # Same order regardless of job count or which files were reused.
+    records.sort(key=lambda record: record["source"])
+
+    removed = remove_stale_outputs(previous_records, sources, output_root) if args.incremental else 0
 
     manifest_metadata = read_manifest_metadata(manifest_root)
-    index_path = output_root.parent / "manifest-index.json"
-    write_index(index_path, records, manifest_metadata, manifest_root)
+    index_payload = build_index(index_path, records, manifest_metadata, manifest_root, args.pretty)
 
-    print(f"Converted {len(records)} YAML files into JSON under {output_root}")
+    converted = len(records) - unchanged
+    if args.incremental:
+        print(
+            f"Converted {converted}, unchanged {unchanged}, removed {removed} "
+            f"YAML export(s) under {output_root}"
+        )
+    else:
+        print(f"Converted {converted} YAML files into JSON under {output_root}")
     if skipped:
         print(f"Skipped {skipped} file(s) due to YAML parse errors or unsupported syntax")
-    print(f"Index written to {index_path}")
+
+    if args.incremental and index_unchanged(previous_index, index_payload):
+        print(f"Index up to date: {index_path}")
+    else:
+        write_index(index_path, index_payload)
+        print(f"Index written to {index_path}")
+    if args.cache_stats:
+        print(default_loader().stats.summary())
 
 
 if __name__ == "__main__":
-    main()
+    from script_worker import serve, worker_requested
+
+    if worker_requested():
+        serve(main, __file__)
+    else:
+        main()
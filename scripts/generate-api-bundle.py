@@ -2,16 +2,54 @@
 """
 Creates a single JSON bundle for the API from all manifest files.
 Run during CI/CD to create a versioned, cacheable bundle.
+
+Next to the JSON the generator writes precompressed ``.gz`` (and ``.br``
+when the ``brotli`` package is installed) variants plus a ``.meta.json``
+file carrying the sha256 of the bundle, from which the API derives one
+strong ETag per encoding so it can serve the bytes without ever parsing
+them.  ``brotli`` is optional: without it no ``.br`` is written and the API
+only offers gzip.
+
+It also writes a sharded copy under ``<name>.shards/``: one file per
+section, one small file per service/combo/bento/platter, and a
+``manifest.json`` listing every shard with its sha256, so consumers that
+need a single entity never load the whole bundle.
 """
 
 import json
-import yaml
+import gzip
+import re
 import hashlib
+import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 import argparse
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from manifest_loader import default_loader, load_manifest
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written without it
+    brotli = None
+
+# Serialize in pieces of roughly this size while streaming to disk
+STREAM_CHUNK_BYTES = 64 * 1024
+
+SHARD_FORMAT_VERSION = 1
+SHARD_MANIFEST = 'manifest.json'
+SECTION_KEYS = (
+    'services', 'combos', 'bentos', 'platters', 'capabilities',
+    'badges', 'network_profiles', 'security_policies'
+)
+ENTITY_SECTIONS = ('services', 'combos', 'bentos', 'platters')
+SAFE_SHARD_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
 class APIBundleGenerator:
     def __init__(self, manifest_dir: Path):
         self.manifest_dir = manifest_dir
@@ -28,6 +66,8 @@ class APIBundleGenerator:
             'network_profiles': {},
             'security_policies': {}
         }
+        self.saved_meta = None
+        self.saved_pretty = False
 
     def generate(self) -> Dict:
         """Generate complete API bundle"""
@@ -51,24 +91,23 @@ class APIBundleGenerator:
         if not contracts_path.exists():
             return
 
-        with open(contracts_path) as f:
-            data = yaml.safe_load(f)
-
-            # Extract services with simplified structure for API
-            for service_id, service_data in data.get('services', {}).items():
-                self.bundle['services'][service_id] = {
-                    'id': service_id,
-                    'name': service_data.get('name'),
-                    'category': service_id.split('.')[0],
-                    'provides': service_data.get('provides', []),
-                    'requires': service_data.get('requires', []),
-                    'resource_requirements': service_data.get('resource_requirements', {}),
-                    'docker': service_data.get('docker', {}),
-                    'description': service_data.get('description', ''),
-                    'status': service_data.get('status', 'stable')
-                }
+        data = load_manifest(contracts_path)
+
+        # Extract services with simplified structure for API
+        for service_id, service_data in data.get('services', {}).items():
+            self.bundle['services'][service_id] = {
+                'id': service_id,
+                'name': service_data.get('name'),
+                'category': service_id.split('.')[0],
+                'provides': service_data.get('provides', []),
+                'requires': service_data.get('requires', []),
+                'resource_requirements': service_data.get('resource_requirements', {}),
+                'docker': service_data.get('docker', {}),
+                'description': service_data.get('description', ''),
+                'status': service_data.get('status', 'stable')
+            }
 
-            self.bundle['capabilities'] = data.get('capabilities', {})
+        self.bundle['capabilities'] = data.get('capabilities', {})
 
     def _load_combos(self):
         """Load combos.yml"""
@@ -76,22 +115,21 @@ class APIBundleGenerator:
         if not combos_path.exists():
             return
 
-        with open(combos_path) as f:
-            data = yaml.safe_load(f)
-
-            for combo_data in data.get('combos', []):
-                combo_id = combo_data['id']
-                self.bundle['combos'][combo_id] = {
-                    'id': combo_id,
-                    'name': combo_data.get('name', ''),
-                    'description': combo_data.get('description', ''),
-                    'includes': combo_data.get('includes', []),
-                    'optional': combo_data.get('optional', []),
-                    'provides': combo_data.get('provides', []),
-                    'difficulty': combo_data.get('difficulty', 'intermediate'),
-                    'estimated_setup_time_min': combo_data.get('estimated_setup_time_min', 15),
-                    'tags': combo_data.get('tags', [])
-                }
+        data = load_manifest(combos_path)
+
+        for combo_data in data.get('combos', []):
+            combo_id = combo_data['id']
+            self.bundle['combos'][combo_id] = {
+                'id': combo_id,
+                'name': combo_data.get('name', ''),
+                'description': combo_data.get('description', ''),
+                'includes': combo_data.get('includes', []),
+                'optional': combo_data.get('optional', []),
+                'provides': combo_data.get('provides', []),
+                'difficulty': combo_data.get('difficulty', 'intermediate'),
+                'estimated_setup_time_min': combo_data.get('estimated_setup_time_min', 15),
+                'tags': combo_data.get('tags', [])
+            }
 
     def _load_bentos(self):
         """Load bentos.yml (if exists)"""
@@ -99,21 +137,20 @@ class APIBundleGenerator:
         if not bentos_path.exists():
             return
 
-        with open(bentos_path) as f:
-            data = yaml.safe_load(f)
-
-            for bento_data in data.get('bentos', []):
-                bento_id = bento_data['id']
-                self.bundle['bentos'][bento_id] = {
-                    'id': bento_id,
-                    'name': bento_data.get('name', ''),
-                    'description': bento_data.get('description', ''),
-                    'includes': bento_data.get('includes', []),
-                    'optional': bento_data.get('optional', []),
-                    'provides': bento_data.get('provides', []),
-                    'category': bento_data.get('category', 'general'),
-                    'tags': bento_data.get('tags', [])
-                }
+        data = load_manifest(bentos_path)
+
+        for bento_data in data.get('bentos', []):
+            bento_id = bento_data['id']
+            self.bundle['bentos'][bento_id] = {
+                'id': bento_id,
+                'name': bento_data.get('name', ''),
+                'description': bento_data.get('description', ''),
+                'includes': bento_data.get('includes', []),
+                'optional': bento_data.get('optional', []),
+                'provides': bento_data.get('provides', []),
+                'category': bento_data.get('category', 'general'),
+                'tags': bento_data.get('tags', [])
+            }
 
     def _load_platters(self):
         """Load platters.yml"""
@@ -121,23 +158,22 @@ class APIBundleGenerator:
         if not platters_path.exists():
             return
 
-        with open(platters_path) as f:
-            data = yaml.safe_load(f)
-
-            for platter_data in data.get('platters', []):
-                platter_id = platter_data['id']
-                self.bundle['platters'][platter_id] = {
-                    'id': platter_id,
-                    'name': platter_data.get('name', ''),
-                    'description': platter_data.get('description', ''),
-                    'includes': platter_data.get('includes', []),
-                    'optional': platter_data.get('optional', []),
-                    'provides': platter_data.get('provides', []),
-                    'resource_requirements': platter_data.get('resource_requirements', {}),
-                    'difficulty': platter_data.get('difficulty', 'intermediate'),
-                    'estimated_setup_time_min': platter_data.get('estimated_setup_time_min', 30),
-                    'tags': platter_data.get('tags', [])
-                }
+        data = load_manifest(platters_path)
+
+        for platter_data in data.get('platters', []):
+            platter_id = platter_data['id']
+            self.bundle['platters'][platter_id] = {
+                'id': platter_id,
+                'name': platter_data.get('name', ''),
+                'description': platter_data.get('description', ''),
+                'includes': platter_data.get('includes', []),
+                'optional': platter_data.get('optional', []),
+                'provides': platter_data.get('provides', []),
+                'resource_requirements': platter_data.get('resource_requirements', {}),
+                'difficulty': platter_data.get('difficulty', 'intermediate'),
+                'estimated_setup_time_min': platter_data.get('estimated_setup_time_min', 30),
+                'tags': platter_data.get('tags', [])
+            }
 
     def _load_badges(self):
         """Load badges configuration"""
@@ -159,8 +195,7 @@ class APIBundleGenerator:
             }
             return
 
-        with open(badges_path) as f:
-            self.bundle['badges'] = yaml.safe_load(f)
+        self.bundle['badges'] = load_manifest(badges_path)
 
     def _load_network_profiles(self):
         """Load network security profiles"""
@@ -188,9 +223,8 @@ class APIBundleGenerator:
         # Load from file if exists
         profiles_path = self.manifest_dir / 'network-profiles.yml'
         if profiles_path.exists():
-            with open(profiles_path) as f:
-                file_profiles = yaml.safe_load(f)
-                self.bundle['network_profiles'].update(file_profiles.get('profiles', {}))
+            file_profiles = load_manifest(profiles_path)
+            self.bundle['network_profiles'].update(file_profiles.get('profiles', {}))
 
     def _calculate_checksums(self):
         """Calculate checksums for all loaded manifest files"""
@@ -201,16 +235,151 @@ class APIBundleGenerator:
                     sha256_hash = hashlib.sha256(content).hexdigest()
                     self.bundle['checksums'][file_path.name] = sha256_hash
 
-    def save_bundle(self, output_path: Path, pretty: bool = False):
-        """Save bundle to JSON file"""
+    def save_bundle(self, output_path: Path, pretty: bool = False) -> Dict:
+        """Stream the bundle to JSON, .gz and .br files and write its metadata"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w') as f:
-            if pretty:
-                json.dump(self.bundle, f, indent=2, ensure_ascii=False)
-                f.write('\n')
-            else:
-                json.dump(self.bundle, f, separators=(',', ':'), ensure_ascii=False)
+        if pretty:
+            encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+        else:
+            encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+        suffix = f".{os.getpid()}.tmp"
+        paths = {'identity': output_path, 'gzip': Path(f"{output_path}.gz")}
+        if brotli is not None:
+            paths['br'] = Path(f"{output_path}.br")
+        tmp_paths = {encoding: Path(f"{path}{suffix}") for encoding, path in paths.items()}
+
+        sha256 = hashlib.sha256()
+        size = 0
+        # One pass over the encoder output feeds the hash and every variant.
+        with open(tmp_paths['identity'], 'wb') as raw, open(tmp_paths['gzip'], 'wb') as gz_file:
+            # mtime=0 keeps the .gz byte-identical for identical bundles
+            with gzip.GzipFile(fileobj=gz_file, mode='wb', compresslevel=9, mtime=0) as gz:
+                br_file = open(tmp_paths['br'], 'wb') if brotli is not None else None
+                compressor = brotli.Compressor(quality=11) if brotli is not None else None
+                try:
+                    pending = []
+                    pending_bytes = 0
+                    chunks = encoder.iterencode(self.bundle)
+                    for piece in _with_trailer(chunks, '\n' if pretty else ''):
+                        pending.append(piece)
+                        pending_bytes += len(piece)
+                        if pending_bytes < STREAM_CHUNK_BYTES:
+                            continue
+                        size += self._write_chunk(''.join(pending), sha256, raw, gz, compressor, br_file)
+                        pending, pending_bytes = [], 0
+                    if pending:
+                        size += self._write_chunk(''.join(pending), sha256, raw, gz, compressor, br_file)
+                    if br_file is not None:
+                        br_file.write(compressor.finish())
+                finally:
+                    if br_file is not None:
+                        br_file.close()
+
+        digest = sha256.hexdigest()
+        meta = {
+            'sha256': digest,
+            'etag': f'"{digest}"',
+            'size': size,
+            'encodings': {
+                encoding: {'path': paths[encoding].name, 'size': tmp_paths[encoding].stat().st_size}
+                for encoding in paths if encoding != 'identity'
+            }
+        }
+        meta_path = bundle_meta_path(output_path)
+        meta_tmp = Path(f"{meta_path}{suffix}")
+        meta_tmp.write_text(json.dumps(meta, indent=2) + '\n', encoding='utf-8')
+
+        # Variants and metadata land first; the JSON itself is replaced last
+        # so a reader that sees the new bundle also sees matching variants.
+        for encoding in paths:
+            if encoding != 'identity':
+                os.replace(tmp_paths[encoding], paths[encoding])
+        os.replace(meta_tmp, meta_path)
+        os.replace(tmp_paths['identity'], output_path)
+        if brotli is None:
+            stale = Path(f"{output_path}.br")
+            if stale.exists():
+                stale.unlink()
+
+        self.saved_meta = meta
+        self.saved_pretty = pretty
+        return meta
+
+    def save_shards(self, output_path: Path) -> Dict:
+        """Write per-section and per-entity shards plus their manifest"""
+        shard_dir = bundle_shard_dir(output_path)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = shard_dir / SHARD_MANIFEST
+        try:
+            previous = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            previous = {}
+        previous_hashes = {
+            info['path']: info['sha256']
+            for info in _iter_shard_entries(previous)
+        }
+
+        manifest = {
+            'version': SHARD_FORMAT_VERSION,
+            'generated_at': self.bundle['generated_at'],
+            'bundle_sha256': self.saved_meta['sha256'] if self.saved_meta else None,
+            'sections': {},
+            'entities': {}
+        }
+        written = 0
+
+        def write_shard(relative: str, value) -> Dict:
+            nonlocal written
+            data = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            target = shard_dir / relative
+            # Unchanged shards keep their file (and mtime) untouched
+            if previous_hashes.get(relative) != digest or not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, target)
+                written += 1
+            return {'path': relative, 'sha256': digest, 'size': len(data)}
+
+        for section in SECTION_KEYS:
+            value = self.bundle.get(section, {})
+            info = write_shard(f"sections/{section}.json", value)
+            info['count'] = len(value)
+            manifest['sections'][section] = info
+
+        for section in ENTITY_SECTIONS:
+            entities = {}
+            for entity_id, value in sorted(self.bundle.get(section, {}).items()):
+                name = entity_id if SAFE_SHARD_NAME.match(entity_id) else hashlib.sha256(
+                    entity_id.encode('utf-8')).hexdigest()[:24]
+                entities[entity_id] = write_shard(f"{section}/{name}.json", value)
+            manifest['entities'][section] = entities
+
+        current = {info['path'] for info in _iter_shard_entries(manifest)}
+        removed = 0
+        for relative in sorted(set(previous_hashes) - current):
+            stale = shard_dir / relative
+            if stale.is_file() and shard_dir in stale.resolve().parents:
+                stale.unlink()
+                removed += 1
+
+        tmp = manifest_path.with_name(f"{SHARD_MANIFEST}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        os.replace(tmp, manifest_path)
+        return {'shards': len(current), 'written': written, 'removed': removed, 'path': str(shard_dir)}
+
+    @staticmethod
+    def _write_chunk(text, sha256, raw, gz, compressor, br_file) -> int:
+        data = text.encode('utf-8')
+        sha256.update(data)
+        raw.write(data)
+        gz.write(data)
+        if compressor is not None:
+            br_file.write(compressor.process(data))
+        return len(data)
 
     def get_stats(self) -> Dict:
         """Get statistics about the generated bundle"""
@@ -219,9 +388,42 @@ class APIBundleGenerator:
             'combos_count': len(self.bundle['combos']),
             'platters_count': len(self.bundle['platters']),
             'capabilities_count': len(self.bundle['capabilities']),
-            'total_size_bytes': len(json.dumps(self.bundle, separators=(',', ':')))
+            'total_size_bytes': self._serialized_size()
         }
 
+    def _serialized_size(self) -> int:
+        # Always the compact encoding; save_bundle already knows that size
+        # unless it wrote the bundle pretty-printed
+        if self.saved_meta is not None and not self.saved_pretty:
+            return self.saved_meta['size']
+        return sum(
+            len(piece.encode('utf-8'))
+            for piece in json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).iterencode(self.bundle)
+        )
+
+
+def bundle_meta_path(output_path: Path) -> Path:
+    """Location of the metadata file written next to *output_path*"""
+    return output_path.with_name(f"{output_path.stem}.meta.json")
+
+
+def bundle_shard_dir(output_path: Path) -> Path:
+    """Directory holding the sharded copy of the bundle at *output_path*"""
+    return output_path.with_name(f"{output_path.stem}.shards")
+
+
+def _iter_shard_entries(manifest: Dict):
+    for info in (manifest.get('sections') or {}).values():
+        yield info
+    for entities in (manifest.get('entities') or {}).values():
+        yield from entities.values()
+
+
+def _with_trailer(chunks, trailer: str):
+    yield from chunks
+    if trailer:
+        yield trailer
+
 def main():
     parser = argparse.ArgumentParser(description='Generate API bundle from Sushi Kitchen manifests')
     parser.add_argument('--manifest-dir', type=Path, default=Path('docs/manifest'),
@@ -232,6 +434,8 @@ def main():
                        help='Pretty-print JSON output')
     parser.add_argument('--stats', action='store_true',
                        help='Show bundle statistics')
+    parser.add_argument('--no-shards', action='store_true',
+                       help='Skip writing the sharded per-section/per-entity layout')
 
     args = parser.parse_args()
 
@@ -246,6 +450,10 @@ def main():
     # Save bundle
     generator.save_bundle(args.output, args.pretty)
     print(f"API bundle generated: {args.output}")
+    if not args.no_shards:
+        shards = generator.save_shards(args.output)
+        print(f"Bundle shards: {shards['shards']} in {shards['path']} "
+              f"({shards['written']} written, {shards['removed']} removed)")
 
     # Show stats if requested
     if args.stats:
@@ -256,6 +464,12 @@ def main():
         print(f"  Platters: {stats['platters_count']}")
         print(f"  Capabilities: {stats['capabilities_count']}")
         print(f"  Total Size: {stats['total_size_bytes']:,} bytes")
+        if generator.saved_pretty:
+            print(f"  Written (pretty): {generator.saved_meta['size']:,} bytes")
+        for encoding, variant in generator.saved_meta['encodings'].items():
+            print(f"  {encoding}: {variant['size']:,} bytes")
+        print(f"  ETag: {generator.saved_meta['etag']}")
+        print(f"  {default_loader().stats.summary()}")
 
     return 0
 
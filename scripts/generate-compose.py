@@ -11,14 +11,20 @@ Usage:
     python scripts/generate-compose.py --roll=hosomaki.redis --output=compose/generated/redis.yml
 """
 
-import argparse
-import yaml
-import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Set, Optional, Any
 from dataclasses import dataclass
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# The manifest graph and loader (and PyYAML behind them) are imported by the
+# code that resolves a selection, so --help and argument errors stay cheap
+if TYPE_CHECKING:
+    from manifest_graph import ManifestGraph
+
 @dataclass
 class Roll:
     """Represents a roll from contracts.yml"""
@@ -61,31 +67,33 @@ class ManifestResolver:
         self.combos: Dict[str, Combo] = {}
         self.platters: Dict[str, Platter] = {}
         self.capabilities: Dict[str, Dict] = {}
+        self.graph: 'ManifestGraph' = None
         self.load_manifests()
     
     def load_manifests(self):
         """Load all manifest files"""
-        # Load contracts.yml
-        contracts_path = self.manifest_dir / "contracts.yml"
-        if contracts_path.exists():
-            with open(contracts_path, 'r') as f:
-                contracts = yaml.safe_load(f)
-                self.capabilities = contracts.get('capabilities', {})
-                self.load_rolls(contracts.get('rolls', {}))
-        
+        from manifest_graph import ManifestGraph
+        from manifest_loader import load_manifest
+
+        documents = {}
+        for name in ('contracts.yml', 'combos.yml', 'bento-box.yml', 'platters.yml'):
+            path = self.manifest_dir / name
+            documents[name] = (load_manifest(path) or {}) if path.exists() else {}
+
+        # Load contracts.yml (current manifests use "services"; older ones "rolls")
+        contracts = documents['contracts.yml']
+        self.capabilities = contracts.get('capabilities', {})
+        self.load_rolls(contracts.get('rolls') or contracts.get('services', {}))
+
         # Load combos.yml
-        combos_path = self.manifest_dir / "combos.yml"
-        if combos_path.exists():
-            with open(combos_path, 'r') as f:
-                combos_data = yaml.safe_load(f)
-                self.load_combos(combos_data.get('combos', []))
-        
+        self.load_combos(documents['combos.yml'].get('combos', []))
+
         # Load platters.yml
-        platters_path = self.manifest_dir / "platters.yml"
-        if platters_path.exists():
-            with open(platters_path, 'r') as f:
-                platters_data = yaml.safe_load(f)
-                self.load_platters(platters_data.get('platters', []))
+        self.load_platters(documents['platters.yml'].get('platters', []))
+
+        # Compiled view used for bundle expansion and provider lookups,
+        # reused from the on-disk graph cache while the manifests match it
+        self.graph = ManifestGraph.compile(self.manifest_dir)
     
     def load_rolls(self, rolls_data: Dict):
         """Load rolls from contracts.yml"""
@@ -96,7 +104,7 @@ class ManifestResolver:
                 requires=roll_data.get('requires', []),
                 suggests=roll_data.get('suggests', []),
                 conflicts=roll_data.get('conflicts', []),
-                image=roll_data.get('image', ''),
+                image=roll_data.get('image') or (roll_data.get('docker') or {}).get('image', ''),
                 ports=roll_data.get('ports', []),
                 environment_vars=roll_data.get('environment_vars', []),
                 volumes=roll_data.get('volumes', []),
@@ -123,102 +131,64 @@ class ManifestResolver:
             self.platters[platter_id] = Platter(
                 id=platter_id,
                 name=platter_data.get('name', ''),
-                includes=platter_data.get('includes', []),
+                includes=platter_data.get('includes') or (
+                    platter_data.get('combos', []) + platter_data.get('additional_services', [])
+                ),
                 optional=platter_data.get('optional', []),
                 provides=platter_data.get('provides', [])
             )
     
     def resolve_platter(self, platter_id: str, include_optional: bool = False) -> Set[str]:
         """Resolve a platter to its constituent rolls"""
-        if platter_id not in self.platters:
+        from manifest_graph import KIND_COMBO, KIND_PLATTER
+
+        if self.graph.kind_of(platter_id) != KIND_PLATTER:
             raise ValueError(f"Platter '{platter_id}' not found")
-        
-        platter = self.platters[platter_id]
-        required_rolls = set()
-        
-        # Resolve includes
-        for item in platter.includes:
-            if item.startswith('combo.'):
-                combo_rolls = self.resolve_combo(item)
-                required_rolls.update(combo_rolls)
-            elif item.startswith('platter.'):
-                sub_platter_rolls = self.resolve_platter(item, include_optional)
-                required_rolls.update(sub_platter_rolls)
-            else:
-                required_rolls.add(item)
-        
-        # Resolve optional if requested
-        if include_optional:
-            for item in platter.optional:
-                if item.startswith('combo.'):
-                    combo_rolls = self.resolve_combo(item)
-                    required_rolls.update(combo_rolls)
-                else:
-                    required_rolls.add(item)
-        
-        return required_rolls
+
+        # Combos contribute their includes only; platter optionals on request
+        optional_kinds = {KIND_PLATTER} if include_optional else set()
+        node = self.graph.index[platter_id]
+        for item in self.graph.members[node]:
+            item_id = self.graph.ids[item]
+            if item_id.startswith('combo.') and self.graph.kinds[item] != KIND_COMBO:
+                raise ValueError(f"Combo '{item_id}' not found")
+            if item_id.startswith('platter.') and self.graph.kinds[item] != KIND_PLATTER:
+                raise ValueError(f"Platter '{item_id}' not found")
+        return set(self.graph.names(self.graph.expand_bundle(node, optional_kinds)))
     
     def resolve_combo(self, combo_id: str) -> Set[str]:
         """Resolve a combo to its constituent rolls"""
-        if combo_id not in self.combos:
+        from manifest_graph import KIND_COMBO
+
+        if self.graph.kind_of(combo_id) != KIND_COMBO:
             raise ValueError(f"Combo '{combo_id}' not found")
         
-        combo = self.combos[combo_id]
-        required_rolls = set()
-        
-        for roll_id in combo.includes:
-            required_rolls.add(roll_id)
-        
-        return required_rolls
+        return set(self.graph.names(self.graph.members[self.graph.index[combo_id]]))
     
     def resolve_dependencies(self, roll_ids: Set[str]) -> Set[str]:
-        """Resolve all dependencies for a set of rolls"""
-        resolved = set()
-        to_resolve = set(roll_ids)
-        
-        while to_resolve:
-            current = to_resolve.pop()
-            if current in resolved:
-                continue
-            
-            resolved.add(current)
-            
-            if current in self.rolls:
-                roll = self.rolls[current]
-                # Add required rolls
-                for req in roll.requires or []:
-                    if req.startswith('cap.'):
-                        # Find a provider for this capability
-                        provider = self.find_capability_provider(req)
-                        if provider:
-                            to_resolve.add(provider)
-                    else:
-                        to_resolve.add(req)
-                
-                # Add suggested rolls
-                for sugg in roll.suggests or []:
-                    if sugg.startswith('cap.'):
-                        provider = self.find_capability_provider(sugg)
-                        if provider and provider not in resolved:
-                            to_resolve.add(provider)
-                    else:
-                        to_resolve.add(sugg)
-        
-        return resolved
+        """Resolve all dependencies (required and suggested) for a set of rolls
+
+        Capability providers are chosen for the selection as a whole: a
+        provider that is already selected is reused, and providers in a
+        declared conflict with the selection are avoided.
+        """
+        graph = self.graph
+        unknown = {roll_id for roll_id in roll_ids if graph.id_of(roll_id) is None}
+        seeds = [graph.index[roll_id] for roll_id in sorted(roll_ids) if roll_id not in unknown]
+        resolved = graph.solve(seeds, follow_suggests=True, strict=False)
+        return set(graph.names(resolved)) | unknown
     
-    def find_capability_provider(self, capability: str) -> Optional[str]:
-        """Find a roll that provides a capability"""
-        if capability not in self.capabilities:
+    def find_capability_provider(self, capability: str, selected: Optional[Set[str]] = None) -> Optional[str]:
+        """Find a roll that provides a capability, given the rolls already selected"""
+        node = self.graph.id_of(capability)
+        if node is None:
             return None
-        
-        providers = self.capabilities[capability].get('providers', [])
-        if providers:
-            # Return the first available provider
-            for provider in providers:
-                if provider in self.rolls:
-                    return provider
-        
-        return None
+
+        selected_nodes = {self.graph.index[roll_id] for roll_id in selected or () if roll_id in self.graph.index}
+        provider = self.graph.choose_provider(node, selected_nodes, self.graph.mask_of(selected_nodes))
+        if provider < 0 or self.graph.ids[provider] not in self.rolls:
+            return None
+        return self.graph.ids[provider]
     
     def generate_compose(self, roll_ids: Set[str]) -> Dict:
         """Generate Docker Compose configuration for a set of rolls"""
@@ -233,7 +203,7 @@ class ManifestResolver:
             }
         }
         
-        for roll_id in roll_ids:
+        for roll_id in sorted(roll_ids):
             if roll_id in self.rolls:
                 service_config = self.generate_service_config(roll_id)
                 if service_config:
@@ -288,7 +258,9 @@ class ManifestResolver:
         
         return service
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
     parser = argparse.ArgumentParser(description='Generate Docker Compose from Sushi Kitchen manifests')
     parser.add_argument('--platter', help='Platter ID to generate')
     parser.add_argument('--combo', help='Combo ID to generate')
@@ -297,14 +269,14 @@ def main():
     parser.add_argument('--include-optional', action='store_true', help='Include optional components')
     parser.add_argument('--manifest-dir', default='docs/manifest', help='Manifest directory path')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if not any([args.platter, args.combo, args.roll]):
         parser.error('Must specify --platter, --combo, or --roll')
     
     manifest_dir = Path(args.manifest_dir)
     if not manifest_dir.exists():
-        print(f"Error: Manifest directory '{manifest_dir}' not found")
+        print(f"Error: Manifest directory '{manifest_dir}' not found", file=sys.stderr)
         sys.exit(1)
     
     resolver = ManifestResolver(manifest_dir)
@@ -312,21 +284,24 @@ def main():
     try:
         if args.platter:
             roll_ids = resolver.resolve_platter(args.platter, args.include_optional)
-            print(f"Resolving platter '{args.platter}' -> {len(roll_ids)} rolls")
+            print(f"Resolving platter '{args.platter}' -> {len(roll_ids)} rolls", file=sys.stderr)
         elif args.combo:
             roll_ids = resolver.resolve_combo(args.combo)
-            print(f"Resolving combo '{args.combo}' -> {len(roll_ids)} rolls")
+            print(f"Resolving combo '{args.combo}' -> {len(roll_ids)} rolls", file=sys.stderr)
         elif args.roll:
             roll_ids = {args.roll}
-            print(f"Generating single roll '{args.roll}'")
+            print(f"Generating single roll '{args.roll}'", file=sys.stderr)
         
         # Resolve dependencies
         all_rolls = resolver.resolve_dependencies(roll_ids)
-        print(f"With dependencies -> {len(all_rolls)} total rolls")
+        print(f"With dependencies -> {len(all_rolls)} total rolls", file=sys.stderr)
         
         # Generate compose
         compose = resolver.generate_compose(all_rolls)
         
+        # Imported late so --help and failed resolutions never pay for PyYAML
+        import yaml
+
         # Output
         if args.output:
             output_path = Path(args.output)
@@ -338,8 +313,13 @@ def main():
             print(yaml.dump(compose, default_flow_style=False, sort_keys=False))
     
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
+    from script_worker import serve, worker_requested
+
+    if worker_requested():
+        serve(main, __file__)
+    else:
+        main()
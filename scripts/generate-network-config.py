@@ -4,50 +4,36 @@ Generate network configurations based on privacy profiles.
 Extends the base compose with network isolation rules.
 """
 
-import yaml
+import copy
+import re
+import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-class NetworkConfigGenerator:
-    def __init__(self):
-        self.profiles = {
-            'chirashi': self._generate_chirashi_network,
-            'temaki': self._generate_temaki_network,
-            'inari': self._generate_inari_network
-        }
-
-    def generate(self, compose_dict: Dict, profile: str) -> Dict:
-        """Apply network profile to existing compose configuration"""
-        if profile not in self.profiles:
-            raise ValueError(f"Unknown profile: {profile}")
-
-        # Add network definitions
-        compose_dict['networks'] = self.profiles[profile]()
-
-        # Update each service with appropriate network assignments
-        for service_name, service_config in compose_dict['services'].items():
-            service_config['networks'] = self._assign_service_networks(
-                service_name,
-                service_config,
-                profile
-            )
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-        return compose_dict
-
-    def _generate_chirashi_network(self) -> Dict:
-        """Single network for research/development"""
-        return {
+# Built-in profiles, used when no manifests are given and as the base that
+# contracts.yml / templates override.  ``tiers`` maps a service tier to the
+# networks it joins; ``default_tier`` covers services no rule places.
+DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    'chirashi': {
+        'description': 'Single network for research/development',
+        'networks': {
             'sushi_net': {
                 'driver': 'bridge',
                 'ipam': {
                     'config': [{'subnet': '172.20.0.0/16'}]
                 }
             }
-        }
-
-    def _generate_temaki_network(self) -> Dict:
-        """Segmented networks for business use"""
-        return {
+        },
+        'tiers': {'app': ['sushi_net']},
+        'default_tier': 'app'
+    },
+    'temaki': {
+        'description': 'Segmented networks for business use',
+        'networks': {
             'sushi_frontend': {
                 'driver': 'bridge',
                 'external': True
@@ -60,11 +46,18 @@ class NetworkConfigGenerator:
                 'driver': 'bridge',
                 'internal': True
             }
-        }
-
-    def _generate_inari_network(self) -> Dict:
-        """Enterprise-grade isolated networks"""
-        return {
+        },
+        'tiers': {
+            'web': ['sushi_frontend', 'sushi_backend'],
+            'data': ['sushi_data'],
+            'mgmt': ['sushi_backend'],
+            'app': ['sushi_backend']
+        },
+        'default_tier': 'app'
+    },
+    'inari': {
+        'description': 'Enterprise-grade isolated networks',
+        'networks': {
             'sushi_web_tier': {
                 'driver': 'bridge',
                 'ipam': {
@@ -92,70 +85,219 @@ class NetworkConfigGenerator:
                     'config': [{'subnet': '172.21.4.0/24'}]
                 }
             }
+        },
+        'tiers': {
+            'web': ['sushi_web_tier', 'sushi_app_tier'],
+            'data': ['sushi_data_tier'],
+            'mgmt': ['sushi_mgmt_tier', 'sushi_app_tier'],
+            'app': ['sushi_app_tier']
+        },
+        'default_tier': 'app'
+    }
+}
+
+# Tier rules for services the manifests do not place.  Name lookups win over
+# ports; a service publishing one of WEB_PORTS (exactly, not as a substring
+# of 8080 or 13000) is web-facing.
+SERVICE_TIERS = {
+    'caddy': 'web', 'homepage': 'web', 'grafana': 'web', 'n8n': 'web',
+    'code_server': 'web', 'jupyter': 'web',
+    'postgres': 'data', 'neo4j': 'data', 'redis': 'data', 'qdrant': 'data',
+    'weaviate': 'data', 'minio': 'data',
+    'prometheus': 'mgmt', 'cadvisor': 'mgmt', 'node_exporter': 'mgmt'
+}
+WEB_PORTS = frozenset({80, 443, 3000})
+
+_PORT_DEFAULT = re.compile(r'\$\{[^}:]*:-([^}]*)\}')
+
+
+def port_numbers(port: Any) -> List[int]:
+    """Host and container port numbers of a compose port entry
+
+    Handles ``"8080:80"``, ``"127.0.0.1:8080:80/tcp"``, ``"${X_PORT:-8080}:80"``,
+    bare numbers and the long ``{target, published}`` syntax.
+    """
+    if isinstance(port, dict):
+        candidates = [port.get('target'), port.get('published')]
+    else:
+        text = _PORT_DEFAULT.sub(r'\1', str(port)).split('/', 1)[0]
+        candidates = text.split(':')[-2:]
+    numbers = []
+    for candidate in candidates:
+        candidate = str(candidate).strip() if candidate is not None else ''
+        if candidate.isdigit():
+            numbers.append(int(candidate))
+    return numbers
+
+
+def compose_service_name(service_id: str) -> str:
+    """Compose key the generators use for a manifest service id"""
+    return service_id.split('.')[-1]
+
+
+class NetworkConfigGenerator:
+    """Applies a network profile through a precomputed service -> networks index
+
+    Profiles and per-service assignments are compiled once at construction;
+    ``generate`` then costs one dict lookup per service.  Without manifests
+    the built-in DEFAULT_PROFILES and tier rules are used.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+                 service_networks: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        self.profiles = copy.deepcopy(DEFAULT_PROFILES) if profiles is None else profiles
+        # profile -> compose service name -> networks, from the manifests
+        self.assignments: Dict[str, Dict[str, Tuple[str, ...]]] = {
+            name: {} for name in self.profiles
         }
+        for name, services in (service_networks or {}).items():
+            if name in self.assignments:
+                for service_name, networks in services.items():
+                    self.assignments[name].setdefault(service_name, tuple(networks))
+        self._fallback = {name: self._compile_fallback(name) for name in self.profiles}
 
-    def _assign_service_networks(self, service_name: str, service_config: Dict, profile: str) -> List[str]:
-        """Assign appropriate networks to a service based on profile and service type"""
-
-        if profile == 'chirashi':
-            return ['sushi_net']
-
-        elif profile == 'temaki':
-            # Business segmentation
-            if self._is_web_service(service_name, service_config):
-                return ['sushi_frontend', 'sushi_backend']
-            elif self._is_data_service(service_name, service_config):
-                return ['sushi_data']
-            else:
-                return ['sushi_backend']
-
-        elif profile == 'inari':
-            # Enterprise multi-tier
-            if self._is_web_service(service_name, service_config):
-                return ['sushi_web_tier', 'sushi_app_tier']
-            elif self._is_data_service(service_name, service_config):
-                return ['sushi_data_tier']
-            elif self._is_mgmt_service(service_name, service_config):
-                return ['sushi_mgmt_tier', 'sushi_app_tier']
-            else:
-                return ['sushi_app_tier']
-
-        return ['default']
-
-    def _is_web_service(self, service_name: str, service_config: Dict) -> bool:
-        """Determine if service is a web-facing service"""
-        web_services = ['caddy', 'homepage', 'grafana', 'n8n', 'code_server', 'jupyter']
-        if service_name in web_services:
-            return True
-
-        # Check if service has exposed ports
-        ports = service_config.get('ports', [])
-        if ports and any('80' in str(port) or '443' in str(port) or '3000' in str(port) for port in ports):
-            return True
-
-        return False
-
-    def _is_data_service(self, service_name: str, service_config: Dict) -> bool:
-        """Determine if service is a data/storage service"""
-        data_services = ['postgres', 'neo4j', 'redis', 'qdrant', 'weaviate', 'minio']
-        return service_name in data_services
-
-    def _is_mgmt_service(self, service_name: str, service_config: Dict) -> bool:
-        """Determine if service is a management/monitoring service"""
-        mgmt_services = ['prometheus', 'grafana', 'cadvisor', 'node_exporter']
-        return service_name in mgmt_services
-
-def main():
+    @classmethod
+    def from_manifests(cls, manifest_dir: Path, templates_dir: Optional[Path] = None) -> 'NetworkConfigGenerator':
+        """Build profiles from contracts.yml and templates/network-profiles/*.yml
+
+        contracts.yml ``network_profiles`` replace the built-in network
+        definitions of the same name and its per-service ``networks`` entries
+        become the assignment index.  Each template file adds a profile named
+        after the file whose ``service_network_assignments`` examples are
+        indexed the same way.
+        """
+        from manifest_loader import load_manifest
+
+        manifest_dir = Path(manifest_dir)
+        contracts_path = manifest_dir / 'contracts.yml'
+        contracts = (load_manifest(contracts_path) or {}) if contracts_path.exists() else {}
+
+        profiles = copy.deepcopy(DEFAULT_PROFILES)
+        for name, profile in (contracts.get('network_profiles') or {}).items():
+            merged = dict(profiles.get(name, {}))
+            merged.update(copy.deepcopy(profile))
+            if profile.get('networks') and 'tiers' not in profile:
+                # Built-in tiers name the built-in networks; assignments come
+                # from the contracts instead
+                merged.pop('tiers', None)
+                merged.pop('default_tier', None)
+            profiles[name] = merged
+
+        service_networks: Dict[str, Dict[str, List[str]]] = {}
+        services = contracts.get('services') or contracts.get('rolls') or {}
+        for service_id, service in services.items():
+            networks = service.get('networks') if isinstance(service, dict) else None
+            if not isinstance(networks, dict):
+                continue
+            for name, assigned in networks.items():
+                service_networks.setdefault(name, {})[compose_service_name(service_id)] = list(assigned or [])
+
+        templates_dir = Path(templates_dir) if templates_dir else manifest_dir.parent / 'templates' / 'network-profiles'
+        template_paths = sorted(templates_dir.glob('*.yml')) if templates_dir.is_dir() else []
+        for path in template_paths:
+            template = load_manifest(path) or {}
+            if not isinstance(template.get('networks'), dict):
+                continue
+            assignments = service_networks.setdefault(path.stem, {})
+            for assignment in (template.get('service_network_assignments') or {}).values():
+                if not isinstance(assignment, dict):
+                    continue
+                for example in assignment.get('example_services') or []:
+                    # Entries read like "futomaki.redis (secured, monitored)"
+                    service_id = str(example).split(' ', 1)[0]
+                    if '.' in service_id:
+                        assignments[compose_service_name(service_id)] = list(assignment.get('networks') or [])
+            profiles[path.stem] = {'networks': template['networks']}
+
+        return cls(profiles, service_networks)
+
+    def generate(self, compose_dict: Dict, profile: str) -> Dict:
+        """Apply network profile to existing compose configuration"""
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown profile: {profile}")
+
+        # Add network definitions
+        compose_dict['networks'] = copy.deepcopy(self.profiles[profile]['networks'])
+
+        # Update each service with appropriate network assignments
+        assignments = self.assignments[profile]
+        for service_name, service_config in compose_dict['services'].items():
+            networks = assignments.get(service_name)
+            if networks is None:
+                networks = self._assign_service_networks(service_name, service_config, profile)
+            service_config['networks'] = list(networks)
+
+        return compose_dict
+
+    def _compile_fallback(self, profile: str) -> Tuple[Dict[str, Tuple[str, ...]], Tuple[str, ...]]:
+        """Tier -> networks and the default for services missing from the index
+
+        Profiles without explicit ``tiers`` learn them from the index: each
+        tier takes the assignment its rule-named services (postgres, caddy,
+        ...) share, and the default is what the remaining services share,
+        preferring internal-only networks.
+        """
+        definition = self.profiles[profile]
+        tiers = {tier: tuple(networks) for tier, networks in (definition.get('tiers') or {}).items()}
+        if definition.get('default_tier') in tiers:
+            return tiers, tiers[definition['default_tier']]
+
+        counts: Dict[Optional[str], Dict[Tuple[str, ...], int]] = {}
+        for service_name, networks in self.assignments[profile].items():
+            tier_counts = counts.setdefault(SERVICE_TIERS.get(service_name), {})
+            tier_counts[networks] = tier_counts.get(networks, 0) + 1
+        for tier, tier_counts in counts.items():
+            if tier is not None and tier not in tiers:
+                tiers[tier] = max(tier_counts, key=tier_counts.__getitem__)
+
+        unplaced = counts.get(None)
+        if unplaced:
+            # Keep unknown services off externally reachable networks when the
+            # profile has an internal-only assignment to offer
+            networks = definition.get('networks') or {}
+            internal = {
+                assigned: count for assigned, count in unplaced.items()
+                if all((networks.get(name) or {}).get('internal') for name in assigned)
+            }
+            candidates = internal or unplaced
+            return tiers, max(candidates, key=candidates.__getitem__)
+        if tiers:
+            return tiers, next(iter(tiers.values()))
+        return tiers, tuple(list(definition.get('networks') or {})[:1]) or ('default',)
+
+    def _assign_service_networks(self, service_name: str, service_config: Dict, profile: str) -> Tuple[str, ...]:
+        """Networks for a service the manifests do not place, by tier rules"""
+        tiers, default = self._fallback[profile]
+        return tiers.get(self._service_tier(service_name, service_config), default)
+
+    @staticmethod
+    def _service_tier(service_name: str, service_config: Dict) -> Optional[str]:
+        """Tier of a service from its name, then from its published ports"""
+        tier = SERVICE_TIERS.get(service_name)
+        if tier is not None:
+            return tier
+        for port in service_config.get('ports') or []:
+            if not WEB_PORTS.isdisjoint(port_numbers(port)):
+                return 'web'
+        return None
+
+def main(argv: Optional[List[str]] = None):
     import argparse
-    import sys
 
     parser = argparse.ArgumentParser(description='Apply network security profiles to Docker Compose')
     parser.add_argument('--compose-file', required=True, help='Input Docker Compose file')
-    parser.add_argument('--profile', required=True, choices=['chirashi', 'temaki', 'inari'],
-                       help='Network security profile')
+    parser.add_argument('--profile', required=True,
+                       help='Network security profile (chirashi, temaki, inari or a template name)')
+    parser.add_argument('--manifest-dir',
+                       help='Load profiles and service networks from contracts.yml in this directory '
+                            '(default: built-in profiles)')
+    parser.add_argument('--templates-dir',
+                       help='Network profile templates (default: templates/network-profiles next to the manifests)')
     parser.add_argument('--output', help='Output file (default: stdout)')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    import yaml
 
     # Load compose file
     try:
@@ -169,7 +311,11 @@ def main():
         sys.exit(1)
 
     # Apply network configuration
-    generator = NetworkConfigGenerator()
+    if args.manifest_dir:
+        templates_dir = Path(args.templates_dir) if args.templates_dir else None
+        generator = NetworkConfigGenerator.from_manifests(Path(args.manifest_dir), templates_dir)
+    else:
+        generator = NetworkConfigGenerator()
     try:
         result = generator.generate(compose_dict, args.profile)
     except ValueError as e:
@@ -186,4 +332,9 @@ def main():
         print(output_yaml)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    from script_worker import serve, worker_requested
+
+    if worker_requested():
+        serve(main, __file__)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""Sushi Kitchen — Synthetic manifest generator
+
+Writes a schema-valid ``contracts.yml`` / ``combos.yml`` / ``bento-box.yml`` /
+``platters.yml`` set of arbitrary size for scale-testing the resolvers,
+bundle expansion and capability resolution.
+
+Shape of the generated catalog:
+
+* Services are spread over ``--dependency-depth`` layers.  Each capability
+  belongs to one layer and is provided by ``--capability-fanout`` services
+  of that layer; every service above layer 0 requires
+  ``--requires-per-service`` capabilities of the layer below, so the longest
+  dependency chain is ``--dependency-depth`` services.
+* ``--cycles`` leaf services additionally require a capability of the top
+  layer, closing that many dependency cycles.
+* Combos nest ``--bundle-depth`` levels deep (level *k* includes one combo
+  of level *k-1*); bento boxes include a top-level combo; platters pick
+  top-level combos.
+
+Output is deterministic for a given ``--seed``.  When ``jsonschema`` is
+installed the documents are validated against ``docs/manifest/schemas``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_DIR = REPO_ROOT / "docs" / "manifest" / "schemas"
+SUMMARY_FILE = "synthetic-manifest.json"
+
+# manifest file -> schema file
+DOCUMENTS = {
+    "contracts.yml": "contracts.schema.json",
+    "combos.yml": "combos.schema.json",
+    "bento-box.yml": "bento-box.schema.json",
+    "platters.yml": "platters.schema.json",
+}
+
+SERVICE_CATEGORIES = (
+    "hosomaki", "futomaki", "uramaki", "nigiri", "temaki",
+    "gunkanmaki", "inari", "sashimi", "chirashi", "otsumami",
+)
+COMBO_CATEGORIES = ("chat", "dev", "rag", "agents", "observability", "data", "inference", "workflow")
+BENTO_CATEGORIES = ("agents", "knowledge", "intelligence", "analytics", "development", "enterprise")
+PLATTER_CATEGORIES = ("foundational", "specialized", "enterprise", "showcase")
+PRIVACY_PROFILES = ("open_research", "business_confidential", "legal_privilege")
+NETWORKS = {"chirashi": ["sushi_net"], "temaki": ["sushi_frontend", "sushi_backend"], "inari": ["sushi_processing"]}
+FILLER = (
+    "Synthetic entry generated for resolver scale testing. It carries no real "
+    "deployment meaning; its members, capabilities and dependencies are chosen "
+    "by a seeded generator so that large catalogs can be reproduced exactly. "
+)
+
+
+@dataclass
+class SyntheticSpec:
+    """Parameters of one synthetic catalog."""
+
+    services: int = 1000
+    capability_fanout: int = 3
+    requires_per_service: int = 2
+    dependency_depth: int = 4
+    cycles: int = 0
+    combos: int = 50
+    bundle_depth: int = 2
+    bentos: int = 25
+    platters: int = 20
+    seed: int = 0
+
+
+# ----------------------------------------------------------------------
+# Naming
+# ----------------------------------------------------------------------
+def letters(index: int) -> str:
+    """Encode *index* with a-z only (capability and bundle IDs allow no digits)."""
+    text = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        text = chr(ord("a") + remainder) + text
+    return text
+
+
+def service_id(index: int) -> str:
+    return f"{SERVICE_CATEGORIES[index % len(SERVICE_CATEGORIES)]}.syn-{index:06d}"
+
+
+def capability_id(layer: int, index: int) -> str:
+    return f"cap.syn-{letters(layer)}-{letters(index)}"
+
+
+def describe(kind: str, identifier: str, minimum: int) -> str:
+    text = f"Synthetic {kind} {identifier}. "
+    while len(text) < minimum:
+        text += FILLER
+    return text.strip()
+
+
+# ----------------------------------------------------------------------
+# Generation
+# ----------------------------------------------------------------------
+def build_contracts(spec: SyntheticSpec, rng: random.Random) -> Tuple[Dict[str, Any], List[List[str]], Dict[str, List[str]]]:
+    """Return the contracts document, service IDs per layer and capabilities per service."""
+    depth = max(1, spec.dependency_depth)
+    layers: List[List[str]] = [[] for _ in range(depth)]
+    for index in range(spec.services):
+        layers[index * depth // max(1, spec.services)].append(service_id(index))
+
+    capabilities: Dict[str, Dict[str, Any]] = {}
+    layer_caps: List[List[str]] = []
+    provided: Dict[str, List[str]] = {}
+    for layer, members in enumerate(layers):
+        count = max(1, math.ceil(len(members) / max(1, spec.capability_fanout)))
+        caps = [capability_id(layer, index) for index in range(count)]
+        layer_caps.append(caps)
+        for position, member in enumerate(members):
+            cap = caps[position % count]
+            provided[member] = [cap]
+            capabilities.setdefault(
+                cap,
+                {
+                    "description": f"Synthetic capability {cap} (dependency layer {layer})",
+                    "providers": [],
+                    "interface": "Synthetic REST API",
+                },
+            )["providers"].append(member)
+
+    services: Dict[str, Dict[str, Any]] = {}
+    for layer, members in enumerate(layers):
+        below = layer_caps[layer - 1] if layer else []
+        for member in members:
+            number = int(member.rsplit("-", 1)[1])
+            contract: Dict[str, Any] = {
+                "name": f"Synthetic Service {number}",
+                "docker": {
+                    "image": f"synthetic/svc-{number:06d}:latest",
+                    "profiles": [member.split(".", 1)[0]],
+                },
+                "ports": [
+                    {
+                        "container": 8000 + number % 1000,
+                        "host_range": str(20000 + number % 40000),
+                        "protocol": "tcp",
+                        "description": "Synthetic HTTP endpoint",
+                    }
+                ],
+                "volumes": [
+                    {"name": f"syn_{number:06d}_data", "mount": "/data", "type": "named"}
+                ],
+                "environment": {"SYNTHETIC_LAYER": str(layer)},
+                "provides": provided[member],
+                "resource_requirements": {
+                    "cpu_cores": rng.choice((0.5, 1, 2)),
+                    "memory_mb": rng.choice((256, 512, 1024, 2048)),
+                    "storage_gb": rng.choice((1, 5, 10)),
+                },
+                "networks": NETWORKS,
+            }
+            if below:
+                contract["requires"] = sorted(
+                    rng.sample(below, min(len(below), max(1, spec.requires_per_service)))
+                )
+            services[member] = contract
+
+    # Close cycles: leaves that require a capability of the top layer.
+    if depth > 1 and spec.cycles:
+        for member in rng.sample(layers[0], min(len(layers[0]), spec.cycles)):
+            services[member]["requires"] = [rng.choice(layer_caps[-1])]
+
+    contracts = {
+        "schema_version": "1.0",
+        "capabilities": capabilities,
+        "services": services,
+        "dependency_resolution": {
+            "auto_resolve_providers": True,
+            "default_providers": {cap: data["providers"][0] for cap, data in capabilities.items()},
+        },
+    }
+    return contracts, layers, provided
+
+
+def _provides(members: Sequence[str], provided: Dict[str, List[str]], maximum: int) -> List[str]:
+    caps: List[str] = []
+    for member in members:
+        for cap in provided.get(member, []):
+            if cap not in caps:
+                caps.append(cap)
+    return caps[:maximum]
+
+
+def build_combos(
+    spec: SyntheticSpec, rng: random.Random, pool: List[str], provided: Dict[str, List[str]]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Return the combos document and the IDs of the top nesting level."""
+    depth = max(1, spec.bundle_depth)
+    combos: List[Dict[str, Any]] = []
+    levels: List[List[str]] = [[] for _ in range(depth)]
+    for index in range(spec.combos):
+        level = index % depth
+        combo_id = f"combo.syn-{letters(index)}"
+        members: List[str] = []
+        if level and levels[level - 1]:
+            members.append(rng.choice(levels[level - 1]))
+        members.extend(rng.sample(pool, min(len(pool), rng.randint(1, 4 - len(members)))))
+        # A nested combo provides what its inner combo provides as well.
+        provided[combo_id] = _provides(members, provided, 8)
+        combos.append(
+            {
+                "id": combo_id,
+                "name": f"Synthetic Combo {letters(index).upper()}",
+                "description": describe("combo", combo_id, 100),
+                "includes": members,
+                "optional": [],
+                "provides": provided[combo_id],
+                "category": COMBO_CATEGORIES[index % len(COMBO_CATEGORIES)],
+                "difficulty": "intermediate",
+            }
+        )
+        levels[level].append(combo_id)
+    top = levels[-1] or [combo["id"] for combo in combos]
+    return {"schema_version": "1.0", "combos": combos}, top
+
+
+def build_bento(
+    spec: SyntheticSpec,
+    rng: random.Random,
+    pool: List[str],
+    top_combos: List[str],
+    provided: Dict[str, List[str]],
+    capabilities: List[str],
+) -> Dict[str, Any]:
+    boxes: List[Dict[str, Any]] = []
+    for index in range(spec.bentos):
+        box_id = f"bento.syn-{letters(index)}"
+        members = [rng.choice(top_combos)] if top_combos else []
+        members.extend(rng.sample(pool, min(len(pool), rng.randint(4, 9) - len(members) + 1)))
+        caps = _provides(members, provided, 12)
+        # The schema wants at least three; top up from the whole catalog.
+        for cap in capabilities:
+            if len(caps) >= 3:
+                break
+            if cap not in caps:
+                caps.append(cap)
+        boxes.append(
+            {
+                "id": box_id,
+                "name": f"Synthetic Bento {letters(index).upper()}",
+                "description": describe("bento box", box_id, 200),
+                "includes": members,
+                "optional": [],
+                "provides": caps,
+                "category": BENTO_CATEGORIES[index % len(BENTO_CATEGORIES)],
+                "difficulty": "advanced",
+            }
+        )
+    return {"schema_version": "1.0", "bento_boxes": boxes}
+
+
+def build_platters(spec: SyntheticSpec, rng: random.Random, pool: List[str], top_combos: List[str]) -> Dict[str, Any]:
+    platters: List[Dict[str, Any]] = []
+    for index in range(spec.platters):
+        platter_id = f"platter.syn-{letters(index)}"
+        platters.append(
+            {
+                "id": platter_id,
+                "name": f"Synthetic Platter {letters(index).upper()}",
+                "description": describe("platter", platter_id, 200),
+                "category": PLATTER_CATEGORIES[index % len(PLATTER_CATEGORIES)],
+                "target_audience": ["scale-testing"],
+                "combos": rng.sample(top_combos, min(len(top_combos), rng.randint(1, 10))),
+                "additional_services": rng.sample(pool, min(len(pool), rng.randint(0, 15))),
+                "privacy_profile": PRIVACY_PROFILES[index % len(PRIVACY_PROFILES)],
+                "resource_requirements": {
+                    "cpu_cores": 8,
+                    "memory_gb": 16,
+                    "storage_gb": 200,
+                    "gpu_required": False,
+                },
+            }
+        )
+    return {"schema_version": "1.0", "platters": platters}
+
+
+def generate_catalog(spec: SyntheticSpec) -> Dict[str, Dict[str, Any]]:
+    """Build the four manifest documents, keyed by file name."""
+    if spec.services < 1:
+        raise ValueError("services must be at least 1")
+    rng = random.Random(spec.seed)
+    contracts, layers, provided = build_contracts(spec, rng)
+    # Bundles draw from the top layer so expanding them walks the full depth.
+    pool = layers[-1] or list(contracts["services"])
+    combos, top_combos = build_combos(spec, rng, pool, provided)
+    return {
+        "contracts.yml": contracts,
+        "combos.yml": combos,
+        "bento-box.yml": build_bento(spec, rng, pool, top_combos, provided, list(contracts["capabilities"])),
+        "platters.yml": build_platters(spec, rng, pool, top_combos),
+    }
+
+
+# ----------------------------------------------------------------------
+# Validation and output
+# ----------------------------------------------------------------------
+def validate_catalog(documents: Dict[str, Dict[str, Any]], schema_dir: Path) -> List[str]:
+    """Validate *documents* against the JSON schemas; return error messages."""
+    import jsonschema
+
+    errors: List[str] = []
+    for name, schema_name in DOCUMENTS.items():
+        schema = json.loads((schema_dir / schema_name).read_text(encoding="utf-8"))
+        validator_class = jsonschema.validators.validator_for(schema)
+        for error in validator_class(schema).iter_errors(documents[name]):
+            location = "/".join(str(part) for part in error.absolute_path)
+            message = error.message if len(error.message) <= 200 else error.message[:197] + "..."
+            errors.append(f"{name}: {location or '<root>'}: {message}")
+    return errors
+
+
+class _PlainDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):  # type: ignore[misc]
+    """Write shared lists in full instead of as YAML anchors and aliases."""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
+
+def write_catalog(documents: Dict[str, Dict[str, Any]], spec: SyntheticSpec, output_dir: Path) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, document in documents.items():
+        with (output_dir / name).open("w", encoding="utf-8") as handle:
+            yaml.dump(document, handle, Dumper=_PlainDumper, sort_keys=False)
+    summary = {
+        "spec": asdict(spec),
+        "counts": {
+            "services": len(documents["contracts.yml"]["services"]),
+            "capabilities": len(documents["contracts.yml"]["capabilities"]),
+            "combos": len(documents["combos.yml"]["combos"]),
+            "bento_boxes": len(documents["bento-box.yml"]["bento_boxes"]),
+            "platters": len(documents["platters.yml"]["platters"]),
+        },
+    }
+    (output_dir / SUMMARY_FILE).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = SyntheticSpec()
+    parser = argparse.ArgumentParser(description="Generate schema-valid synthetic manifests for scale testing")
+    parser.add_argument("--output-dir", type=Path, required=True, help="Directory for the generated manifests.")
+    parser.add_argument("--services", type=int, default=defaults.services, help="Number of services.")
+    parser.add_argument(
+        "--capability-fanout",
+        type=int,
+        default=defaults.capability_fanout,
+        help="Providers per capability.",
+    )
+    parser.add_argument(
+        "--requires-per-service",
+        type=int,
+        default=defaults.requires_per_service,
+        help="Capabilities each non-leaf service requires from the layer below.",
+    )
+    parser.add_argument(
+        "--dependency-depth",
+        type=int,
+        default=defaults.dependency_depth,
+        help="Number of dependency layers (longest requires chain).",
+    )
+    parser.add_argument(
+        "--cycles",
+        type=int,
+        default=defaults.cycles,
+        help="Leaf services that also require a top-layer capability, closing a cycle.",
+    )
+    parser.add_argument("--combos", type=int, default=defaults.combos, help="Number of combos (schema max 50).")
+    parser.add_argument(
+        "--bundle-depth",
+        type=int,
+        default=defaults.bundle_depth,
+        help="Combo nesting levels (1 = combos include services only).",
+    )
+    parser.add_argument("--bentos", type=int, default=defaults.bentos, help="Number of bento boxes (schema max 25).")
+    parser.add_argument("--platters", type=int, default=defaults.platters, help="Number of platters (schema max 20).")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed.")
+    parser.add_argument("--schema-dir", type=Path, default=SCHEMA_DIR, help="Directory of *.schema.json files.")
+    parser.add_argument(
+        "--skip-validation",
+        action="store_true",
+        help="Do not validate against the JSON schemas (e.g. for counts beyond schema limits).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    spec = SyntheticSpec(
+        services=args.services,
+        capability_fanout=args.capability_fanout,
+        requires_per_service=args.requires_per_service,
+        dependency_depth=args.dependency_depth,
+        cycles=args.cycles,
+        combos=args.combos,
+        bundle_depth=args.bundle_depth,
+        bentos=args.bentos,
+        platters=args.platters,
+        seed=args.seed,
+    )
+    documents = generate_catalog(spec)
+
+    errors: List[str] = []
+    if not args.skip_validation:
+        try:
+            errors = validate_catalog(documents, args.schema_dir)
+        except ImportError:
+            print("jsonschema is not installed; skipping schema validation", file=sys.stderr)
+    if errors:
+        for error in errors[:20]:
+            print(f"Schema error: {error}", file=sys.stderr)
+        if len(errors) > 20:
+            print(f"... and {len(errors) - 20} more", file=sys.stderr)
+        raise SystemExit(1)
+
+    write_catalog(documents, spec, args.output_dir)
+    contracts = documents["contracts.yml"]
+    print(
+        f"Wrote {len(contracts['services'])} services, {len(contracts['capabilities'])} capabilities, "
+        f"{spec.combos} combos, {spec.bentos} bento boxes and {spec.platters} platters to {args.output_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Admission control for compose generation.
+Identical concurrent requests share one in-flight generation (single
+flight), and a global semaphore caps how many distinct generations run at
+once. A request that cannot get a slot within the queue timeout is
+rejected with ``GenerationSaturated`` so the route can answer 429.
+"""
+
+import asyncio
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class GenerationSaturated(Exception):
+    """No generation slot became free within the queue timeout"""
+
+    def __init__(self, waited: float, retry_after: int):
+        super().__init__(f"Generation capacity exhausted after waiting {waited:.2f}s")
+        self.waited = waited
+        self.retry_after = retry_after
+
+
+class GenerationLimiter:
+    """Single-flight coalescing plus a concurrency cap for generations"""
+
+    def __init__(self, max_concurrent: int = 4, queue_timeout: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.active = 0
+        self.waiting = 0
+        self.started = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.total_queue_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'GenerationLimiter':
+        return cls(
+            max_concurrent=int(os.getenv('SUSHI_MAX_CONCURRENT_GENERATIONS', '4')),
+            queue_timeout=float(os.getenv('SUSHI_GENERATION_QUEUE_TIMEOUT_SECONDS', '10'))
+        )
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the generation for *key*, starting it only if none is in flight
+
+        Returns ``(result, queue_seconds)``; followers report zero queue time.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            result, _ = await asyncio.shield(task)
+            return result, 0.0
+
+        task = asyncio.ensure_future(self._admit(factory))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a disconnecting leader does not cancel work its
+        # followers are waiting on.
+        return await asyncio.shield(task)
+
+    async def _admit(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if self._semaphore is None:
+            # Created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            waited = time.perf_counter() - queued_at
+            self.rejected += 1
+            raise GenerationSaturated(waited, self._retry_after())
+        finally:
+            self.waiting -= 1
+
+        queue_seconds = time.perf_counter() - queued_at
+        self.total_queue_seconds += queue_seconds
+        self.active += 1
+        self.started += 1
+        started_at = time.perf_counter()
+        try:
+            return await factory(), queue_seconds
+        finally:
+            self.total_run_seconds += time.perf_counter() - started_at
+            self.active -= 1
+            self._semaphore.release()
+
+    def _retry_after(self) -> int:
+        average = self.total_run_seconds / self.started if self.started else 1.0
+        backlog = (self.waiting + self.active) / max(1, self.max_concurrent)
+        return max(1, math.ceil(average * backlog))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'queue_timeout_seconds': self.queue_timeout,
+            'active': self.active,
+            'waiting': self.waiting,
+            'in_flight_keys': len(self._inflight),
+            'started': self.started,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'avg_queue_ms': (self.total_queue_seconds / self.started * 1000) if self.started else 0.0,
+            'avg_generation_ms': (self.total_run_seconds / self.started * 1000) if self.started else 0.0
+        }
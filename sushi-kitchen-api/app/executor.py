@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Bounded execution layer for work that must not run on the event loop.
+Blocking file I/O and calls into resident (non-picklable) state go to a
+thread pool; CPU-bound pure functions such as YAML serialization go to a
+separate pool that can be threads or processes. Both pools are bounded and
+report queue depth and wait times.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .profiling import current_session
+
+POOL_THREAD = 'thread'
+POOL_PROCESS = 'process'
+
+
+class PoolMetrics:
+    """Counters for one pool; updated from the event loop and worker threads"""
+
+    def __init__(self, name: str, kind: str, workers: int):
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    @property
+    def queue_depth(self) -> int:
+        if self.kind == POOL_THREAD:
+            return self.in_flight - self.running
+        # Process workers cannot report when they start; estimate from capacity
+        return max(0, self.in_flight - self.workers)
+
+    def on_submit(self) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def on_start(self, waited: float) -> None:
+        with self._lock:
+            self.running += 1
+            self.total_wait_seconds += waited
+
+    def on_finish(self, elapsed: float, ok: bool, started: bool) -> None:
+        with self._lock:
+            if started and self.kind == POOL_THREAD:
+                self.running -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.total_run_seconds += elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'in_flight': self.in_flight,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_wait_ms': (self.total_wait_seconds / finished * 1000) if finished and self.kind == POOL_THREAD else None,
+            'avg_latency_ms': (self.total_run_seconds / finished * 1000) if finished else 0.0
+        }
+
+
+class ExecutionLayer:
+    """Run blocking and CPU-bound callables off the event loop"""
+
+    def __init__(self, blocking_workers: int = 8, cpu_workers: Optional[int] = None, cpu_pool: str = POOL_THREAD):
+        cpu_workers = cpu_workers or os.cpu_count() or 1
+        if cpu_pool not in (POOL_THREAD, POOL_PROCESS):
+            raise ValueError(f"Unknown CPU pool kind: {cpu_pool}")
+
+        self._blocking = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix='sushi-io')
+        if cpu_pool == POOL_PROCESS:
+            self._cpu: Executor = ProcessPoolExecutor(max_workers=cpu_workers)
+        else:
+            self._cpu = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix='sushi-cpu')
+
+        self.metrics = {
+            'blocking': PoolMetrics('blocking', POOL_THREAD, blocking_workers),
+            'cpu': PoolMetrics('cpu', cpu_pool, cpu_workers)
+        }
+
+    @classmethod
+    def from_env(cls) -> 'ExecutionLayer':
+        return cls(
+            blocking_workers=int(os.getenv('SUSHI_IO_WORKERS', '8')),
+            cpu_workers=int(os.getenv('SUSHI_CPU_WORKERS', '0')) or None,
+            cpu_pool=os.getenv('SUSHI_CPU_POOL', POOL_THREAD).lower()
+        )
+
+    async def run_blocking(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run *fn* in the I/O thread pool (may touch process-resident state)"""
+        return await self._submit(self._blocking, self.metrics['blocking'], fn, args, kwargs)
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a CPU-bound *fn* in the CPU pool; with processes, *fn* and its arguments must be picklable"""
+        return await self._submit(self._cpu, self.metrics['cpu'], fn, args, kwargs)
+
+    async def _submit(self, pool: Executor, metrics: PoolMetrics, fn: Callable, args, kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        submitted_at = time.perf_counter()
+        started = False
+
+        if metrics.kind == POOL_THREAD:
+            session = current_session()
+            if session is not None:
+                call = session.wrap(call)
+
+            def tracked():
+                nonlocal started
+                started = True
+                metrics.on_start(time.perf_counter() - submitted_at)
+                return call()
+            target = tracked
+        else:
+            target = call
+
+        metrics.on_submit()
+        ok = False
+        try:
+            result = await loop.run_in_executor(pool, target)
+            ok = True
+            return result
+        finally:
+            metrics.on_finish(time.perf_counter() - submitted_at, ok, started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+    def shutdown(self) -> None:
+        self._blocking.shutdown(wait=False, cancel_futures=True)
+        self._cpu.shutdown(wait=False, cancel_futures=True)
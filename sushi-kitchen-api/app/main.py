@@ -1,7 +1,15 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from .manifest_cache import choose_encoding, etag_matches
+from .shard_store import Shard
+from .admission import GenerationLimiter, GenerationSaturated
+from .executor import ExecutionLayer
+from .metrics import REQUEST_LATENCY, RuntimeStatsCollector, stage_timer
+from .profiling import PROFILE_HEADER, ProfileRecorder
 from .orchestrators.manifest_orchestrator import ManifestOrchestrator
+from .result_cache import GenerationResultCache
 from .models import (
     GenerateRequest,
     GenerateResponse,
@@ -9,11 +17,14 @@ from .models import (
     HealthResponse,
     ComponentInfo
 )
+import logging
 import os
 import yaml
-import asyncio
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Sushi Kitchen API",
@@ -32,39 +43,154 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Bounded pools for blocking I/O and CPU-heavy serialization
+executor = ExecutionLayer.from_env()
+
+# Coalesces identical in-flight generations and caps concurrent ones
+generation_limiter = GenerationLimiter.from_env()
+
+# Opt-in profiling of generate requests (armed via /admin/profiles/arm)
+profile_recorder = ProfileRecorder.from_env()
+
 # Initialize orchestrator
 core_repo_path = os.getenv("CORE_REPO_PATH", "/app")  # Path to mounted sushi-kitchen repo
-orchestrator = ManifestOrchestrator(core_repo_path)
+orchestrator = ManifestOrchestrator(core_repo_path, executor=executor)
+
+# Memoized generation results, keyed by request fields + manifest digest
+result_cache = GenerationResultCache(
+    max_bytes=int(float(os.getenv("SUSHI_RESULT_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    ttl_seconds=float(os.getenv("SUSHI_RESULT_CACHE_TTL_SECONDS", "600"))
+)
+
+# Cache, executor and admission counters are read at scrape time
+REGISTRY.register(RuntimeStatsCollector({
+    'bundle': orchestrator.bundle_cache.stats,
+    'bundle_file': orchestrator.bundle_file.stats,
+    'shards': orchestrator.shard_store.stats,
+    'results': result_cache.stats,
+    'executor': executor.stats,
+    'generations': generation_limiter.stats,
+    'script_workers': lambda: orchestrator.script_workers.stats() if orchestrator.script_workers else {}
+}))
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe latency per route template so path parameters do not explode cardinality"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, 'path', 'unmatched'),
+            status=str(status)
+        ).observe(time.perf_counter() - started)
+
+def dump_compose_yaml(compose_dict: Dict) -> str:
+    """Serialize a compose dict; module-level so process pools can run it"""
+    return yaml.dump(compose_dict, default_flow_style=False, sort_keys=False)
+
+@app.on_event("startup")
+async def prewarm_script_workers():
+    await orchestrator.prewarm_script_workers()
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    if orchestrator.script_workers is not None:
+        orchestrator.script_workers.close()
+    executor.shutdown()
 
 @app.post("/api/v1/compose/generate", response_model=GenerateResponse)
-async def generate_compose(request: GenerateRequest):
+async def generate_compose(request: GenerateRequest, response: Response, http_request: Request):
     """Generate Docker Compose configuration"""
+    if not profile_recorder.wants(http_request.headers):
+        return await handle_generate(request, response)
+
+    session = profile_recorder.begin(f"{request.selection_type}-{request.selection_id}")
+    if session is None:
+        response.headers[PROFILE_HEADER] = 'busy'
+        return await handle_generate(request, response)
     try:
-        # Generate the complete stack
-        result_dict = await orchestrator.generate_complete_stack(
-            selection_type=request.selection_type,
-            selection_id=request.selection_id,
-            profile=request.privacy_profile,
-            include_optional=request.include_optional
+        return await handle_generate(request, response)
+    finally:
+        session.stop()
+        # A profile that cannot be written must not replace the handler's outcome
+        try:
+            profile = await executor.run_blocking(profile_recorder.save, session)
+        except Exception as exc:
+            logger.warning("Could not save profile %s: %s", session.label, exc)
+        else:
+            response.headers[PROFILE_HEADER] = profile['id']
+
+async def handle_generate(request: GenerateRequest, response: Response) -> GenerateResponse:
+    try:
+        cache_key = result_cache.make_key(
+            request.selection_type,
+            request.selection_id,
+            request.privacy_profile,
+            request.include_optional,
+            await executor.run_blocking(orchestrator.generation_digest)
         )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return GenerateResponse(
+                yaml=cached.yaml,
+                services=list(cached.services),
+                profile=request.privacy_profile,
+                success=True,
+                validation=cached.validation
+            )
 
-        # Convert to YAML
-        result_yaml = yaml.dump(result_dict, default_flow_style=False, sort_keys=False)
-
-        # Validate the configuration
-        validation = await orchestrator.validate_configuration(result_dict)
+        # Identical concurrent requests share one generation
+        (result_yaml, services, validation), queue_seconds = await generation_limiter.run(
+            cache_key,
+            lambda: run_generation(request, cache_key)
+        )
+        response.headers['X-Sushi-Queue-Ms'] = f"{queue_seconds * 1000:.1f}"
 
         return GenerateResponse(
             yaml=result_yaml,
-            services=list(result_dict.get('services', {}).keys()),
+            services=list(services),
             profile=request.privacy_profile,
             success=True,
             validation=validation
         )
 
+    except GenerationSaturated as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many concurrent generations; queued {e.waited:.2f}s without a free slot",
+            headers={'Retry-After': str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
+async def run_generation(request: GenerateRequest, cache_key) -> tuple:
+    """Generate, serialize, validate and memoize one stack"""
+    # Generate the complete stack
+    result_dict = await orchestrator.generate_complete_stack(
+        selection_type=request.selection_type,
+        selection_id=request.selection_id,
+        profile=request.privacy_profile,
+        include_optional=request.include_optional
+    )
+
+    # Convert to YAML
+    with stage_timer('yaml_dump'):
+        result_yaml = await executor.run_cpu(dump_compose_yaml, result_dict)
+
+    # Validate the configuration
+    with stage_timer('validation'):
+        validation = await orchestrator.validate_configuration(result_dict)
+
+    services = list(result_dict.get('services', {}).keys())
+    result_cache.put(cache_key, result_yaml, services, validation)
+    return result_yaml, services, validation
+
 @app.get("/api/v1/components", response_model=AvailableComponentsResponse)
 async def get_available_components():
     """Get all available platters, combos, and rolls"""
@@ -118,10 +244,31 @@ async def get_available_components():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load components: {str(e)}")
 
+def shard_response(request: Request, shard: Shard) -> Response:
+    """Return a shard's stored bytes, honouring If-None-Match"""
+    headers = {'ETag': shard.etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('if-none-match'), shard.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=shard.data, media_type='application/json', headers=headers)
+
+async def entity_shard_response(request: Request, section: str, entity_id: str, label: str) -> Optional[Response]:
+    """Serve one entity from the shard store; None if shards are unavailable"""
+    store = orchestrator.shard_store
+    if not await executor.run_blocking(store.available):
+        return None
+    shard = await executor.run_blocking(store.entity, section, entity_id)
+    if shard is None:
+        raise HTTPException(status_code=404, detail=f"{label} '{entity_id}' not found")
+    return shard_response(request, shard)
+
 @app.get("/api/v1/components/platter/{platter_id}")
-async def get_platter_details(platter_id: str):
+async def get_platter_details(platter_id: str, request: Request):
     """Get detailed information about a specific platter"""
     try:
+        response = await entity_shard_response(request, 'platters', platter_id, 'Platter')
+        if response is not None:
+            return response
+
         components = await orchestrator.get_available_components()
         platter = components.get('platters', {}).get(platter_id)
 
@@ -135,9 +282,13 @@ async def get_platter_details(platter_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get platter details: {str(e)}")
 
 @app.get("/api/v1/components/combo/{combo_id}")
-async def get_combo_details(combo_id: str):
+async def get_combo_details(combo_id: str, request: Request):
     """Get detailed information about a specific combo"""
     try:
+        response = await entity_shard_response(request, 'combos', combo_id, 'Combo')
+        if response is not None:
+            return response
+
         components = await orchestrator.get_available_components()
         combo = components.get('combos', {}).get(combo_id)
 
@@ -150,15 +301,38 @@ async def get_combo_details(combo_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get combo details: {str(e)}")
 
+@app.get("/api/v1/components/roll/{roll_id}")
+async def get_roll_details(roll_id: str, request: Request):
+    """Get detailed information about a specific roll"""
+    try:
+        response = await entity_shard_response(request, 'services', roll_id, 'Roll')
+        if response is not None:
+            return response
+
+        components = await orchestrator.get_available_components()
+        roll = components.get('rolls', {}).get(roll_id)
+
+        if not roll:
+            raise HTTPException(status_code=404, detail=f"Roll '{roll_id}' not found")
+
+        return roll
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get roll details: {str(e)}")
+
 @app.post("/api/v1/compose/validate")
-async def validate_compose(compose_yaml: str):
-    """Validate a Docker Compose YAML configuration"""
+async def validate_compose(compose_yaml: str, suggest_ports: bool = False):
+    """Validate a Docker Compose YAML configuration
+
+    With suggest_ports=true, conflicting host ports get free replacements
+    """
     try:
         # Parse YAML
-        compose_dict = yaml.safe_load(compose_yaml)
+        compose_dict = await executor.run_cpu(yaml.safe_load, compose_yaml)
 
         # Validate
-        validation = await orchestrator.validate_configuration(compose_dict)
+        validation = await orchestrator.validate_configuration(compose_dict, suggest_ports=suggest_ports)
 
         return validation
     except yaml.YAMLError as e:
@@ -236,37 +410,99 @@ async def get_typescript_types():
         raise HTTPException(status_code=404, detail="TypeScript types not found. Run CI/CD pipeline to generate.")
 
     try:
-        with types_path.open() as f:
-            return f.read()
+        return await executor.run_blocking(types_path.read_text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read types: {str(e)}")
 
 @app.get("/api/v1/bundle")
-async def get_api_bundle():
-    """Get the raw API bundle JSON"""
-    bundle_path = Path(__file__).parent.parent / 'generated' / 'api-bundle.json'
-
-    # Also check Docker mount point
-    if not bundle_path.exists():
-        bundle_path = Path('/app/generated/api-bundle.json')
-
-    if not bundle_path.exists():
+async def get_api_bundle(request: Request):
+    """Get the raw API bundle JSON (precompressed, with a strong ETag per encoding)"""
+    bundle = await executor.run_blocking(orchestrator.bundle_file.get)
+    if bundle is None:
         raise HTTPException(status_code=404, detail="API bundle not found. Run CI/CD pipeline to generate.")
 
-    try:
-        with bundle_path.open() as f:
-            return json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read bundle: {str(e)}")
+    encoding = choose_encoding(request.headers.get('accept-encoding'), bundle.variants)
+    headers = {
+        'ETag': bundle.etags[encoding],
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'no-cache'
+    }
+    if etag_matches(request.headers.get('if-none-match'), bundle.etags[encoding]):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(content=bundle.variants[encoding], media_type='application/json', headers=headers)
+
+@app.get("/api/v1/bundle/sections/{section}")
+async def get_bundle_section(section: str, request: Request):
+    """Get one section of the API bundle (services, combos, platters, ...)"""
+    store = orchestrator.shard_store
+    shard = await executor.run_blocking(store.section, section)
+    if shard is None:
+        if not await executor.run_blocking(store.available):
+            raise HTTPException(status_code=404, detail="Bundle shards not found. Run CI/CD pipeline to generate.")
+        raise HTTPException(status_code=404, detail=f"Bundle section '{section}' not found")
+    return shard_response(request, shard)
 
 # Admin endpoints (for CI/CD integration)
 @app.post("/admin/cache/refresh")
-async def refresh_cache(background_tasks: BackgroundTasks, bundle_url: str = None):
-    """Refresh cached manifest data (for CI/CD integration)"""
+async def refresh_cache(bundle_url: str = None):
+    """Reload cached manifest data (for CI/CD integration)"""
     # This would typically be protected by authentication
-    # For now, just return success
-    background_tasks.add_task(lambda: print(f"Cache refresh requested for {bundle_url}"))
-    return {"status": "refresh_scheduled", "bundle_url": bundle_url}
+    # bundle_url is accepted for CI compatibility; the bundle is re-read from the generated dir
+    bundle_stats = await executor.run_blocking(orchestrator.refresh_caches)
+    result_cache.clear()
+    return {
+        "status": "refreshed",
+        "bundle_url": bundle_url,
+        "cache": {"bundle": bundle_stats, "results": result_cache.stats()}
+    }
+
+@app.get("/admin/cache/stats")
+async def cache_stats():
+    """Report bundle and generation-result cache counters"""
+    return {
+        "bundle": orchestrator.bundle_cache.stats(),
+        "bundle_file": orchestrator.bundle_file.stats(),
+        "shards": orchestrator.shard_store.stats(),
+        "results": result_cache.stats()
+    }
+
+@app.get("/admin/executor/stats")
+async def executor_stats():
+    """Report worker pool sizes, queue depth and latency"""
+    return {
+        **executor.stats(),
+        'generations': generation_limiter.stats(),
+        'script_workers': orchestrator.script_workers.stats() if orchestrator.script_workers else None
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=generate_latest(REGISTRY), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+@app.get("/admin/profiles")
+async def list_profiles():
+    """List stored request profiles, newest first"""
+    return {
+        **profile_recorder.stats(),
+        'profiles': await executor.run_blocking(profile_recorder.profiles)
+    }
+
+@app.post("/admin/profiles/arm")
+async def arm_profiling(count: int = 1):
+    """Profile the next *count* generate requests (0 disarms)"""
+    return {'armed': profile_recorder.arm(count)}
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """Download one profile artifact (pstats or speedscope JSON)"""
+    path = await executor.run_blocking(profile_recorder.artifact, profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
+    return FileResponse(path, filename=path.name)
 
 # Error handlers
 @app.exception_handler(404)
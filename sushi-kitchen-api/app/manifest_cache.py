@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Process-wide, hot-reloading cache for the pre-built API bundle.
+The bundle is parsed once and served from memory; a cheap stat() of the
+file (mtime + size) decides when to re-read it, and the bundle's own
+``checksums`` block decides whether the re-read content actually changed.
+
+``EncodedBundleCache`` keeps the bundle's raw bytes and precompressed
+variants instead, for routes that hand the file to clients unchanged.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Content-Encoding tokens we can serve, best first
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+# Each content-coding is its own representation, so its strong ETag differs
+ETAG_SUFFIXES = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+
+class BundleSnapshot:
+    """Immutable view of one loaded bundle; replaced wholesale on reload"""
+
+    __slots__ = ('data', 'signature', 'checksums', 'loaded_at', 'load_seconds')
+
+    def __init__(self, data: Any, signature: Tuple[int, int], checksums: str, load_seconds: float):
+        self.data = data
+        self.signature = signature
+        self.checksums = checksums
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.load_seconds = load_seconds
+
+
+class ManifestCache:
+    """Serve the parsed API bundle from memory, reloading when it changes"""
+
+    def __init__(
+        self,
+        bundle_path: Path,
+        transform: Optional[Callable[[Dict], Any]] = None,
+        revalidate_interval: float = 1.0
+    ):
+        self.bundle_path = bundle_path
+        self.transform = transform or (lambda bundle: bundle)
+        self.revalidate_interval = revalidate_interval
+
+        self._snapshot: Optional[BundleSnapshot] = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+
+    def get(self) -> Optional[Any]:
+        """Return the cached (transformed) bundle, or None if unavailable"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._last_checked < self.revalidate_interval:
+            self.hits += 1
+            return snapshot.data
+        return self._revalidate(force=False)
+
+    def refresh(self) -> Dict:
+        """Force a re-read of the bundle and return the cache statistics"""
+        self._revalidate(force=True)
+        return self.stats()
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        lookups = self.hits + self.misses
+        return {
+            'bundle_path': str(self.bundle_path),
+            'loaded': snapshot is not None,
+            'loaded_at': snapshot.loaded_at if snapshot else None,
+            'load_seconds': snapshot.load_seconds if snapshot else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+            'last_error': self.last_error
+        }
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.bundle_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _revalidate(self, force: bool) -> Optional[Any]:
+        signature = self._stat_signature()
+        snapshot = self._snapshot
+        if signature is None:
+            # Bundle removed: stop serving it so callers fall back
+            self._snapshot = None
+            self.misses += 1
+            return None
+        if not force and snapshot is not None and snapshot.signature == signature:
+            self._last_checked = time.monotonic()
+            self.hits += 1
+            return snapshot.data
+
+        with self._lock:
+            # Another request may have reloaded while we waited for the lock
+            snapshot = self._snapshot
+            if not force and snapshot is not None and snapshot.signature == signature:
+                self.hits += 1
+                return snapshot.data
+
+            self.misses += 1
+            started = time.perf_counter()
+            try:
+                with self.bundle_path.open('rb') as f:
+                    bundle = json.loads(f.read())
+            except (OSError, json.JSONDecodeError) as e:
+                # Keep serving the last good snapshot, if any
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._last_checked = time.monotonic()
+                return snapshot.data if snapshot else None
+
+            checksums = json.dumps(bundle.get('checksums') or {}, sort_keys=True)
+            if snapshot is not None and checksums != '{}' and checksums == snapshot.checksums:
+                # File was rewritten from identical manifests: keep the data
+                data = snapshot.data
+            else:
+                data = self.transform(bundle)
+                self.reloads += 1
+
+            # Single reference assignment: readers see the old or new snapshot, never a mix
+            self._snapshot = BundleSnapshot(data, signature, checksums, time.perf_counter() - started)
+            self._last_checked = time.monotonic()
+            self.last_error = None
+            return data
+
+
+class EncodedBundle:
+    """Raw bytes of one bundle version, keyed by content encoding"""
+
+    __slots__ = ('signature', 'digest', 'variants', 'etags', 'loaded_at')
+
+    def __init__(self, signature: Tuple[int, int], digest: str, variants: Dict[str, bytes]):
+        self.signature = signature
+        self.digest = digest
+        self.variants = variants
+        self.etags = {
+            encoding: f'"{digest}{ETAG_SUFFIXES.get(encoding, "-" + encoding)}"' for encoding in variants
+        }
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+
+    @property
+    def etag(self) -> str:
+        """ETag of the uncompressed JSON"""
+        return self.etags['identity']
+
+
+class EncodedBundleCache:
+    """Serve the bundle file's bytes and precompressed variants from memory
+
+    Variants written by generate-api-bundle.py (``.gz``/``.br`` plus a
+    ``.meta.json`` holding the sha256) are used when their recorded hash
+    matches the JSON on disk; a missing gzip variant is compressed once at
+    load time. The JSON itself is never parsed. ``.br`` is only written when
+    the ``brotli`` package is installed, so without it br is never offered.
+    """
+
+    def __init__(self, bundle_path: Path, revalidate_interval: float = 1.0):
+        self.bundle_path = bundle_path
+        self.meta_path = bundle_path.with_name(f"{bundle_path.stem}.meta.json")
+        self.revalidate_interval = revalidate_interval
+
+        self._snapshot: Optional[EncodedBundle] = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+
+    def get(self) -> Optional[EncodedBundle]:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._last_checked < self.revalidate_interval:
+            self.hits += 1
+            return snapshot
+        return self._revalidate(force=False)
+
+    def refresh(self) -> Dict:
+        self._revalidate(force=True)
+        return self.stats()
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'bundle_path': str(self.bundle_path),
+            'loaded': snapshot is not None,
+            'etags': dict(snapshot.etags) if snapshot else {},
+            'encodings': {name: len(data) for name, data in snapshot.variants.items()} if snapshot else {},
+            'hits': self.hits,
+            'reloads': self.reloads,
+            'last_error': self.last_error
+        }
+
+    def _revalidate(self, force: bool) -> Optional[EncodedBundle]:
+        try:
+            stat = self.bundle_path.stat()
+        except OSError:
+            self._snapshot = None
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        snapshot = self._snapshot
+        if not force and snapshot is not None and snapshot.signature == signature:
+            self._last_checked = time.monotonic()
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if not force and snapshot is not None and snapshot.signature == signature:
+                self.hits += 1
+                return snapshot
+            try:
+                snapshot = self._load(signature)
+            except OSError as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._last_checked = time.monotonic()
+                return self._snapshot
+            self._snapshot = snapshot
+            self._last_checked = time.monotonic()
+            self.reloads += 1
+            self.last_error = None
+            return snapshot
+
+    def _load(self, signature: Tuple[int, int]) -> EncodedBundle:
+        raw = self.bundle_path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        variants = {'identity': raw}
+
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get('sha256') == digest:
+            for encoding, info in (meta.get('encodings') or {}).items():
+                try:
+                    variants[encoding] = (self.bundle_path.parent / info['path']).read_bytes()
+                except (OSError, KeyError, TypeError):
+                    continue
+        if 'gzip' not in variants:
+            variants['gzip'] = gzip.compress(raw, compresslevel=9, mtime=0)
+
+        return EncodedBundle(signature, digest, variants)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        # If-None-Match uses weak comparison
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Dict[str, bytes]) -> str:
+    """Pick the best available Content-Encoding allowed by Accept-Encoding"""
+    if not accept_encoding:
+        return 'identity'
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+
+    best, best_q = 'identity', 0.0
+    for encoding in PREFERRED_ENCODINGS:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Prometheus instrumentation for the API.
+Request latency per route, per-stage generation timings and core script
+calls are recorded as they happen; cache, executor, admission and script
+worker counters are read from their owners at scrape time by
+``RuntimeStatsCollector``.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Generation stages run in single-digit ms in-process and seconds via scripts
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'sushi_api_request_duration_seconds',
+    'HTTP request latency by route template',
+    ['method', 'route', 'status']
+)
+
+STAGE_LATENCY = Histogram(
+    'sushi_generation_stage_duration_seconds',
+    'Time spent in each compose generation stage',
+    ['stage', 'engine'],
+    buckets=STAGE_BUCKETS
+)
+
+SUBPROCESS_SPAWNS = Counter(
+    'sushi_subprocess_spawns_total',
+    'Core script subprocesses started',
+    ['script', 'outcome']
+)
+
+SUBPROCESS_DURATION = Histogram(
+    'sushi_subprocess_duration_seconds',
+    'Wall time of core script calls (spawned, or served by a warm worker)',
+    ['script', 'transport'],
+    buckets=STAGE_BUCKETS
+)
+
+
+@contextmanager
+def stage_timer(stage: str, engine: str = 'api') -> Iterator[None]:
+    """Observe the duration of one generation stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage=stage, engine=engine).observe(time.perf_counter() - started)
+
+
+def observe_subprocess(script: str, seconds: float, returncode: int, transport: str = 'spawn') -> None:
+    if transport == 'spawn':
+        SUBPROCESS_SPAWNS.labels(script=script, outcome='ok' if returncode == 0 else 'error').inc()
+    SUBPROCESS_DURATION.labels(script=script, transport=transport).observe(seconds)
+
+
+class RuntimeStatsCollector:
+    """Expose the existing stats() dictionaries as Prometheus metrics"""
+
+    def __init__(self, sources: Dict[str, Callable[[], Dict]]):
+        self.sources = sources
+
+    def collect(self):
+        hits = CounterMetricFamily('sushi_cache_hits', 'Cache hits', labels=['cache'])
+        misses = CounterMetricFamily('sushi_cache_misses', 'Cache misses', labels=['cache'])
+        ratio = GaugeMetricFamily('sushi_cache_hit_ratio', 'Cache hit ratio since start', labels=['cache'])
+        load = GaugeMetricFamily('sushi_bundle_load_seconds', 'Duration of the last bundle load', labels=['cache'])
+        reloads = CounterMetricFamily('sushi_bundle_reloads', 'Bundle reloads', labels=['cache'])
+        queue = GaugeMetricFamily('sushi_executor_queue_depth', 'Tasks waiting for a worker', labels=['pool'])
+        in_flight = GaugeMetricFamily('sushi_executor_in_flight', 'Tasks submitted and not finished', labels=['pool'])
+        generations = GaugeMetricFamily('sushi_generations', 'Generation admission state', labels=['state'])
+        admission = CounterMetricFamily('sushi_generation_admissions', 'Generation admission outcomes', labels=['outcome'])
+        workers_idle = GaugeMetricFamily('sushi_script_workers_idle', 'Warm script workers waiting for a call', labels=['script'])
+        worker_events = CounterMetricFamily(
+            'sushi_script_worker_events', 'Script worker spawns, calls, recycles and failures', labels=['script', 'event']
+        )
+
+        for name, source in self.sources.items():
+            try:
+                stats = source()
+            except Exception:
+                continue
+            if name == 'executor':
+                for pool, pool_stats in stats.items():
+                    queue.add_metric([pool], pool_stats['queue_depth'])
+                    in_flight.add_metric([pool], pool_stats['in_flight'])
+                continue
+            if name == 'generations':
+                generations.add_metric(['active'], stats['active'])
+                generations.add_metric(['waiting'], stats['waiting'])
+                for outcome in ('started', 'coalesced', 'rejected'):
+                    admission.add_metric([outcome], stats[outcome])
+                continue
+            if name == 'script_workers':
+                for script, worker_stats in stats.items():
+                    workers_idle.add_metric([script], worker_stats['idle'])
+                    for event in ('spawned', 'calls', 'recycled', 'failures'):
+                        worker_events.add_metric([script, event], worker_stats.get(event, 0))
+                continue
+            if 'hits' in stats:
+                hits.add_metric([name], stats['hits'])
+            if 'misses' in stats:
+                misses.add_metric([name], stats['misses'])
+            if 'hits' in stats and 'misses' in stats:
+                lookups = stats['hits'] + stats['misses']
+                ratio.add_metric([name], stats['hits'] / lookups if lookups else 0.0)
+            if stats.get('load_seconds') is not None:
+                load.add_metric([name], stats['load_seconds'])
+            if 'reloads' in stats:
+                reloads.add_metric([name], stats['reloads'])
+
+        return [hits, misses, ratio, load, reloads, queue, in_flight, generations, admission, workers_idle, worker_events]
@@ -11,6 +11,7 @@ class ValidationResult(BaseModel):
     valid: bool
     warnings: List[str] = []
     errors: List[str] = []
+    port_suggestions: Optional[List[Dict[str, Any]]] = None
 
 class GenerateResponse(BaseModel):
     yaml: str = Field(..., description="Generated Docker Compose YAML")
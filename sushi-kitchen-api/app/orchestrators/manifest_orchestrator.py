@@ -5,27 +5,88 @@ This is the bridge between FastAPI and the core generation logic.
 """
 
 import asyncio
+import hashlib
 import json
+import logging
+import os
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import tempfile
+import time
+
+from ..executor import ExecutionLayer
+from ..manifest_cache import EncodedBundleCache, ManifestCache
+from ..metrics import observe_subprocess, stage_timer
+from ..port_allocation import check_ports
+from ..script_workers import ScriptWorkerPool, WorkerUnavailable
+from ..shard_store import ShardStore
+from .inprocess_engine import InProcessEngine
+
+logger = logging.getLogger(__name__)
+
+ENGINE_INPROCESS = 'inprocess'
+ENGINE_SUBPROCESS = 'subprocess'
 
 class ManifestOrchestrator:
-    def __init__(self, core_repo_path: str):
+    def __init__(
+        self,
+        core_repo_path: str,
+        engine: Optional[str] = None,
+        executor: Optional[ExecutionLayer] = None
+    ):
         self.core_path = Path(core_repo_path)
+        # Blocking I/O and CPU-heavy steps run here, never on the event loop
+        self.executor = executor or ExecutionLayer.from_env()
+        self.manifest_root = self.core_path / 'docs' / 'manifest'
+        # Core manifests (contracts/combos/platters) live under docs/manifest/core
+        core_manifests = self.manifest_root / 'core'
+        self.manifest_dir = core_manifests if (core_manifests / 'contracts.yml').exists() else self.manifest_root
+        # Read by the network stage next to the core manifests
+        self.network_profiles_dir = self.manifest_dir.parent / 'templates' / 'network-profiles'
         self.scripts = {
             'compose': self.core_path / 'scripts' / 'generate-compose.py',
             'export': self.core_path / 'scripts' / 'export-manifest-json.py',
             'network': self.core_path / 'scripts' / 'generate-network-config.py'
         }
 
+        # "inprocess" imports the scripts once and keeps manifests resident;
+        # "subprocess" runs the scripts per request (original behaviour).
+        self.engine_mode = (engine or os.getenv('SUSHI_ENGINE', ENGINE_INPROCESS)).lower()
+        if self.engine_mode not in (ENGINE_INPROCESS, ENGINE_SUBPROCESS):
+            raise ValueError(f"Unknown engine mode: {self.engine_mode}")
+        self._engine: Optional[InProcessEngine] = None
+        self._engine_lock = threading.Lock()
+        self._digest_signature = None
+        self._digest = ''
+        # Scripts run as warm `script.py --worker` processes instead of per-call spawns
+        self.script_workers = ScriptWorkerPool.from_env(self.core_path)
+
         # Check if we have a local generated directory (for serving pre-built bundles)
-        self.generated_dir = Path('/app/generated')  # Docker mount point
-        if not self.generated_dir.exists():
+        self.generated_dir = Path(os.getenv('SUSHI_GENERATED_DIR', '/app/generated'))  # Docker mount point
+        if not self.generated_dir.exists() and 'SUSHI_GENERATED_DIR' not in os.environ:
             # Fallback to relative path for development
             self.generated_dir = Path(__file__).parent.parent.parent / 'generated'
 
+        # Parsed once per process; revalidated by mtime/size of the bundle file
+        self.bundle_cache = ManifestCache(
+            self.generated_dir / 'api-bundle.json',
+            transform=self._components_from_bundle,
+            revalidate_interval=float(os.getenv('SUSHI_CACHE_REVALIDATE_SECONDS', '1.0'))
+        )
+        # Same file as raw/precompressed bytes for /api/v1/bundle
+        self.bundle_file = EncodedBundleCache(
+            self.generated_dir / 'api-bundle.json',
+            revalidate_interval=float(os.getenv('SUSHI_CACHE_REVALIDATE_SECONDS', '1.0'))
+        )
+        # Per-section / per-entity shards, read only when a route needs them
+        self.shard_store = ShardStore(
+            self.generated_dir / 'api-bundle.shards',
+            revalidate_interval=float(os.getenv('SUSHI_CACHE_REVALIDATE_SECONDS', '1.0')),
+            max_bytes=int(float(os.getenv('SUSHI_SHARD_CACHE_MAX_MB', '8')) * 1024 * 1024)
+        )
+
     async def generate_complete_stack(
         self,
         selection_type: str,
@@ -40,27 +101,152 @@ class ManifestOrchestrator:
         3. Add security overlays
         """
 
-        # Step 1: Generate base compose
-        compose_yaml = await self._run_compose_generator(
-            selection_type,
-            selection_id,
-            include_optional
-        )
-
-        # Step 2: Apply network configuration
-        networked_compose = await self._apply_network_config(
-            compose_yaml,
-            profile
-        )
+        engine = await self.executor.run_blocking(self._get_engine)
+        if engine is not None:
+            # Steps 1 + 2 in-process: dicts flow between stages directly
+            networked_compose = await self.executor.run_blocking(
+                self._generate_inprocess,
+                engine,
+                selection_type,
+                selection_id,
+                include_optional,
+                profile
+            )
+        else:
+            # Step 1: Generate base compose
+            with stage_timer('base_compose', ENGINE_SUBPROCESS):
+                compose_yaml = await self._run_compose_generator(
+                    selection_type,
+                    selection_id,
+                    include_optional
+                )
+
+            # Step 2: Apply network configuration
+            with stage_timer('network_config', ENGINE_SUBPROCESS):
+                networked_compose = await self._apply_network_config(
+                    compose_yaml,
+                    profile
+                )
 
         # Step 3: Apply security policies
-        final_compose = await self._apply_security_policies(
-            networked_compose,
-            profile
-        )
+        with stage_timer('security_policies', self.engine_mode):
+            final_compose = await self._apply_security_policies(
+                networked_compose,
+                profile
+            )
 
         return final_compose
 
+    def _get_engine(self) -> Optional[InProcessEngine]:
+        """Return the resident in-process engine, reloaded if the manifests changed
+
+        None in subprocess mode.
+        """
+        if self.engine_mode != ENGINE_INPROCESS:
+            return None
+        digest = self.manifest_digest()
+        if self._engine is None or self._engine.digest != digest:
+            with self._engine_lock:
+                if self._engine is None and self.engine_mode == ENGINE_INPROCESS:
+                    try:
+                        self._engine = InProcessEngine(self.scripts, self.manifest_dir, digest)
+                    except Exception as e:
+                        # Keep serving through the scripts rather than failing requests
+                        logger.warning("In-process engine unavailable, falling back to subprocess mode: %s", e)
+                        self.engine_mode = ENGINE_SUBPROCESS
+                elif self._engine is not None and self._engine.digest != digest:
+                    self._engine.reload(digest)
+        return self._engine
+
+    def generation_digest(self) -> str:
+        """Digest of the manifests the next generation runs against
+
+        In-process mode reports what the resident engine has loaded (after
+        bringing it up to date), so cache keys always match the output.
+        """
+        engine = self._get_engine()
+        return engine.digest if engine is not None else self.manifest_digest()
+
+    @staticmethod
+    def _generate_inprocess(
+        engine: InProcessEngine,
+        selection_type: str,
+        selection_id: str,
+        include_optional: bool,
+        profile: str
+    ) -> Dict:
+        with stage_timer('base_compose', ENGINE_INPROCESS):
+            base_compose = engine.generate_base_compose(selection_type, selection_id, include_optional)
+        with stage_timer('network_config', ENGINE_INPROCESS):
+            return engine.apply_network_config(base_compose, profile)
+
+    def refresh_caches(self) -> Dict:
+        """Reload the bundle cache and resident manifests, returning cache stats"""
+        stats = self.bundle_cache.refresh()
+        self.bundle_file.refresh()
+        self.shard_store.refresh()
+        if self._engine is not None:
+            self._engine.reload(self.manifest_digest())
+        return stats
+
+    def manifest_digest(self) -> str:
+        """Content digest of the manifest set; recomputed only when files change
+
+        Covers the core manifests and the network-profile templates, since
+        both feed generation.
+        """
+        files = sorted(self.manifest_dir.glob('*.yml')) + sorted(self.network_profiles_dir.glob('*.yml'))
+        signature = []
+        for path in files:
+            stat = path.stat()
+            signature.append((str(path.relative_to(self.manifest_dir.parent)), stat.st_mtime_ns, stat.st_size))
+        signature = tuple(signature)
+        if signature != self._digest_signature:
+            digest = hashlib.sha256()
+            for (name, _, _), path in zip(signature, files):
+                digest.update(name.encode('utf-8'))
+                digest.update(path.read_bytes())
+            self._digest = digest.hexdigest()
+            self._digest_signature = signature
+        return self._digest
+
+    async def prewarm_script_workers(self) -> None:
+        """Start the workers the configured engine will call on every request"""
+        if self.script_workers is None:
+            return
+        scripts = [self.scripts['compose'], self.scripts['network']] if self.engine_mode == ENGINE_SUBPROCESS else []
+        await self.executor.run_blocking(self.script_workers.prewarm, scripts)
+
+    async def _run_script(self, cmd: List[str]) -> Tuple[int, bytes, bytes]:
+        """Run a core script in a warm worker if possible, else spawn it; both are timed"""
+        script = Path(cmd[1])
+        if self.script_workers is not None and self.script_workers.supports(script):
+            started = time.perf_counter()
+            try:
+                returncode, stdout, stderr = await self.executor.run_blocking(
+                    self.script_workers.call, script, cmd[2:]
+                )
+            except WorkerUnavailable:
+                pass
+            else:
+                observe_subprocess(script.stem, time.perf_counter() - started, returncode, transport='worker')
+                return returncode, stdout, stderr
+
+        started = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(self.core_path)
+        )
+        try:
+            stdout, stderr = await proc.communicate()
+        finally:
+            # returncode stays None if communicate() was cancelled
+            returncode = proc.returncode if proc.returncode is not None else -1
+            observe_subprocess(script.stem, time.perf_counter() - started, returncode)
+        return proc.returncode, stdout, stderr
+
     async def _run_compose_generator(
         self,
         selection_type: str,
@@ -73,22 +259,15 @@ class ManifestOrchestrator:
             'python3',
             str(self.scripts['compose']),
             f'--{selection_type}={selection_id}',
-            '--manifest-dir', str(self.core_path / 'docs' / 'manifest')
+            '--manifest-dir', str(self.manifest_dir)
         ]
 
         if include_optional:
             cmd.append('--include-optional')
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(self.core_path)
-        )
+        returncode, stdout, stderr = await self._run_script(cmd)
 
-        stdout, stderr = await proc.communicate()
-
-        if proc.returncode != 0:
+        if returncode != 0:
             raise RuntimeError(f"Compose generation failed: {stderr.decode()}")
 
         return stdout.decode()
@@ -97,35 +276,33 @@ class ManifestOrchestrator:
         """Apply network configuration using generate-network-config.py"""
 
         # Write compose to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as temp_file:
-            temp_file.write(compose_yaml)
-            temp_compose_path = temp_file.name
+        temp_compose_path = await self.executor.run_blocking(self._write_temp_compose, compose_yaml)
 
         try:
             cmd = [
                 'python3',
                 str(self.scripts['network']),
                 '--compose-file', temp_compose_path,
-                '--profile', profile
+                '--profile', profile,
+                '--manifest-dir', str(self.manifest_dir)
             ]
 
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(self.core_path)
-            )
-
-            stdout, stderr = await proc.communicate()
+            returncode, stdout, stderr = await self._run_script(cmd)
 
-            if proc.returncode != 0:
+            if returncode != 0:
                 raise RuntimeError(f"Network configuration failed: {stderr.decode()}")
 
-            return yaml.safe_load(stdout.decode())
+            return await self.executor.run_cpu(yaml.safe_load, stdout.decode())
 
         finally:
             # Clean up temp file
-            Path(temp_compose_path).unlink(missing_ok=True)
+            await self.executor.run_blocking(Path(temp_compose_path).unlink, missing_ok=True)
+
+    @staticmethod
+    def _write_temp_compose(compose_yaml: str) -> str:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as temp_file:
+            temp_file.write(compose_yaml)
+            return temp_file.name
 
     async def _apply_security_policies(self, compose_dict: Dict, profile: str) -> Dict:
         """Apply security policies based on profile"""
@@ -154,45 +331,30 @@ class ManifestOrchestrator:
     async def get_available_components(self) -> Dict:
         """Get all available platters, combos, and rolls"""
 
-        # First try to load from pre-built bundle if available
-        bundle_path = self.generated_dir / 'api-bundle.json'
-        if bundle_path.exists():
-            try:
-                with bundle_path.open() as f:
-                    bundle_data = json.load(f)
-                return {
-                    'platters': bundle_data.get('platters', {}),
-                    'combos': bundle_data.get('combos', {}),
-                    'rolls': bundle_data.get('services', {}),  # Services are rolls
-                    'capabilities': bundle_data.get('capabilities', {}),
-                    'network_profiles': bundle_data.get('network_profiles', {})
-                }
-            except (json.JSONDecodeError, KeyError):
-                # Fall back to dynamic generation if bundle is corrupted
-                pass
+        # First try the in-memory copy of the pre-built bundle (may re-read it)
+        components = await self.executor.run_blocking(self.bundle_cache.get)
+        if components is not None:
+            return components
 
         # Fall back to dynamic generation using export script
         cmd = [
             'python3',
             str(self.scripts['export']),
-            '--manifest-root', str(self.core_path / 'docs' / 'manifest'),
+            '--manifest-root', str(self.manifest_root),
             '--output-dir', str(self.core_path / 'tmp' / 'api-export')
         ]
 
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(self.core_path)
-        )
-
-        stdout, stderr = await proc.communicate()
+        returncode, stdout, stderr = await self._run_script(cmd)
 
-        if proc.returncode != 0:
+        if returncode != 0:
             raise RuntimeError(f"Export failed: {stderr.decode()}")
 
         # Load the generated JSON files
         export_dir = self.core_path / 'tmp' / 'api-export'
+        return await self.executor.run_blocking(self._load_export_components, export_dir)
+
+    @staticmethod
+    def _load_export_components(export_dir: Path) -> Dict:
         components = {
             'platters': [],
             'combos': [],
@@ -221,8 +383,21 @@ class ManifestOrchestrator:
 
         return components
 
-    async def validate_configuration(self, compose_dict: Dict) -> Dict:
-        """Validate the generated configuration"""
+    @staticmethod
+    def _components_from_bundle(bundle_data: Dict) -> Dict:
+        return {
+            'platters': bundle_data.get('platters', {}),
+            'combos': bundle_data.get('combos', {}),
+            'rolls': bundle_data.get('services', {}),  # Services are rolls
+            'capabilities': bundle_data.get('capabilities', {}),
+            'network_profiles': bundle_data.get('network_profiles', {})
+        }
+
+    async def validate_configuration(self, compose_dict: Dict, suggest_ports: bool = False) -> Dict:
+        """Validate the generated configuration
+
+        With suggest_ports, free host ports are proposed for conflicting bindings
+        """
 
         validation_results = {
             'valid': True,
@@ -244,20 +419,13 @@ class ManifestOrchestrator:
                     )
                     validation_results['valid'] = False
 
-        # Check for port conflicts
-        used_ports = set()
-        for service_name, service_config in services.items():
-            ports = service_config.get('ports', [])
-            for port_mapping in ports:
-                if isinstance(port_mapping, str) and ':' in port_mapping:
-                    host_port = port_mapping.split(':')[0]
-                    # Extract port from environment variable format
-                    if ':-' in host_port:
-                        default_port = host_port.split(':-')[1].rstrip('}')
-                        if default_port in used_ports:
-                            validation_results['warnings'].append(
-                                f"Potential port conflict on {default_port} for service '{service_name}'"
-                            )
-                        used_ports.add(default_port)
+        # Check for host port conflicts (exact, range and ${VAR:-default} bindings)
+        port_report = check_ports(services, suggest=suggest_ports)
+        validation_results['warnings'].extend(port_report['warnings'])
+        if port_report['errors']:
+            validation_results['errors'].extend(port_report['errors'])
+            validation_results['valid'] = False
+        if suggest_ports:
+            validation_results['port_suggestions'] = port_report['suggestions']
 
         return validation_results
\ No newline at end of file
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Host port allocation checks for generated compose files.
+Every ``ports`` entry is parsed into (host_ip, start, end, protocol)
+intervals; a sorted sweep over those intervals reports overlapping host
+bindings in O(n log n + conflicts), and free ports can be suggested for
+the bindings that lose.
+"""
+
+import bisect
+import heapq
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MIN_PORT = 1
+MAX_PORT = 65535
+# Suggestions stay out of the privileged range
+SUGGEST_FROM = 1024
+
+WILDCARD_HOSTS = frozenset({'', '0.0.0.0', '::', '[::]'})
+_VARIABLE = re.compile(r'^\$\{(?P<name>[A-Za-z_][A-Za-z0-9_]*)(?::?-(?P<default>[^}]*))?\}$')
+
+
+class PortBinding(NamedTuple):
+    """One published host interval of a service"""
+    service: str
+    host_ip: str
+    start: int
+    end: int
+    protocol: str
+    container: str
+    spec: str
+    # Env var holding the host port, when written as ${VAR:-default}
+    variable: Optional[str] = None
+    # Host range published for a single container port: Docker binds any
+    # one free port in the range, so an overlap is only a potential conflict
+    flexible: bool = False
+
+
+class PortConflict(NamedTuple):
+    first: PortBinding
+    second: PortBinding
+    start: int
+    end: int
+
+    @property
+    def potential(self) -> bool:
+        return self.first.flexible or self.second.flexible
+
+    def describe(self) -> str:
+        kind = 'Potential port conflict' if self.potential else 'Port conflict'
+        ports = str(self.start) if self.start == self.end else f'{self.start}-{self.end}'
+        return (
+            f"{kind} on {ports}/{self.first.protocol}: "
+            f"'{self.first.service}' ({self.first.spec}) and '{self.second.service}' ({self.second.spec})"
+        )
+
+
+def _port_range(text: str) -> Tuple[int, int]:
+    start_text, _, end_text = text.strip().partition('-')
+    start = int(start_text)
+    end = int(end_text) if end_text else start
+    if not MIN_PORT <= start <= end <= MAX_PORT:
+        raise ValueError(f'port range {text!r} is out of bounds')
+    return start, end
+
+
+def _resolve_host(text: str) -> Tuple[str, Optional[str]]:
+    """Host port text with ${VAR:-default} replaced by its default"""
+    match = _VARIABLE.match(text.strip())
+    if not match:
+        return text, None
+    if match.group('default') is None:
+        raise ValueError(f'{text} has no default port')
+    return match.group('default'), match.group('name')
+
+
+def _split_short_syntax(spec: str) -> Tuple[str, Optional[str], str]:
+    """Split ``[ip:][host:]container`` into (ip, host, container)"""
+    ip = ''
+    if spec.startswith('['):
+        bracket = spec.index(']')
+        ip, spec = spec[1:bracket], spec[bracket + 2:]
+    # ${VAR:-8080} contains a colon of its own
+    parts = re.split(r':(?![^{]*\})', spec)
+    if len(parts) == 1:
+        return ip, None, parts[0]
+    if len(parts) == 2:
+        return ip, parts[0], parts[1]
+    if len(parts) == 3 and not ip:
+        return parts[0], parts[1], parts[2]
+    raise ValueError(f'cannot parse port mapping {spec!r}')
+
+
+def parse_port_entry(service: str, entry: Any) -> List[PortBinding]:
+    """Host bindings published by one compose ``ports`` entry
+
+    Container-only entries ("80") publish an ephemeral host port and
+    return nothing. Raises ValueError for entries that cannot be checked.
+    """
+    if isinstance(entry, dict):
+        published = entry.get('published')
+        if published in (None, ''):
+            return []
+        host, variable = _resolve_host(str(published))
+        ip = str(entry.get('host_ip') or '')
+        container = str(entry.get('target', ''))
+        protocol = str(entry.get('protocol') or 'tcp').lower()
+        spec = f"{published}:{container}"
+    else:
+        spec = str(entry).strip()
+        mapping, _, protocol = spec.partition('/')
+        protocol = (protocol or 'tcp').lower()
+        ip, host_text, container = _split_short_syntax(mapping)
+        if host_text is None or host_text == '':
+            return []
+        host, variable = _resolve_host(host_text)
+
+    start, end = _port_range(host)
+    container_start, container_end = _port_range(container) if container else (0, 0)
+    flexible = end > start and container_end == container_start
+    if not flexible and container and end - start != container_end - container_start:
+        raise ValueError(f'host and container ranges of {spec!r} differ in size')
+    return [PortBinding(service, ip.strip('[]'), start, end, protocol, container, spec, variable, flexible)]
+
+
+def collect_bindings(services: Dict[str, Any]) -> Tuple[List[PortBinding], List[str]]:
+    """Parse every service's ports; unparseable entries become warnings"""
+    bindings: List[PortBinding] = []
+    problems: List[str] = []
+    for service_name, service_config in (services or {}).items():
+        for entry in (service_config or {}).get('ports') or []:
+            try:
+                bindings.extend(parse_port_entry(service_name, entry))
+            except ValueError as exc:
+                problems.append(f"Cannot check port '{entry}' of service '{service_name}': {exc}")
+    return bindings, problems
+
+
+def _hosts_overlap(first: str, second: str) -> bool:
+    return first == second or first in WILDCARD_HOSTS or second in WILDCARD_HOSTS
+
+
+def find_conflicts(bindings: Iterable[PortBinding]) -> List[PortConflict]:
+    """Overlapping host bindings, found with a sweep over sorted intervals
+
+    Per protocol, intervals are visited by start port while a heap keeps the
+    ones still open; each new interval is compared only with those.
+    """
+    by_protocol: Dict[str, List[PortBinding]] = {}
+    for binding in bindings:
+        by_protocol.setdefault(binding.protocol, []).append(binding)
+
+    conflicts: List[PortConflict] = []
+    for protocol in sorted(by_protocol):
+        ordered = sorted(by_protocol[protocol], key=lambda binding: (binding.start, binding.end))
+        active: List[Tuple[int, int]] = []  # (end, index into ordered)
+        for index, binding in enumerate(ordered):
+            while active and active[0][0] < binding.start:
+                heapq.heappop(active)
+            for _end, other_index in active:
+                other = ordered[other_index]
+                if _hosts_overlap(other.host_ip, binding.host_ip):
+                    conflicts.append(PortConflict(other, binding, binding.start, min(other.end, binding.end)))
+            heapq.heappush(active, (binding.end, index))
+    return conflicts
+
+
+class _FreePortMap:
+    """Occupied host intervals of one protocol, merged and kept sorted"""
+
+    def __init__(self, bindings: Iterable[PortBinding]):
+        merged: List[List[int]] = []
+        for start, end in sorted((binding.start, binding.end) for binding in bindings):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [interval[0] for interval in merged]
+        self.ends = [interval[1] for interval in merged]
+
+    def claim(self, width: int, lowest: int) -> Optional[int]:
+        """Reserve the first free run of width ports at or above lowest"""
+        candidate = lowest
+        index = bisect.bisect_right(self.starts, candidate) - 1
+        if index >= 0 and self.ends[index] >= candidate:
+            candidate = self.ends[index] + 1
+        index += 1
+        while index < len(self.starts) and self.starts[index] < candidate + width:
+            candidate = max(candidate, self.ends[index] + 1)
+            index += 1
+        if candidate + width - 1 > MAX_PORT:
+            return None
+        self.starts.insert(index, candidate)
+        self.ends.insert(index, candidate + width - 1)
+        return candidate
+
+
+def suggest_free_ports(bindings: List[PortBinding], conflicts: List[PortConflict]) -> List[Dict[str, Any]]:
+    """A replacement host port for the later binding of each conflict
+
+    Suggestions avoid every published port (on any host IP) and each other,
+    starting from the conflicting port and moving up.
+    """
+    free_maps: Dict[str, _FreePortMap] = {}
+    suggestions: List[Dict[str, Any]] = []
+    moved = set()
+    for conflict in conflicts:
+        binding = conflict.second
+        if binding in moved:
+            continue
+        moved.add(binding)
+        free = free_maps.get(binding.protocol)
+        if free is None:
+            free = free_maps[binding.protocol] = _FreePortMap(
+                other for other in bindings if other.protocol == binding.protocol
+            )
+        width = binding.end - binding.start + 1
+        start = free.claim(width, max(binding.start, SUGGEST_FROM))
+        if start is None:
+            continue
+        host = str(start) if width == 1 else f'{start}-{start + width - 1}'
+        if binding.variable:
+            host = f'${{{binding.variable}:-{host}}}'
+        if binding.host_ip:
+            host_ip = f'[{binding.host_ip}]' if ':' in binding.host_ip else binding.host_ip
+            host = f'{host_ip}:{host}'
+        mapping = f'{host}:{binding.container}' if binding.container else host
+        if binding.protocol != 'tcp':
+            mapping = f'{mapping}/{binding.protocol}'
+        suggestions.append({
+            'service': binding.service,
+            'port': binding.spec,
+            'suggested': mapping,
+            'host_port': start
+        })
+    return suggestions
+
+
+def check_ports(services: Dict[str, Any], suggest: bool = False) -> Dict[str, List]:
+    """Errors, warnings and (optionally) suggestions for a compose services map"""
+    bindings, warnings = collect_bindings(services)
+    conflicts = find_conflicts(bindings)
+    report: Dict[str, List] = {
+        'errors': [conflict.describe() for conflict in conflicts if not conflict.potential],
+        'warnings': warnings + [conflict.describe() for conflict in conflicts if conflict.potential]
+    }
+    if suggest:
+        report['suggestions'] = suggest_free_ports(bindings, conflicts)
+    return report
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Opt-in request profiling.
+A generate request is profiled when the admin endpoint has armed the
+recorder, or when it carries the ``X-Sushi-Profile`` header and header
+triggering is enabled. The handler runs under a profiler on the event loop
+thread, and work it hands to the execution layer's thread pools is profiled
+in the worker thread and merged into the same artifact. Artifacts (pstats
+for cProfile, speedscope JSON for pyinstrument) go to a bounded directory
+that keeps only the newest profiles.
+
+When nothing is armed the only cost is an attribute check per request and
+a context variable lookup per pool submission.
+"""
+
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+    from pyinstrument.session import Session as SamplingSession
+except ImportError:  # Optional; cProfile is always available
+    SamplingProfiler = None
+
+PROFILE_HEADER = 'X-Sushi-Profile'
+PROFILER_CPROFILE = 'cprofile'
+PROFILER_PYINSTRUMENT = 'pyinstrument'
+
+_active_session: contextvars.ContextVar[Optional['ProfileSession']] = contextvars.ContextVar(
+    'sushi_profile_session', default=None
+)
+
+
+def current_session() -> Optional['ProfileSession']:
+    return _active_session.get()
+
+
+class ProfileSession:
+    """One profiled request: a loop-thread profile plus any worker-thread profiles"""
+
+    def __init__(self, label: str, profiler: str):
+        self.label = label
+        self.profiler = profiler
+        self._main: Any = None
+        self._workers: List[Any] = []
+        self._lock = threading.Lock()
+        self._token: Optional[contextvars.Token] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        if self.profiler == PROFILER_PYINSTRUMENT:
+            self._main = SamplingProfiler(async_mode='enabled')
+            self._main.start()
+        else:
+            self._main = cProfile.Profile()
+            self._main.enable()
+        self._token = _active_session.set(self)
+
+    def stop(self) -> None:
+        """Stop profiling; must run in the context that called start()"""
+        _active_session.reset(self._token)
+        if self.profiler == PROFILER_PYINSTRUMENT:
+            self._main.stop()
+        else:
+            self._main.disable()
+        self.duration = time.perf_counter() - self.started_at
+
+    def wrap(self, call: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap a pool task so it is profiled in whichever worker thread runs it"""
+        def profiled():
+            if self.profiler == PROFILER_PYINSTRUMENT:
+                profiler = SamplingProfiler(async_mode='disabled')
+                profiler.start()
+                try:
+                    return call()
+                finally:
+                    profiler.stop()
+                    with self._lock:
+                        self._workers.append(profiler.last_session)
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(call)
+            finally:
+                with self._lock:
+                    self._workers.append(profiler)
+        return profiled
+
+    def write(self, path: Path) -> None:
+        if self.profiler == PROFILER_PYINSTRUMENT:
+            session = self._main.last_session
+            for worker in self._workers:
+                session = SamplingSession.combine(session, worker)
+            path.write_text(SpeedscopeRenderer().render(session))
+        else:
+            stats = pstats.Stats(self._main)
+            for worker in self._workers:
+                stats.add(worker)
+            stats.dump_stats(str(path))
+
+
+class ProfileRecorder:
+    """Decides which requests to profile and keeps the newest artifacts on disk"""
+
+    def __init__(
+        self,
+        directory: Path,
+        keep: int = 20,
+        profiler: str = PROFILER_CPROFILE,
+        allow_header: bool = False
+    ):
+        if profiler == PROFILER_PYINSTRUMENT and SamplingProfiler is None:
+            raise ValueError('pyinstrument is not installed')
+        if profiler not in (PROFILER_CPROFILE, PROFILER_PYINSTRUMENT):
+            raise ValueError(f"Unknown profiler: {profiler}")
+        self.directory = directory
+        self.keep = keep
+        self.profiler = profiler
+        self.allow_header = allow_header
+        self.armed = 0
+        self._busy = False
+        self._seq = 0
+
+    @classmethod
+    def from_env(cls) -> 'ProfileRecorder':
+        profiler = os.getenv('SUSHI_PROFILER', PROFILER_CPROFILE).lower()
+        if profiler == PROFILER_PYINSTRUMENT and SamplingProfiler is None:
+            profiler = PROFILER_CPROFILE
+        return cls(
+            directory=Path(os.getenv('SUSHI_PROFILE_DIR', Path(tempfile.gettempdir()) / 'sushi-profiles')),
+            keep=int(os.getenv('SUSHI_PROFILE_KEEP', '20')),
+            profiler=profiler,
+            allow_header=os.getenv('SUSHI_PROFILE_ALLOW_HEADER', '0').lower() in ('1', 'true', 'yes', 'on')
+        )
+
+    def wants(self, headers) -> bool:
+        """Cheap check made on every request"""
+        return self.armed > 0 or (self.allow_header and PROFILE_HEADER in headers)
+
+    def arm(self, count: int = 1) -> int:
+        self.armed = max(0, count)
+        return self.armed
+
+    def begin(self, label: str) -> Optional[ProfileSession]:
+        """Start a session, or return None if another request is being profiled"""
+        # Profilers hook the whole thread, so only one session may run at a time
+        if self._busy:
+            return None
+        self._busy = True
+        if self.armed > 0:
+            self.armed -= 1
+        session = ProfileSession(label, self.profiler)
+        try:
+            session.start()
+        except BaseException:
+            # save() never runs for a session that did not start
+            self._busy = False
+            raise
+        return session
+
+    def save(self, session: ProfileSession) -> Dict:
+        """Write a stopped *session* and prune the oldest profiles"""
+        try:
+            self._seq += 1
+            profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{self._seq:04d}-{_slug(session.label)}"
+            suffix = '.speedscope.json' if session.profiler == PROFILER_PYINSTRUMENT else '.pstats'
+            self.directory.mkdir(parents=True, exist_ok=True)
+            artifact = self.directory / f"{profile_id}{suffix}"
+            session.write(artifact)
+            meta = {
+                'id': profile_id,
+                'label': session.label,
+                'profiler': session.profiler,
+                'duration_ms': round(session.duration * 1000, 3),
+                'artifact': artifact.name,
+                'size_bytes': artifact.stat().st_size,
+                'created': time.time()
+            }
+            (self.directory / f"{profile_id}.meta.json").write_text(json.dumps(meta))
+            self._prune()
+            return meta
+        finally:
+            self._busy = False
+
+    def profiles(self) -> List[Dict]:
+        entries = []
+        for meta_path in sorted(self.directory.glob('*.meta.json'), reverse=True):
+            try:
+                entries.append(json.loads(meta_path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def artifact(self, profile_id: str) -> Optional[Path]:
+        for meta in self.profiles():
+            if meta['id'] == profile_id:
+                path = self.directory / meta['artifact']
+                return path if path.exists() else None
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            'profiler': self.profiler,
+            'directory': str(self.directory),
+            'keep': self.keep,
+            'allow_header': self.allow_header,
+            'armed': self.armed,
+            'busy': self._busy
+        }
+
+    def _prune(self) -> None:
+        metas = sorted(self.directory.glob('*.meta.json'))
+        for meta_path in metas[:max(0, len(metas) - self.keep)]:
+            profile_id = meta_path.name[:-len('.meta.json')]
+            for path in self.directory.glob(f"{profile_id}.*"):
+                path.unlink(missing_ok=True)
+
+
+def _slug(label: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', label).strip('-')[:60] or 'request'
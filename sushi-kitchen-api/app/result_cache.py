@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Bounded LRU/TTL cache of finished compose generations.
+Keys include the digest of the manifest set the engine generated from
+(the in-process engine reloads when it changes), so editing any manifest
+makes old entries unreachable; they then age out through TTL or LRU
+eviction.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Rough per-entry bookkeeping cost (key tuple, entry object, dict slot)
+ENTRY_OVERHEAD_BYTES = 512
+
+
+class CachedGeneration:
+    __slots__ = ('yaml', 'services', 'validation', 'size', 'expires_at')
+
+    def __init__(self, yaml: str, services: List[str], validation: Dict, ttl_seconds: float):
+        self.yaml = yaml
+        self.services = tuple(services)
+        self.validation = validation
+        self.size = (
+            len(yaml.encode('utf-8'))
+            + sum(len(name) for name in services)
+            + len(json.dumps(validation))
+            + ENTRY_OVERHEAD_BYTES
+        )
+        self.expires_at = time.monotonic() + ttl_seconds
+
+
+class GenerationResultCache:
+    """LRU cache bounded by an approximate memory budget, with per-entry TTL"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 600.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, CachedGeneration]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(
+        selection_type: str,
+        selection_id: str,
+        profile: str,
+        include_optional: bool,
+        manifest_digest: str
+    ) -> Tuple:
+        return (selection_type, selection_id, profile, bool(include_optional), manifest_digest)
+
+    def get(self, key: Hashable) -> Optional[CachedGeneration]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, yaml: str, services: List[str], validation: Dict) -> None:
+        if self.max_bytes <= 0:
+            return
+        entry = CachedGeneration(yaml, services, validation, self.ttl_seconds)
+        if entry.size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.current_bytes += entry.size
+            while self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
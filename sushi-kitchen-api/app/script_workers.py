@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Warm pool of core scripts running in worker mode (`script.py --worker`).
+Each worker imports its script once and then answers JSON-lines calls, so
+a call costs one pipe round-trip instead of a Python start-up plus imports.
+Calls block on pipe I/O and are meant to run in the executor's I/O pool.
+Scripts that do not support worker mode are remembered and the caller
+falls back to spawning them per call.
+"""
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerUnavailable(RuntimeError):
+    """The script cannot be served by a worker; spawn it instead"""
+
+
+class ScriptWorker:
+    """One long-lived `script.py --worker` process"""
+
+    def __init__(self, python: str, script: Path, cwd: Path):
+        self.script = script
+        self.calls = 0
+        self._next_id = 0
+        self.process = subprocess.Popen(
+            [python, str(script), '--worker'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=str(cwd),
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        ready = self._read()
+        if not ready or not ready.get('ready'):
+            self.close()
+            raise WorkerUnavailable(f"{script.name} did not start in worker mode")
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def call(self, argv: List[str]) -> Tuple[int, bytes, bytes]:
+        self._next_id += 1
+        self.calls += 1
+        self.process.stdin.write(json.dumps({'id': self._next_id, 'argv': argv}) + '\n')
+        self.process.stdin.flush()
+        response = self._read()
+        if response is None or response.get('id') != self._next_id:
+            raise BrokenPipeError(f"{self.script.name} worker exited or answered out of order")
+        return (
+            response['returncode'],
+            response['stdout'].encode('utf-8'),
+            response['stderr'].encode('utf-8')
+        )
+
+    def _read(self) -> Optional[Dict]:
+        line = self.process.stdout.readline()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class ScriptWorkerPool:
+    """Up to `size` warm workers per script, recycled after `max_requests` calls"""
+
+    def __init__(self, cwd: Path, size: int = 2, max_requests: int = 500, python: str = 'python3'):
+        self.cwd = Path(cwd)
+        self.size = size
+        self.max_requests = max_requests
+        self.python = python
+        self._lock = threading.Lock()
+        self._idle: Dict[Path, 'queue.LifoQueue[ScriptWorker]'] = {}
+        self._slots: Dict[Path, threading.BoundedSemaphore] = {}
+        self._unsupported = set()
+        self._closed = False
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls, cwd: Path) -> Optional['ScriptWorkerPool']:
+        """Pool configured from SUSHI_SCRIPT_WORKERS (0 disables it)"""
+        size = int(os.getenv('SUSHI_SCRIPT_WORKERS', '2'))
+        if size <= 0:
+            return None
+        return cls(
+            cwd,
+            size=size,
+            max_requests=int(os.getenv('SUSHI_SCRIPT_WORKER_MAX_REQUESTS', '500'))
+        )
+
+    def supports(self, script: Path) -> bool:
+        return not self._closed and script not in self._unsupported
+
+    def prewarm(self, scripts: Iterable[Path]) -> None:
+        """Start one worker per script ahead of the first request"""
+        for script in scripts:
+            if not self.supports(script):
+                continue
+            slots, idle = self._pool_for(script)
+            if not idle.empty() or not slots.acquire(blocking=False):
+                continue
+            try:
+                idle.put(self._spawn(script))
+            except WorkerUnavailable:
+                pass
+            finally:
+                slots.release()
+
+    def call(self, script: Path, argv: List[str]) -> Tuple[int, bytes, bytes]:
+        """Run `script argv` in a warm worker; raises WorkerUnavailable to request a spawn"""
+        if not self.supports(script):
+            raise WorkerUnavailable(f"{script.name} is not served by workers")
+        slots, idle = self._pool_for(script)
+        with slots:
+            # One retry covers a worker that died while idle
+            for attempt in range(2):
+                worker = self._checkout(script, idle)
+                try:
+                    result = worker.call(argv)
+                except (BrokenPipeError, OSError, ValueError, KeyError) as exc:
+                    self._count(script, 'failures')
+                    worker.close()
+                    if attempt:
+                        raise WorkerUnavailable(f"{script.name} worker failed: {exc}") from exc
+                    continue
+                self._checkin(script, idle, worker)
+                return result
+        raise WorkerUnavailable(f"{script.name} worker failed")
+
+    def _pool_for(self, script: Path):
+        with self._lock:
+            if script not in self._idle:
+                self._idle[script] = queue.LifoQueue()
+                self._slots[script] = threading.BoundedSemaphore(self.size)
+            return self._slots[script], self._idle[script]
+
+    def _checkout(self, script: Path, idle: 'queue.LifoQueue[ScriptWorker]') -> ScriptWorker:
+        while True:
+            try:
+                worker = idle.get_nowait()
+            except queue.Empty:
+                return self._spawn(script)
+            if worker.alive:
+                return worker
+            worker.close()
+
+    def _checkin(self, script: Path, idle: 'queue.LifoQueue[ScriptWorker]', worker: ScriptWorker) -> None:
+        self._count(script, 'calls')
+        if self._closed or worker.calls >= self.max_requests:
+            self._count(script, 'recycled')
+            worker.close()
+        else:
+            idle.put(worker)
+
+    def _spawn(self, script: Path) -> ScriptWorker:
+        try:
+            worker = ScriptWorker(self.python, script, self.cwd)
+        except (WorkerUnavailable, OSError) as exc:
+            logger.warning("Falling back to spawning %s per call: %s", script.name, exc)
+            self._unsupported.add(script)
+            raise WorkerUnavailable(str(exc)) from exc
+        self._count(script, 'spawned')
+        return worker
+
+    def _count(self, script: Path, key: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(
+                script.stem, {'spawned': 0, 'calls': 0, 'recycled': 0, 'failures': 0}
+            )
+            counters[key] += 1
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            result = {}
+            for script, idle in self._idle.items():
+                counters = dict(self._stats.get(script.stem, {}))
+                counters['idle'] = idle.qsize()
+                counters['supported'] = script not in self._unsupported
+                result[script.stem] = counters
+            return result
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            pools = list(self._idle.values())
+        for idle in pools:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
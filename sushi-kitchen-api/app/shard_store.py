@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Lazy access to the sharded API bundle.
+generate-api-bundle.py writes ``api-bundle.shards/`` with one file per
+section and per service/combo/bento/platter, listed with their sha256 in
+``manifest.json``. Only the small manifest is kept parsed; shard bytes are
+read on first use and kept in a byte-bounded LRU keyed by content hash,
+so a worker holds just the entities it has actually served. Shard bytes
+are checked against their manifest hash before they are cached or served;
+a mismatch means the bundle is being rewritten, so the manifest is re-read
+once before giving up.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+SHARD_MANIFEST = 'manifest.json'
+
+
+class Shard:
+    """Raw JSON bytes of one shard plus its strong ETag"""
+
+    __slots__ = ('data', 'etag')
+
+    def __init__(self, data: bytes, sha256: str):
+        self.data = data
+        self.etag = f'"{sha256}"'
+
+    def json(self) -> Any:
+        return json.loads(self.data)
+
+
+class StaleShard(Exception):
+    """Shard bytes on disk do not match the sha256 in the manifest"""
+
+
+class ShardStore:
+    """Serve individual bundle sections and entities without loading the bundle"""
+
+    def __init__(self, shard_dir: Path, revalidate_interval: float = 1.0, max_bytes: int = 8 * 1024 * 1024):
+        self.shard_dir = shard_dir
+        self.revalidate_interval = revalidate_interval
+        self.max_bytes = max_bytes
+
+        self._manifest: Optional[Dict] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._last_checked = 0.0
+        self._shards: 'OrderedDict[str, Shard]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+
+    def available(self) -> bool:
+        return self.manifest() is not None
+
+    def manifest(self, force: bool = False) -> Optional[Dict]:
+        """Parsed shard manifest, re-read when the file changes"""
+        if (
+            not force
+            and self._manifest is not None
+            and time.monotonic() - self._last_checked < self.revalidate_interval
+        ):
+            return self._manifest
+        path = self.shard_dir / SHARD_MANIFEST
+        try:
+            stat = path.stat()
+        except OSError:
+            self._manifest = None
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            try:
+                manifest = json.loads(path.read_bytes())
+            except (OSError, ValueError):
+                # Keep whatever manifest we had; retry on the next check
+                return self._manifest
+            self._manifest, self._signature = manifest, signature
+        self._last_checked = time.monotonic()
+        return self._manifest
+
+    def section(self, name: str) -> Optional[Shard]:
+        return self._lookup(lambda manifest: (manifest.get('sections') or {}).get(name))
+
+    def entity(self, section: str, entity_id: str) -> Optional[Shard]:
+        return self._lookup(lambda manifest: ((manifest.get('entities') or {}).get(section) or {}).get(entity_id))
+
+    def refresh(self) -> Dict:
+        with self._lock:
+            self._manifest = None
+            self._signature = None
+            self._shards.clear()
+            self._bytes = 0
+        self.manifest()
+        return self.stats()
+
+    def stats(self) -> Dict:
+        manifest = self._manifest
+        return {
+            'shard_dir': str(self.shard_dir),
+            'loaded': manifest is not None,
+            'bundle_sha256': manifest.get('bundle_sha256') if manifest else None,
+            'cached_shards': len(self._shards),
+            'cached_bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'mismatches': self.mismatches
+        }
+
+    def _lookup(self, find: Callable[[Dict], Optional[Dict]]) -> Optional[Shard]:
+        for force in (False, True):
+            manifest = self.manifest(force=force)
+            if manifest is None:
+                return None
+            try:
+                return self._read(find(manifest))
+            except StaleShard:
+                self.mismatches += 1
+        return None
+
+    def _read(self, info: Optional[Dict]) -> Optional[Shard]:
+        if not info:
+            return None
+        sha256 = info['sha256']
+        with self._lock:
+            shard = self._shards.get(sha256)
+            if shard is not None:
+                self._shards.move_to_end(sha256)
+                self.hits += 1
+                return shard
+        self.misses += 1
+
+        path = (self.shard_dir / info['path']).resolve()
+        if self.shard_dir.resolve() not in path.parents:
+            return None
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if hashlib.sha256(data).hexdigest() != sha256:
+            raise StaleShard(info['path'])
+        shard = Shard(data, sha256)
+
+        with self._lock:
+            if sha256 not in self._shards and len(data) <= self.max_bytes:
+                self._shards[sha256] = shard
+                self._bytes += len(data)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._shards.popitem(last=False)
+                    self._bytes -= len(evicted.data)
+        return shard
@@ -0,0 +1 @@
+"""Load-test harness for sushi-kitchen-api (run with `python -m loadtest`)"""
@@ -0,0 +1,146 @@
+"""Run the load-test scenario against the API and report per-route latency
+
+    cd sushi-kitchen-api
+    python -m loadtest                                  # both engines, fixture copy of this repo
+    python -m loadtest --engine subprocess --synthetic 2000
+    python -m loadtest --url http://localhost:8000      # an already running API
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import httpx
+
+from .driver import Scenario, format_report, run_scenario
+from .fixture import build_fixture, fixture_env
+
+API_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SCENARIO = Path(__file__).resolve().parent / 'scenario.yml'
+ENGINES = ('inprocess', 'subprocess')
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def api_server(env: Dict[str, str], startup_timeout: float = 60.0) -> Iterator[str]:
+    """Start uvicorn on a free local port and yield its base URL"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=API_DIR,
+        env={**os.environ, **env}
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"API server exited with code {process.returncode}")
+            try:
+                if httpx.get(f'{base_url}/health', timeout=5).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"API server did not become healthy within {startup_timeout}s")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def _drive(base_url: str, scenario: Scenario, seed: int) -> Dict:
+    limits = httpx.Limits(max_connections=scenario.concurrency, max_keepalive_connections=scenario.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        components = await client.get('/api/v1/components')
+        components.raise_for_status()
+        scenario.resolve_catalog(components.json())
+        return await run_scenario(client, scenario, seed)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Load-test sushi-kitchen-api')
+    parser.add_argument('--scenario', type=Path, default=DEFAULT_SCENARIO, help='Scenario YAML file')
+    parser.add_argument('--url', help='Target an already running API instead of starting one')
+    parser.add_argument('--engine', default=','.join(ENGINES),
+                        help='Comma-separated SUSHI_ENGINE modes to start and compare')
+    parser.add_argument('--fixture-dir', type=Path,
+                        help='Where to build the stand-in core repo (default: a temp dir)')
+    parser.add_argument('--synthetic', type=int, metavar='SERVICES',
+                        help='Replace the core manifests with a synthetic catalog of this size')
+    parser.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra environment for the started servers (repeatable)')
+    parser.add_argument('--duration', type=float, help='Override the measured duration (seconds)')
+    parser.add_argument('--warmup', type=float, help='Override the warm-up duration (seconds)')
+    parser.add_argument('--concurrency', type=int, help='Override the number of concurrent clients')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for request selection')
+    parser.add_argument('--output', type=Path, help='Write the results as JSON')
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    scenario_path = args.scenario
+    results: Dict[str, Dict] = {}
+
+    def load_scenario() -> Scenario:
+        scenario = Scenario.load(scenario_path)
+        if args.duration is not None:
+            scenario.duration_seconds = args.duration
+        if args.warmup is not None:
+            scenario.warmup_seconds = args.warmup
+        if args.concurrency is not None:
+            scenario.concurrency = args.concurrency
+        return scenario
+
+    if args.url:
+        results[args.url] = asyncio.run(_drive(args.url, load_scenario(), args.seed))
+        print(format_report(args.url, results[args.url]))
+    else:
+        engines: List[str] = [engine.strip() for engine in args.engine.split(',') if engine.strip()]
+        unknown = sorted(set(engines) - set(ENGINES))
+        if unknown:
+            print(f"Unknown engine(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        extra_env = dict(item.split('=', 1) for item in args.server_env)
+
+        with tempfile.TemporaryDirectory(prefix='sushi-loadtest-') as tmp:
+            core_path = build_fixture(
+                args.fixture_dir or Path(tmp) / 'core',
+                synthetic_services=args.synthetic
+            )
+            print(f"Fixture core repo: {core_path}")
+            for engine in engines:
+                scenario = load_scenario()
+                env = {**fixture_env(core_path), **scenario.server_env, **extra_env, 'SUSHI_ENGINE': engine}
+                with api_server(env) as base_url:
+                    results[engine] = asyncio.run(_drive(base_url, scenario, args.seed))
+                print(format_report(engine, results[engine]))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
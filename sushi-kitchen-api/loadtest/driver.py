@@ -0,0 +1,197 @@
+"""Closed-loop asyncio load driver and per-route latency report"""
+
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import yaml
+
+# Placeholders in a scenario's `vary` lists, filled from /api/v1/components
+CATALOG_REFERENCES = {
+    '@platters': ('platters', 'platter'),
+    '@combos': ('combos', 'combo'),
+}
+
+
+@dataclass
+class RouteSpec:
+    name: str
+    path: str
+    method: str = 'GET'
+    weight: float = 1.0
+    json: Optional[Dict[str, Any]] = None
+    params: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    # field -> candidate values; one is picked per request. Mapping values
+    # are merged into the body, anything else is set as body[field].
+    vary: Dict[str, List[Any]] = field(default_factory=dict)
+
+    def build_request(self, rng: random.Random) -> Dict[str, Any]:
+        body = dict(self.json) if self.json is not None else None
+        for key, values in self.vary.items():
+            value = rng.choice(values)
+            if body is None:
+                body = {}
+            if isinstance(value, dict):
+                body.update(value)
+            else:
+                body[key] = value
+        request = {'method': self.method, 'url': self.path, 'headers': self.headers}
+        if body is not None:
+            request['json'] = body
+        if self.params:
+            request['params'] = self.params
+        return request
+
+
+@dataclass
+class Scenario:
+    routes: List[RouteSpec]
+    concurrency: int = 8
+    duration_seconds: float = 30.0
+    warmup_seconds: float = 5.0
+    server_env: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> 'Scenario':
+        with Path(path).open() as f:
+            data = yaml.safe_load(f) or {}
+        routes = [RouteSpec(**route) for route in data.get('routes', [])]
+        if not routes:
+            raise ValueError(f"Scenario {path} defines no routes")
+        return cls(
+            routes=routes,
+            concurrency=int(data.get('concurrency', 8)),
+            duration_seconds=float(data.get('duration_seconds', 30)),
+            warmup_seconds=float(data.get('warmup_seconds', 5)),
+            server_env={k: str(v) for k, v in (data.get('server_env') or {}).items()}
+        )
+
+    def resolve_catalog(self, components: Dict) -> None:
+        """Expand @platters / @combos into selection bodies for every catalog entry"""
+        for route in self.routes:
+            for key, values in route.vary.items():
+                expanded = []
+                for value in values:
+                    if isinstance(value, str) and value in CATALOG_REFERENCES:
+                        section, selection_type = CATALOG_REFERENCES[value]
+                        expanded.extend(
+                            {'selection_type': selection_type, 'selection_id': entry_id}
+                            for entry_id in _catalog_ids(components.get(section))
+                        )
+                    else:
+                        expanded.append(value)
+                if not expanded:
+                    raise ValueError(f"Route {route.name}: nothing to pick for '{key}'")
+                route.vary[key] = expanded
+
+
+def _catalog_ids(section) -> List[str]:
+    # The bundle keys sections by id; the export fallback returns lists
+    if isinstance(section, dict):
+        return list(section)
+    return [entry['id'] for entry in section or [] if 'id' in entry]
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    failures: int = 0
+
+    def record(self, seconds: float, status: str, ok: bool) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] += 1
+        if not ok:
+            self.failures += 1
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Drive the scenario with `concurrency` closed-loop workers and summarise it"""
+    stats: Dict[str, RouteStats] = {route.name: RouteStats() for route in scenario.routes}
+    weights = [route.weight for route in scenario.routes]
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    measure_from = started + scenario.warmup_seconds
+    stop_at = measure_from + scenario.duration_seconds
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        while loop.time() < stop_at:
+            route = rng.choices(scenario.routes, weights)[0]
+            request = route.build_request(rng)
+            begin = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                await response.aread()
+                status, ok = str(response.status_code), response.is_success
+            except httpx.HTTPError as exc:
+                status, ok = type(exc).__name__, False
+            elapsed = time.perf_counter() - begin
+            if loop.time() >= measure_from:
+                stats[route.name].record(elapsed, status, ok)
+
+    await asyncio.gather(*(worker(i) for i in range(scenario.concurrency)))
+    measured = max(loop.time() - measure_from, 1e-9)
+    return summarize(stats, measured, scenario.concurrency)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(stats: Dict[str, RouteStats], seconds: float, concurrency: int) -> Dict[str, Any]:
+    routes = {}
+    for name, route_stats in stats.items():
+        latencies = sorted(route_stats.latencies)
+        routes[name] = {
+            'requests': len(latencies),
+            'failures': route_stats.failures,
+            'statuses': dict(route_stats.statuses),
+            'throughput_rps': len(latencies) / seconds,
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        }
+    total = sum(route['requests'] for route in routes.values())
+    return {
+        'duration_seconds': seconds,
+        'concurrency': concurrency,
+        'requests': total,
+        'failures': sum(route['failures'] for route in routes.values()),
+        'throughput_rps': total / seconds,
+        'routes': routes,
+    }
+
+
+def format_report(label: str, summary: Dict[str, Any]) -> str:
+    lines = [
+        f"== {label}: {summary['requests']} requests in {summary['duration_seconds']:.1f}s "
+        f"({summary['throughput_rps']:.1f} req/s, concurrency {summary['concurrency']}, "
+        f"{summary['failures']} failed)",
+        f"{'route':<12} {'reqs':>7} {'fail':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+    ]
+    for name, route in summary['routes'].items():
+        lines.append(
+            f"{name:<12} {route['requests']:>7} {route['failures']:>5} {route['throughput_rps']:>8.1f} "
+            f"{route['p50_ms']:>8.1f} {route['p95_ms']:>8.1f} {route['p99_ms']:>8.1f} {route['max_ms']:>8.1f}"
+        )
+        odd = {status: count for status, count in route['statuses'].items() if not status.startswith('2')}
+        if odd:
+            lines.append(f"{'':<12} non-2xx: {odd}")
+    return '\n'.join(lines)
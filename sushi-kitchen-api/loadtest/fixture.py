@@ -0,0 +1,71 @@
+"""Self-contained stand-in for CORE_REPO_PATH used by the load test"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Everything the orchestrator and the scripts it runs read from the core repo
+COPIED_DIRS = ('docs/manifest', 'scripts')
+COPIED_MODULES = ('manifest_graph.py', 'manifest_loader.py', 'generate_compose.py', 'script_worker.py')
+
+
+def fixture_env(core_path: Path) -> Dict[str, str]:
+    """Environment that points the API (and its scripts) at the fixture only"""
+    return {
+        'CORE_REPO_PATH': str(core_path),
+        'SUSHI_GENERATED_DIR': str(core_path / 'generated'),
+        'SUSHI_MANIFEST_CACHE_DIR': str(core_path / '.cache' / 'sushi-kitchen'),
+    }
+
+
+def _run_script(core_path: Path, script: str, *args: str) -> None:
+    env = {**os.environ, **fixture_env(core_path)}
+    subprocess.run(
+        [sys.executable, str(core_path / 'scripts' / script), *args],
+        cwd=core_path,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL
+    )
+
+
+def build_fixture(
+    target: Path,
+    source: Path = REPO_ROOT,
+    synthetic_services: Optional[int] = None
+) -> Path:
+    """Copy manifests, scripts and shared modules into target and pre-build the API bundle
+
+    With synthetic_services the core manifests are replaced by a generated
+    catalog of that size (scripts/generate-synthetic-manifests.py).
+    """
+    target = Path(target)
+    if target.exists():
+        shutil.rmtree(target)
+    ignore = shutil.ignore_patterns('__pycache__', '*.pyc')
+    for relative in COPIED_DIRS:
+        shutil.copytree(source / relative, target / relative, ignore=ignore)
+    for name in COPIED_MODULES:
+        shutil.copy2(source / name, target / name)
+
+    core_manifests = target / 'docs' / 'manifest' / 'core'
+    if synthetic_services:
+        _run_script(
+            target,
+            'generate-synthetic-manifests.py',
+            '--output-dir', str(core_manifests),
+            '--services', str(synthetic_services)
+        )
+
+    _run_script(
+        target,
+        'generate-api-bundle.py',
+        '--manifest-dir', str(core_manifests),
+        '--output', str(target / 'generated' / 'api-bundle.json')
+    )
+    return target
@@ -0,0 +1,239 @@
+"""API tests for serving the pre-built bundle: ETags and content negotiation."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = ROOT / "sushi-kitchen-api"
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+# app.main builds its orchestrator at import time
+os.environ.setdefault("CORE_REPO_PATH", str(ROOT))
+os.environ.setdefault("SUSHI_GENERATED_DIR", str(ROOT / "generated"))
+os.environ.setdefault("SUSHI_SCRIPT_WORKERS", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import main  # noqa: E402
+from app.orchestrators.manifest_orchestrator import ManifestOrchestrator  # noqa: E402
+from app.shard_store import ShardStore  # noqa: E402
+
+BUNDLE = "/api/v1/bundle"
+GENERATOR = ROOT / "scripts" / "generate-api-bundle.py"
+# Stands in for brotli output; the server never decodes variants
+FAKE_BR = b"not really brotli"
+
+
+def _write_bundle(generated: Path, services: dict) -> str:
+    """Write api-bundle.json with a .br variant recorded in its meta file"""
+    raw = json.dumps({"services": services}).encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    (generated / "api-bundle.json").write_bytes(raw)
+    (generated / "api-bundle.json.br").write_bytes(FAKE_BR)
+    meta = {"sha256": digest, "encodings": {"br": {"path": "api-bundle.json.br", "size": len(FAKE_BR)}}}
+    (generated / "api-bundle.meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return digest
+
+
+def _generate(manifests: Path, generated: Path) -> None:
+    subprocess.run(
+        [sys.executable, str(GENERATOR), "--manifest-dir", str(manifests), "--output", str(generated / "api-bundle.json")],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _write_platter(manifests: Path, name: str) -> None:
+    (manifests / "platters.yml").write_text(
+        f"platters:\n  - id: platter.dev\n    name: {name}\n    includes: [combo.chat]\n", encoding="utf-8"
+    )
+
+
+def _total_size(manifests: Path, output: Path, *flags: str) -> int:
+    result = subprocess.run(
+        [sys.executable, str(GENERATOR), "--manifest-dir", str(manifests), "--output", str(output), "--stats", *flags],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    line = next(line for line in result.stdout.splitlines() if "Total Size:" in line)
+    return int(line.split(":")[1].split()[0].replace(",", ""))
+
+
+@pytest.fixture
+def manifests(tmp_path):
+    manifests = tmp_path / "manifest"
+    manifests.mkdir()
+    (manifests / "combos.yml").write_text("combos:\n  - id: combo.chat\n    name: Chat\n", encoding="utf-8")
+    _write_platter(manifests, "Developer")
+    return manifests
+
+
+@pytest.fixture
+def generated(tmp_path, monkeypatch):
+    generated = tmp_path / "generated"
+    generated.mkdir()
+    monkeypatch.setenv("SUSHI_GENERATED_DIR", str(generated))
+    monkeypatch.setenv("SUSHI_CACHE_REVALIDATE_SECONDS", "0")
+    monkeypatch.setattr(main, "orchestrator", ManifestOrchestrator(str(ROOT), engine="subprocess"))
+    return generated
+
+
+@pytest.fixture
+def client(generated):
+    return TestClient(main.app)
+
+
+def test_bundle_negotiates_encoding_with_an_etag_per_representation(generated, client) -> None:
+    digest = _write_bundle(generated, {"svc.a": {}})
+
+    identity = client.get(BUNDLE, headers={"Accept-Encoding": "identity"})
+    assert identity.status_code == 200
+    assert identity.headers["ETag"] == f'"{digest}"'
+    assert identity.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in identity.headers
+    assert identity.json() == {"services": {"svc.a": {}}}
+
+    # gzip is compressed at load time when the generator did not write it
+    gzipped = client.get(BUNDLE, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] == f'"{digest}-gz"'
+    assert gzipped.json() == identity.json()
+
+    with client.stream("GET", BUNDLE, headers={"Accept-Encoding": "gzip;q=0.5, br"}) as br:
+        assert br.headers["Content-Encoding"] == "br"
+        assert br.headers["ETag"] == f'"{digest}-br"'
+        assert b"".join(br.iter_raw()) == FAKE_BR
+
+    preferred = client.get(BUNDLE, headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert preferred.headers["Content-Encoding"] == "gzip"
+
+
+def test_bundle_revalidates_against_the_selected_representation(generated, client) -> None:
+    digest = _write_bundle(generated, {"svc.a": {}})
+    gzip_etag = f'"{digest}-gz"'
+
+    cached = client.get(BUNDLE, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == gzip_etag
+    assert cached.headers["Vary"] == "Accept-Encoding"
+    assert client.get(BUNDLE, headers={"Accept-Encoding": "gzip", "If-None-Match": f'W/{gzip_etag}'}).status_code == 304
+
+    # A cached gzip body must not validate an identity response
+    identity = client.get(BUNDLE, headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag})
+    assert identity.status_code == 200
+    assert identity.headers["ETag"] == f'"{digest}"'
+
+    _write_bundle(generated, {"svc.a": {}, "svc.b": {}})
+    changed = client.get(BUNDLE, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != gzip_etag
+    assert changed.json() == {"services": {"svc.a": {}, "svc.b": {}}}
+
+
+def test_missing_bundle_is_404(client) -> None:
+    assert client.get(BUNDLE).status_code == 404
+
+
+def test_components_follow_a_regenerated_bundle(manifests, generated, client) -> None:
+    _generate(manifests, generated)
+    platters = client.get("/api/v1/components").json()["platters"]
+    assert [(platter["id"], platter["name"]) for platter in platters] == [("platter.dev", "Developer")]
+    assert client.get("/api/v1/components").status_code == 200
+    stats = client.get("/admin/cache/stats").json()["bundle"]
+    assert (stats["reloads"], stats["hits"]) == (1, 1)
+
+    # Regenerating unchanged manifests rewrites the file but not its checksums
+    _generate(manifests, generated)
+    client.get("/api/v1/components")
+    assert client.get("/admin/cache/stats").json()["bundle"]["reloads"] == 1
+
+    _write_platter(manifests, "Developer Complete")
+    _generate(manifests, generated)
+    platters = client.get("/api/v1/components").json()["platters"]
+    assert platters[0]["name"] == "Developer Complete"
+    assert client.get("/admin/cache/stats").json()["bundle"]["reloads"] == 2
+
+
+def test_shard_etags_follow_shard_bytes(manifests, generated, client) -> None:
+    _generate(manifests, generated)
+    section = client.get("/api/v1/bundle/sections/platters")
+    entity = client.get("/api/v1/components/platter/platter.dev")
+    combos = client.get("/api/v1/bundle/sections/combos")
+    assert entity.json()["name"] == "Developer"
+    assert section.headers["ETag"] != entity.headers["ETag"]
+    for response in (section, entity, combos):
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('"')
+
+    revalidated = client.get("/api/v1/bundle/sections/platters", headers={"If-None-Match": section.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert client.get("/api/v1/bundle/sections/nope").status_code == 404
+    assert client.get("/api/v1/components/platter/platter.nope").status_code == 404
+
+    _write_platter(manifests, "Developer Complete")
+    _generate(manifests, generated)
+
+    edited = client.get("/api/v1/bundle/sections/platters", headers={"If-None-Match": section.headers["ETag"]})
+    assert edited.status_code == 200
+    assert edited.headers["ETag"] != section.headers["ETag"]
+    edited_entity = client.get(
+        "/api/v1/components/platter/platter.dev", headers={"If-None-Match": entity.headers["ETag"]}
+    )
+    assert edited_entity.status_code == 200
+    assert edited_entity.json()["name"] == "Developer Complete"
+    # Shards whose bytes did not change keep their ETag
+    unchanged = client.get("/api/v1/bundle/sections/combos", headers={"If-None-Match": combos.headers["ETag"]})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == combos.headers["ETag"]
+
+
+def test_shards_that_do_not_match_the_manifest_are_never_cached(manifests, generated) -> None:
+    _generate(manifests, generated)
+    shard_dir = generated / "api-bundle.shards"
+    store = ShardStore(shard_dir, revalidate_interval=3600)
+    assert store.section("platters") is not None
+    store.refresh()
+
+    # Shards rewritten behind a manifest that has not been replaced yet
+    section_path = shard_dir / "sections" / "platters.json"
+    original = section_path.read_bytes()
+    section_path.write_bytes(original.replace(b"Developer", b"Rewritten"))
+    assert store.section("platters") is None
+    assert store.stats()["mismatches"] == 2
+    assert store.stats()["cached_shards"] == 0
+
+    section_path.write_bytes(original)
+    shard = store.section("platters")
+    assert shard.etag == f'"{hashlib.sha256(original).hexdigest()}"'
+
+    # After a regeneration the cached manifest is stale: an entity not read
+    # before is rewritten on disk, so the mismatch forces a manifest re-read
+    _write_platter(manifests, "Developer Complete")
+    _generate(manifests, generated)
+    entity = store.entity("platters", "platter.dev")
+    assert json.loads(entity.data)["name"] == "Developer Complete"
+    assert entity.etag == f'"{hashlib.sha256(entity.data).hexdigest()}"'
+    assert store.stats()["mismatches"] == 3
+
+
+def test_stats_report_the_compact_size_even_when_written_pretty(manifests, tmp_path) -> None:
+    compact = tmp_path / "compact" / "api-bundle.json"
+    pretty = tmp_path / "pretty" / "api-bundle.json"
+    compact_size = _total_size(manifests, compact, "--no-shards")
+    assert compact_size == compact.stat().st_size
+    assert _total_size(manifests, pretty, "--no-shards", "--pretty") == compact_size
+    assert pretty.stat().st_size > compact_size
@@ -0,0 +1,239 @@
+"""API tests for compose generation: result cache and resident engine."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import pstats
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = ROOT / "sushi-kitchen-api"
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+# app.main builds its orchestrator at import time
+os.environ.setdefault("CORE_REPO_PATH", str(ROOT))
+os.environ.setdefault("SUSHI_GENERATED_DIR", str(ROOT / "generated"))
+os.environ.setdefault("SUSHI_SCRIPT_WORKERS", "0")
+
+import httpx  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import main  # noqa: E402
+from app.admission import GenerationLimiter  # noqa: E402
+from app.orchestrators.manifest_orchestrator import ManifestOrchestrator  # noqa: E402
+from app.profiling import PROFILE_HEADER, ProfileRecorder  # noqa: E402
+from app.result_cache import GenerationResultCache  # noqa: E402
+
+GENERATE = "/api/v1/compose/generate"
+OLLAMA = {"selection_type": "roll", "selection_id": "hosomaki.ollama"}
+
+
+def _core_checkout(tmp_path: Path) -> Path:
+    """A core repo whose manifests can be edited; the scripts are the real ones"""
+    repo = tmp_path / "core"
+    for part in ("core", "templates"):
+        shutil.copytree(ROOT / "docs" / "manifest" / part, repo / "docs" / "manifest" / part)
+    (repo / "scripts").symlink_to(ROOT / "scripts", target_is_directory=True)
+    return repo
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    repo = _core_checkout(tmp_path)
+    orchestrator = ManifestOrchestrator(str(repo), engine="inprocess", executor=main.executor)
+    monkeypatch.setattr(main, "orchestrator", orchestrator)
+    monkeypatch.setattr(main, "result_cache", GenerationResultCache())
+    return TestClient(main.app), repo
+
+
+def test_result_cache_hits_and_reloads_after_manifest_edit(api) -> None:
+    client, repo = api
+
+    first = client.post(GENERATE, json=OLLAMA)
+    assert first.status_code == 200
+    assert "ollama/ollama:latest" in first.json()["yaml"]
+    assert client.post(GENERATE, json=OLLAMA).json()["yaml"] == first.json()["yaml"]
+    assert (main.result_cache.hits, main.result_cache.misses) == (1, 1)
+
+    # A different request is its own entry
+    assert client.post(GENERATE, json={**OLLAMA, "privacy_profile": "inari"}).status_code == 200
+    assert main.result_cache.misses == 2
+
+    contracts = repo / "docs" / "manifest" / "core" / "contracts.yml"
+    contracts.write_text(
+        contracts.read_text(encoding="utf-8").replace("ollama/ollama:latest", "ollama/ollama:0.3.14"),
+        encoding="utf-8",
+    )
+    edited = client.post(GENERATE, json=OLLAMA).json()["yaml"]
+    assert "ollama/ollama:0.3.14" in edited
+    assert "ollama/ollama:latest" not in edited
+    assert main.result_cache.misses == 3
+    assert client.post(GENERATE, json=OLLAMA).json()["yaml"] == edited
+    assert main.result_cache.hits == 2
+
+
+def test_network_profile_template_edit_reloads_the_engine(api) -> None:
+    client, repo = api
+    research = {**OLLAMA, "privacy_profile": "open-research"}
+    assert "subnet: 172.20.0.0/16" in client.post(GENERATE, json=research).json()["yaml"]
+    digest = main.orchestrator.generation_digest()
+
+    template = repo / "docs" / "manifest" / "templates" / "network-profiles" / "open-research.yml"
+    template.write_text(
+        template.read_text(encoding="utf-8").replace('"172.20.0.0/16"', '"172.30.0.0/16"'), encoding="utf-8"
+    )
+    edited = client.post(GENERATE, json=research).json()["yaml"]
+    assert "subnet: 172.30.0.0/16" in edited
+    assert main.orchestrator.generation_digest() != digest
+    assert main.result_cache.misses == 2
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    """Generation through a fresh limiter, with a stand-in for the generator"""
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_generation(request, cache_key):
+        calls.append(request.selection_id)
+        await release.wait()
+        return f"# {request.selection_id}\n", [request.selection_id], None
+
+    monkeypatch.setattr(main, "orchestrator", ManifestOrchestrator(str(ROOT), engine="subprocess"))
+    monkeypatch.setattr(main, "result_cache", GenerationResultCache())
+    monkeypatch.setattr(main, "run_generation", fake_generation)
+
+    def use(limiter: GenerationLimiter):
+        monkeypatch.setattr(main, "generation_limiter", limiter)
+        return calls, release
+
+    return use
+
+
+async def _post_all(bodies, release: asyncio.Event, release_after: float):
+    async with httpx.AsyncClient(app=main.app, base_url="http://test") as client:
+        posts = [asyncio.ensure_future(client.post(GENERATE, json=body)) for body in bodies]
+        await asyncio.sleep(release_after)
+        release.set()
+        return await asyncio.gather(*posts)
+
+
+def test_identical_in_flight_requests_share_one_generation(limited) -> None:
+    calls, release = limited(GenerationLimiter(max_concurrent=4, queue_timeout=5))
+    responses = asyncio.run(_post_all([OLLAMA] * 3, release, release_after=0.2))
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert {response.json()["yaml"] for response in responses} == {"# hosomaki.ollama\n"}
+    assert calls == ["hosomaki.ollama"]
+    assert main.generation_limiter.stats()["coalesced"] == 2
+    assert main.generation_limiter.stats()["in_flight_keys"] == 0
+
+
+def test_saturated_limiter_answers_429(limited) -> None:
+    calls, release = limited(GenerationLimiter(max_concurrent=1, queue_timeout=0.05))
+    other = {**OLLAMA, "selection_id": "hosomaki.n8n"}
+    responses = asyncio.run(_post_all([OLLAMA, other], release, release_after=0.3))
+
+    # Whichever request reaches the limiter first holds the only slot
+    admitted, rejected = sorted(responses, key=lambda response: response.status_code)
+    assert (admitted.status_code, rejected.status_code) == (200, 429)
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert "Too many concurrent generations" in rejected.json()["detail"]
+    assert calls == [admitted.json()["services"][0]]
+    assert main.generation_limiter.stats()["rejected"] == 1
+
+
+def test_armed_and_header_triggered_requests_are_profiled(api, tmp_path, monkeypatch) -> None:
+    client, _ = api
+    recorder = ProfileRecorder(tmp_path / "profiles", keep=2, allow_header=True)
+    monkeypatch.setattr(main, "profile_recorder", recorder)
+
+    assert PROFILE_HEADER not in client.post(GENERATE, json=OLLAMA).headers
+    assert client.post("/admin/profiles/arm", params={"count": 1}).json() == {"armed": 1}
+    profiled = client.post(GENERATE, json={**OLLAMA, "privacy_profile": "inari"})
+    profile_id = profiled.headers[PROFILE_HEADER]
+    assert PROFILE_HEADER not in client.post(GENERATE, json={**OLLAMA, "privacy_profile": "temaki"}).headers
+
+    listing = client.get("/admin/profiles").json()
+    assert (listing["armed"], listing["busy"]) == (0, False)
+    assert [profile["id"] for profile in listing["profiles"]] == [profile_id]
+    artifact = tmp_path / "download.pstats"
+    artifact.write_bytes(client.get(f"/admin/profiles/{profile_id}").content)
+    functions = {name for _, _, name in pstats.Stats(str(artifact)).stats}
+    assert "generate_complete_stack" in functions
+    assert client.get("/admin/profiles/missing").status_code == 404
+
+    # The header works only because allow_header is set; keep=2 prunes the oldest
+    for profile in ("inari", "temaki"):
+        body = {**OLLAMA, "include_optional": True, "privacy_profile": profile}
+        assert PROFILE_HEADER in client.post(GENERATE, json=body, headers={PROFILE_HEADER: "1"}).headers
+    remaining = [profile["id"] for profile in client.get("/admin/profiles").json()["profiles"]]
+    assert len(remaining) == 2
+    assert profile_id not in remaining
+
+
+def test_profiling_failures_leave_the_request_outcome_alone(api, tmp_path, monkeypatch) -> None:
+    client, _ = api
+    # The profile directory is a file, so every save() fails
+    blocked = tmp_path / "profiles"
+    blocked.write_text("not a directory", encoding="utf-8")
+    recorder = ProfileRecorder(blocked, allow_header=True)
+    monkeypatch.setattr(main, "profile_recorder", recorder)
+    profiled = {PROFILE_HEADER: "1"}
+
+    generated = client.post(GENERATE, json=OLLAMA, headers=profiled)
+    assert generated.status_code == 200
+    assert PROFILE_HEADER not in generated.headers
+    missing = client.post(GENERATE, json={**OLLAMA, "selection_id": "hosomaki.missing"}, headers=profiled)
+    unprofiled = client.post(GENERATE, json={**OLLAMA, "selection_id": "hosomaki.missing"})
+    assert (missing.status_code, missing.json()) == (unprofiled.status_code, unprofiled.json())
+    assert recorder.stats()["busy"] is False
+
+    # A profiler that fails to start must not leave the recorder busy
+    def refuse(self) -> None:
+        raise RuntimeError("another profiler is active")
+
+    monkeypatch.setattr("app.profiling.ProfileSession.start", refuse)
+    with pytest.raises(RuntimeError):
+        recorder.begin("refused")
+    assert recorder.stats()["busy"] is False
+
+
+def test_generation_work_runs_in_the_executor_pools(api) -> None:
+    client, _ = api
+
+    def completed():
+        stats = client.get("/admin/executor/stats").json()
+        assert stats["blocking"]["in_flight"] == stats["cpu"]["in_flight"] == 0
+        return stats["blocking"]["completed"], stats["cpu"]["completed"]
+
+    blocking, cpu = completed()
+    assert client.post(GENERATE, json=OLLAMA).status_code == 200
+    after_miss = completed()
+    # Digest and generation go to the I/O pool, the YAML dump to the CPU pool
+    assert after_miss[0] >= blocking + 2
+    assert after_miss[1] == cpu + 1
+
+    assert client.post(GENERATE, json=OLLAMA).status_code == 200
+    assert completed()[1] == after_miss[1]
+
+
+def test_cache_refresh_clears_generation_results(api) -> None:
+    client, _ = api
+    assert client.post(GENERATE, json=OLLAMA).status_code == 200
+    assert client.get("/admin/cache/stats").json()["results"]["entries"] == 1
+
+    refreshed = client.post("/admin/cache/refresh").json()
+    assert refreshed["status"] == "refreshed"
+    assert refreshed["cache"]["results"]["entries"] == 0
+    assert client.post(GENERATE, json=OLLAMA).status_code == 200
+    assert (main.result_cache.hits, main.result_cache.misses) == (0, 2)
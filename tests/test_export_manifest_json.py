@@ -0,0 +1,117 @@
+"""Tests for the manifest JSON exporter (scripts/export-manifest-json.py)."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+EXPORTER_PATH = ROOT / "scripts" / "export-manifest-json.py"
+OLD_MTIME_NS = 1_000_000_000 * 10**9
+
+
+def load_exporter_module():
+    spec = importlib.util.spec_from_file_location("export_manifest_json", EXPORTER_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Unable to load manifest JSON exporter")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _manifest_tree(root: Path) -> Path:
+    manifests = root / "manifest"
+    files = {
+        "core/contracts.yml": "services:\n  svc.a: {}\n",
+        "core/combos.yml": "combos: []\n",
+        "extra/notes.yml": "note: removable\n",
+        "templates/network-profiles/open.yml": "name: open\n",
+    }
+    for relative, text in files.items():
+        path = manifests / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return manifests
+
+
+def _export(module, manifests: Path, output: Path, *extra: str) -> None:
+    module.main(["--manifest-root", str(manifests), "--output-dir", str(output), *extra])
+
+
+def test_incremental_export_deletes_only_removed_sources(tmp_path, capsys) -> None:
+    module = load_exporter_module()
+    manifests = _manifest_tree(tmp_path)
+    output = tmp_path / "web" / "api"
+    _export(module, manifests, output, "--incremental")
+
+    outputs = sorted(path.relative_to(output).as_posix() for path in output.rglob("*.json"))
+    assert outputs == [
+        "core/combos.json", "core/contracts.json", "extra/notes.json", "templates/network-profiles/open.json"
+    ]
+    # Unrelated files under the output root are never touched
+    (output / "core" / "handwritten.json").write_text("{}", encoding="utf-8")
+    for path in output.rglob("*.json"):
+        os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+    capsys.readouterr()
+
+    (manifests / "extra" / "notes.yml").unlink()
+    _export(module, manifests, output, "--incremental")
+
+    assert "Converted 0, unchanged 3, removed 1" in capsys.readouterr().out
+    assert not (output / "extra").exists()
+    remaining = sorted(path.relative_to(output).as_posix() for path in output.rglob("*.json"))
+    assert remaining == [
+        "core/combos.json", "core/contracts.json", "core/handwritten.json", "templates/network-profiles/open.json"
+    ]
+    assert all(path.stat().st_mtime_ns == OLD_MTIME_NS for path in output.rglob("*.json"))
+
+    index = json.loads((output.parent / module.INDEX_FILE).read_text(encoding="utf-8"))
+    assert [record["source"] for record in index["files"]] == [
+        "core/combos.yml", "core/contracts.yml", "templates/network-profiles/open.yml"
+    ]
+    assert index["options"] == {"pretty": False}
+
+
+def test_incremental_export_reconverts_on_edits_and_option_changes(tmp_path, capsys) -> None:
+    module = load_exporter_module()
+    manifests = _manifest_tree(tmp_path)
+    output = tmp_path / "web" / "api"
+    _export(module, manifests, output, "--incremental")
+    capsys.readouterr()
+
+    (manifests / "core" / "combos.yml").write_text("combos: [{id: combo.x}]\n", encoding="utf-8")
+    _export(module, manifests, output, "--incremental")
+    assert "Converted 1, unchanged 3, removed 0" in capsys.readouterr().out
+    assert json.loads((output / "core" / "combos.json").read_text(encoding="utf-8")) == {"combos": [{"id": "combo.x"}]}
+
+    _export(module, manifests, output, "--incremental")
+    assert "Index up to date" in capsys.readouterr().out
+
+    # Outputs written compactly cannot be reused for --pretty
+    _export(module, manifests, output, "--incremental", "--pretty")
+    assert "Converted 4, unchanged 0, removed 0" in capsys.readouterr().out
+
+
+def test_parallel_export_matches_sequential(tmp_path, capsys) -> None:
+    module = load_exporter_module()
+    manifests = ROOT / "docs" / "manifest"
+    exports = {}
+    for jobs in ("1", "4"):
+        output = tmp_path / f"jobs-{jobs}" / "api"
+        _export(module, manifests, output, "--jobs", jobs)
+        index = json.loads((output.parent / module.INDEX_FILE).read_text(encoding="utf-8"))
+        index.pop("generated_at")
+        files = {path.relative_to(output).as_posix(): path.read_bytes() for path in output.rglob("*.json")}
+        exports[jobs] = (index, files)
+    capsys.readouterr()
+
+    sequential, parallel = exports["1"], exports["4"]
+    assert len(sequential[1]) > 4
+    assert parallel[0] == sequential[0]
+    sources = [record["source"] for record in parallel[0]["files"]]
+    assert sources == sorted(sources)
+    assert parallel[1] == sequential[1]
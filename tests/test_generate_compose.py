@@ -0,0 +1,72 @@
+"""Tests for the root compose generator."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import manifest_graph  # noqa: E402
+from generate_compose import MATRIX_INDEX_NAME, _compiled_graph, generate_matrix, load_yaml  # noqa: E402
+
+CORE = ROOT / "docs" / "manifest" / "core"
+TEMPLATES = ROOT / "docs" / "manifest" / "templates"
+
+
+def test_matrix_writes_outputs_and_index(tmp_path: Path) -> None:
+    index = generate_matrix(
+        load_yaml(CORE / "contracts.yml"),
+        load_yaml(CORE / "combos.yml"),
+        load_yaml(CORE / "bento-box.yml"),
+        load_yaml(CORE / "platters.yml"),
+        environments={"development": load_yaml(TEMPLATES / "environment-configs" / "development.yml")},
+        networks={
+            name: load_yaml(TEMPLATES / "network-profiles" / f"{name}.yml")
+            for name in ("open-research", "legal-privilege")
+        },
+        output_dir=tmp_path,
+        platter_ids=["platter.hosomaki-core", "platter.unknown"],
+        workers=1,
+    )
+
+    assert index["combinations"] == 4
+    assert index["failures"] == 2
+    assert json.loads((tmp_path / MATRIX_INDEX_NAME).read_text()) == index
+
+    ok = [entry for entry in index["entries"] if "error" not in entry]
+    assert {entry["network"] for entry in ok} == {"open-research", "legal-privilege"}
+    for entry in ok:
+        written = (tmp_path / entry["path"]).read_bytes()
+        assert hashlib.sha256(written).hexdigest() == entry["sha256"]
+        assert entry["services"] > 0
+
+
+def test_manifest_directories_use_the_compiled_graph_cache(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("SUSHI_MANIFEST_CACHE", "1")
+    monkeypatch.setattr(manifest_graph, "DEFAULT_CACHE_DIR", tmp_path / "cache")
+    core = tmp_path / "core"
+    shutil.copytree(CORE, core)
+    args = argparse.Namespace(
+        contracts=core / "contracts.yml",
+        combos=core / "combos.yml",
+        bento=core / "bento-box.yml",
+        platters=core / "platters.yml",
+    )
+
+    graph = _compiled_graph(args)
+    assert graph is not None
+    assert manifest_graph.default_cache_path(core).exists()
+    assert graph.source_digest == manifest_graph.digest_manifest_dir(core)
+
+    # Manifests that do not form one directory are compiled in memory
+    renamed = tmp_path / "elsewhere" / "platters.yml"
+    renamed.parent.mkdir()
+    shutil.copy(core / "platters.yml", renamed)
+    assert _compiled_graph(argparse.Namespace(**{**vars(args), "platters": renamed})) is None
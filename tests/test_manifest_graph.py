@@ -0,0 +1,240 @@
+"""Tests for the compiled manifest graph."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from manifest_graph import (  # noqa: E402
+    KIND_CAPABILITY,
+    KIND_COMBO,
+    KIND_PLATTER,
+    KIND_SERVICE,
+    KIND_UNKNOWN,
+    ClosureIndex,
+    ManifestGraph,
+)
+
+CORE = ROOT / "docs" / "manifest" / "core"
+
+
+def _toy_graph() -> ManifestGraph:
+    contracts = {
+        "capabilities": {"cap.db": {"providers": ["svc.pg", "svc.lite"]}},
+        "services": {
+            "svc.app": {"requires": ["cap.db", "svc.cache"], "suggests": ["svc.ui"]},
+            "svc.cache": {},
+            "svc.pg": {"provides": ["cap.db"]},
+            "svc.lite": {"provides": ["cap.db"]},
+            "svc.ui": {},
+        },
+        "dependency_resolution": {
+            "default_providers": {"cap.db": "svc.lite"},
+            "conflicts": [{"services": ["svc.pg", "svc.lite"]}],
+        },
+    }
+    combos = {"combos": [{"id": "combo.core", "includes": ["svc.app"], "optional": ["svc.ui"]}]}
+    platters = {
+        "platters": [
+            {"id": "platter.all", "combos": ["combo.core"], "additional_services": ["svc.missing"]}
+        ]
+    }
+    return ManifestGraph.from_manifests(contracts, combos, {}, platters)
+
+
+def test_ids_are_interned_with_kinds_and_adjacency() -> None:
+    graph = _toy_graph()
+
+    assert graph.kind_of("svc.app") == KIND_SERVICE
+    assert graph.kind_of("cap.db") == KIND_CAPABILITY
+    assert graph.kind_of("combo.core") == KIND_COMBO
+    assert graph.kind_of("platter.all") == KIND_PLATTER
+    assert graph.kind_of("svc.missing") == KIND_UNKNOWN
+
+    app = graph.index["svc.app"]
+    assert graph.names(graph.requires[app]) == ["cap.db", "svc.cache"]
+    assert graph.names(graph.suggests[app]) == ["svc.ui"]
+    assert graph.names(graph.conflicts[graph.index["svc.pg"]]) == ["svc.lite"]
+
+
+def test_reverse_indexes_and_preferred_provider() -> None:
+    graph = _toy_graph()
+
+    assert graph.preferred_provider("cap.db") == "svc.lite"
+    assert graph.names(graph.providers[graph.index["cap.db"]]) == ["svc.pg", "svc.lite"]
+    assert set(graph.names(graph.dependents[graph.index["svc.lite"]])) == {"svc.app"}
+    assert graph.containing_bundles("svc.ui") == ["combo.core"]
+    assert graph.containing_bundles("combo.core", KIND_PLATTER) == ["platter.all"]
+
+    platter = graph.index["platter.all"]
+    assert sorted(graph.names(graph.expand_bundle(platter))) == ["svc.app", "svc.missing", "svc.ui"]
+    assert sorted(graph.names(graph.expand_bundle(platter, optional_kinds=()))) == ["svc.app", "svc.missing"]
+
+
+def test_compiled_graph_round_trips_through_disk(tmp_path: Path) -> None:
+    cache_path = tmp_path / "graph.pickle"
+    compiled = ManifestGraph.compile(CORE, cache_path=cache_path)
+    assert cache_path.exists()
+
+    loaded = ManifestGraph.load(cache_path)
+    assert loaded is not None
+    assert loaded.ids == compiled.ids
+    assert loaded.source_digest == compiled.source_digest
+    assert loaded.requires.to_lists() == compiled.requires.to_lists()
+    assert loaded.preferred_provider("cap.database") == "futomaki.postgres"
+
+
+def test_compile_skips_the_disk_cache_when_disabled(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("SUSHI_MANIFEST_CACHE", "0")
+    cache_path = tmp_path / "graph.pickle"
+    compiled = ManifestGraph.compile(CORE, cache_path=cache_path)
+    assert not cache_path.exists()
+    assert compiled.ids == ManifestGraph.from_manifest_dir(CORE).ids
+
+
+def test_graph_matches_manifest_bundle_membership() -> None:
+    combos = yaml.safe_load((CORE / "combos.yml").read_text(encoding="utf-8"))
+    graph = ManifestGraph.from_manifest_dir(CORE)
+
+    for combo in combos["combos"]:
+        node = graph.index[combo["id"]]
+        assert graph.names(graph.members[node]) == combo["includes"]
+        for service_id in combo["includes"] + combo["optional"]:
+            assert combo["id"] in graph.containing_bundles(service_id, KIND_COMBO)
+
+
+def test_closures_are_memoized_and_reused() -> None:
+    graph = _toy_graph()
+    closures = ClosureIndex(graph)
+
+    assert closures.resolve(["svc.app"]) == {"svc.app", "svc.cache", "svc.lite"}
+    misses = closures.misses
+    assert closures.resolve(["combo.core"]) == {"svc.app", "svc.cache", "svc.lite", "svc.ui"}
+    # The combo expands once; svc.app's closure comes from the memo.
+    assert closures.misses == misses + 2
+    assert closures.hits >= 1
+
+
+def test_update_invalidates_only_ancestors() -> None:
+    graph = _toy_graph()
+    closures = ClosureIndex(graph)
+    closures.resolve(["combo.core", "svc.ui", "svc.pg"])
+
+    closures.update_service("svc.cache", {"requires": ["svc.ui"]})
+    assert graph.index["svc.ui"] in closures._services
+    assert graph.index["svc.pg"] in closures._services
+    assert graph.index["svc.app"] not in closures._services
+    assert closures.resolve(["svc.app"]) == {"svc.app", "svc.cache", "svc.lite", "svc.ui"}
+
+    closures.update_bundle(KIND_COMBO, {"id": "combo.core", "includes": ["svc.pg"]})
+    assert graph.index["svc.app"] in closures._services
+    assert closures.resolve(["combo.core"]) == {"svc.pg"}
+    with pytest.raises(ValueError, match="svc.missing"):
+        closures.resolve(["platter.all"])
+
+
+def test_provider_selection_reuses_selected_and_avoids_conflicts() -> None:
+    graph = _toy_graph()
+    closures = ClosureIndex(graph)
+
+    # svc.pg already provides cap.db, so the default svc.lite is not added next to it
+    assert closures.resolve(["svc.app", "svc.pg"]) == {"svc.app", "svc.cache", "svc.pg"}
+    assert closures.solved == 1
+    assert closures.resolve(["svc.pg", "svc.app"]) == {"svc.app", "svc.cache", "svc.pg"}
+    assert closures.solved == 1
+
+    cap_db = graph.index["cap.db"]
+    pg, lite = graph.index["svc.pg"], graph.index["svc.lite"]
+    assert graph.choose_provider(cap_db, set(), 0) == lite
+    assert graph.choose_provider(cap_db, {pg}, graph.mask_of([pg])) == pg
+
+    graph.replace_service("svc.ui", {"conflicts": ["svc.lite"]})
+    ui = graph.index["svc.ui"]
+    assert graph.choose_provider(cap_db, {ui}, graph.mask_of([ui])) == pg
+    assert set(graph.names(graph.solve([ui, graph.index["svc.app"]]))) == {"svc.app", "svc.cache", "svc.pg", "svc.ui"}
+
+
+def test_catalog_bundles_reuse_selected_database() -> None:
+    graph = ManifestGraph.from_manifest_dir(CORE)
+    closures = ClosureIndex(graph)
+
+    resolved = closures.resolve(["futomaki.supabase", "hosomaki.n8n"])
+    assert "futomaki.supabase" in resolved
+    assert "futomaki.postgres" not in resolved
+    assert closures.resolve(["hosomaki.n8n"]) >= {"futomaki.postgres"}
+
+
+def test_solved_selections_do_not_depend_on_seed_order() -> None:
+    # Whichever capability is chosen first keeps its preferred provider
+    contracts = {
+        "capabilities": {"cap.x": {"providers": ["svc.x1", "svc.x2"]}, "cap.y": {"providers": ["svc.y1", "svc.y2"]}},
+        "services": {
+            "svc.a": {"requires": ["cap.x"]},
+            "svc.b": {"requires": ["cap.y"]},
+            "svc.x1": {"provides": ["cap.x"], "conflicts": ["svc.y1"]},
+            "svc.x2": {"provides": ["cap.x"]},
+            "svc.y1": {"provides": ["cap.y"]},
+            "svc.y2": {"provides": ["cap.y"]},
+        },
+    }
+    graph = ManifestGraph.from_manifests(contracts, {}, {}, {})
+    fresh = [ClosureIndex(graph).resolve(order) for order in (["svc.a", "svc.b"], ["svc.b", "svc.a"])]
+    assert fresh[0] == fresh[1]
+    assert len(fresh[0] & {"svc.x1", "svc.y1"}) == 1
+
+    closures = ClosureIndex(graph)
+    assert closures.resolve(["svc.b", "svc.a"]) == closures.resolve(["svc.a", "svc.b"]) == fresh[0]
+    assert closures.solved == 1
+
+
+def test_incremental_replacement_matches_a_fresh_compile() -> None:
+    graph = _toy_graph()
+    graph.replace_service("svc.cache", {"requires": ["svc.ui", "svc.new"], "provides": ["cap.kv"]})
+    graph.replace_service("svc.app", {"requires": ["cap.db"]})
+    graph.replace_bundle(KIND_COMBO, {"id": "combo.core", "includes": ["svc.app", "svc.cache"]})
+    graph.replace_bundle(KIND_COMBO, {"id": "combo.extra", "includes": ["svc.ui"], "optional": ["svc.new"]})
+
+    contracts = {
+        "capabilities": {"cap.db": {"providers": ["svc.pg", "svc.lite"]}},
+        "services": {
+            "svc.app": {"requires": ["cap.db"]},
+            "svc.cache": {"requires": ["svc.ui", "svc.new"], "provides": ["cap.kv"]},
+            "svc.pg": {"provides": ["cap.db"]},
+            "svc.lite": {"provides": ["cap.db"]},
+            "svc.ui": {},
+            "svc.new": {},
+        },
+        "dependency_resolution": {
+            "default_providers": {"cap.db": "svc.lite"},
+            "conflicts": [{"services": ["svc.pg", "svc.lite"]}],
+        },
+    }
+    combos = {
+        "combos": [
+            {"id": "combo.core", "includes": ["svc.app", "svc.cache"]},
+            {"id": "combo.extra", "includes": ["svc.ui"], "optional": ["svc.new"]},
+        ]
+    }
+    platters = {
+        "platters": [
+            {"id": "platter.all", "combos": ["combo.core"], "additional_services": ["svc.missing"]}
+        ]
+    }
+    fresh = ManifestGraph.from_manifests(contracts, combos, {}, platters)
+
+    def relations(g: ManifestGraph) -> dict:
+        return {
+            name: {g.ids[node]: sorted(g.names(getattr(g, name)[node])) for node in range(len(g))}
+            for name in ("requires", "provides", "members", "optional_members", "providers", "bundles_of", "dependents")
+        }
+
+    named = relations(graph)
+    for name, rows in relations(fresh).items():
+        assert {node_id: row for node_id, row in named[name].items() if node_id in rows} == rows, name
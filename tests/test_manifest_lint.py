@@ -0,0 +1,91 @@
+"""Tests for the whole-catalog manifest linter."""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from manifest_graph import ManifestGraph  # noqa: E402
+from manifest_lint import ERROR, WARNING, lint_graph, lint_manifest_dir, strongly_connected_components  # noqa: E402
+
+CORE = ROOT / "docs" / "manifest" / "core"
+
+
+def _toy_findings():
+    contracts = {
+        "capabilities": {
+            "cap.db": {"providers": ["svc.pg", "svc.lite"]},
+            "cap.queue": {"providers": []},
+            "cap.unused": {},
+        },
+        "services": {
+            # svc.a -> svc.b -> svc.a is a cycle resolution walks into
+            "svc.a": {"requires": ["svc.b"]},
+            "svc.b": {"requires": ["svc.a"]},
+            # svc.app -> cap.db resolves to svc.lite; only svc.pg closes a loop
+            "svc.app": {"requires": ["cap.db"]},
+            "svc.pg": {"provides": ["cap.db"], "requires": ["svc.app"]},
+            "svc.lite": {"provides": ["cap.db"]},
+            "svc.worker": {"requires": ["cap.queue", "svc.gone"]},
+            "svc.ui": {"conflicts": ["svc.app"]},
+        },
+        "dependency_resolution": {
+            "default_providers": {"cap.db": "svc.lite"},
+            "conflicts": [{"services": ["svc.lite", "svc.b"]}, {"services": ["svc.a", "svc.ghost"]}],
+        },
+    }
+    combos = {"combos": [{"id": "combo.core", "includes": ["svc.app", "cap.db"], "optional": ["svc.ui"]}]}
+    platters = {
+        "platters": [
+            {"id": "platter.all", "combos": ["combo.core"], "additional_services": ["svc.a", "svc.missing"]}
+        ]
+    }
+    graph = ManifestGraph.from_manifests(contracts, combos, {}, platters)
+    return {(finding.code, finding.severity, finding.subject): finding for finding in lint_graph(graph)}
+
+
+def test_strongly_connected_components_come_out_sinks_first() -> None:
+    edges = [[1], [2], [1, 3], [], [4]]
+    components = strongly_connected_components(edges)
+
+    assert sorted(map(sorted, components)) == [[0], [1, 2], [3], [4]]
+    order = [sorted(component) for component in components]
+    assert order.index([3]) < order.index([1, 2]) < order.index([0])
+
+
+def test_linter_reports_every_problem_in_one_pass() -> None:
+    findings = _toy_findings()
+
+    assert set(findings) == {
+        ("dependency-cycle", ERROR, "svc.a"),
+        ("dependency-cycle", WARNING, "svc.app"),
+        ("unresolved-requirement", ERROR, "svc.worker"),
+        ("capability-without-provider", ERROR, "cap.queue"),
+        ("capability-without-provider", WARNING, "cap.unused"),
+        ("missing-bundle-member", ERROR, "combo.core"),
+        ("missing-bundle-member", ERROR, "platter.all"),
+        ("platter-conflict", ERROR, "platter.all"),
+        ("platter-conflict", WARNING, "platter.all"),
+        ("unknown-conflict-service", WARNING, "svc.ghost"),
+    }
+    assert findings[("dependency-cycle", WARNING, "svc.app")].related == ("svc.app", "svc.pg")
+    assert findings[("capability-without-provider", ERROR, "cap.queue")].related == ("svc.worker",)
+    assert findings[("missing-bundle-member", ERROR, "platter.all")].related == ("svc.missing",)
+    # svc.app resolves cap.db to svc.lite, which conflicts with svc.b (pulled in by svc.a)
+    assert findings[("platter-conflict", ERROR, "platter.all")].related == ("svc.b", "svc.lite")
+    assert findings[("platter-conflict", WARNING, "platter.all")].related == ("svc.app", "svc.ui")
+
+
+def test_core_catalog_lints_quickly_without_structural_errors() -> None:
+    started = time.perf_counter()
+    findings = lint_manifest_dir(CORE)
+    assert time.perf_counter() - started < 1.0
+
+    # Platter conflicts are catalog decisions; everything else must stay clean
+    assert [finding for finding in findings if finding.severity == ERROR and finding.code != "platter-conflict"] == []
+    assert all(finding.to_dict()["related"] for finding in findings if finding.code == "platter-conflict")
@@ -0,0 +1,64 @@
+"""Tests for the cached manifest loader."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from manifest_loader import ManifestLoader  # noqa: E402
+
+
+def test_disk_cache_is_reused_and_invalidated_by_content(tmp_path: Path) -> None:
+    manifest = tmp_path / "contracts.yml"
+    manifest.write_text("services:\n  svc.a:\n    requires: [cap.db]\n", encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    first = ManifestLoader(cache_dir, use_disk_cache=True)
+    assert first.load(manifest) == {"services": {"svc.a": {"requires": ["cap.db"]}}}
+    assert first.stats.parsed == 1
+
+    second = ManifestLoader(cache_dir, use_disk_cache=True)
+    loaded = second.load(manifest)
+    assert loaded == {"services": {"svc.a": {"requires": ["cap.db"]}}}
+    assert (second.stats.parsed, second.stats.disk_hits) == (0, 1)
+
+    # Callers get independent copies from the in-memory layer.
+    loaded["services"].clear()
+    assert second.load(manifest)["services"]
+    assert second.stats.memory_hits == 1
+
+    manifest.write_text("services: {}\n", encoding="utf-8")
+    assert ManifestLoader(cache_dir, use_disk_cache=True).load(manifest) == {"services": {}}
+
+
+def test_all_documents_and_disabled_cache(tmp_path: Path) -> None:
+    manifest = tmp_path / "menu.md"
+    manifest.write_text("a: 1\n---\nb: 2\n", encoding="utf-8")
+    loader = ManifestLoader(tmp_path / "cache", use_disk_cache=False)
+
+    assert loader.load(manifest, all_documents=True) == [{"a": 1}, {"b": 2}]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_memory_keeps_only_the_latest_version_of_each_file(tmp_path: Path) -> None:
+    manifest = tmp_path / "combos.yml"
+    loader = ManifestLoader(tmp_path / "cache", use_disk_cache=False)
+
+    for version in range(5):
+        manifest.write_text(f"version: {version}\n", encoding="utf-8")
+        assert loader.load(manifest) == {"version": version}
+    assert loader.load(manifest, all_documents=True) == [{"version": 4}]
+    assert len(loader._memory) == 2
+
+    assert loader.load(manifest) == {"version": 4}
+    assert (loader.stats.parsed, loader.stats.memory_hits) == (6, 1)
+
+    # An older version is parsed again rather than served from memory
+    manifest.write_text("version: 0\n", encoding="utf-8")
+    assert loader.load(manifest) == {"version": 0}
+    assert loader.stats.parsed == 7
+    assert len(loader._memory) == 2
@@ -0,0 +1,93 @@
+"""Tests for the network profile stage (scripts/generate-network-config.py)."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from manifest_loader import load_manifest  # noqa: E402
+
+GENERATOR_PATH = ROOT / "scripts" / "generate-network-config.py"
+CORE = ROOT / "docs" / "manifest" / "core"
+
+
+def load_generator_module():
+    spec = importlib.util.spec_from_file_location("network_config", GENERATOR_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Unable to load network config generator")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    ("port", "expected"),
+    [
+        ("8080:80", [8080, 80]),
+        ("${WEB_PORT:-13000}:3000", [13000, 3000]),
+        ("127.0.0.1:8443:443/tcp", [8443, 443]),
+        (8080, [8080]),
+        ({"target": 80, "published": "8081"}, [80, 8081]),
+    ],
+)
+def test_port_numbers_parses_compose_port_syntax(port, expected) -> None:
+    assert load_generator_module().port_numbers(port) == expected
+
+
+def test_builtin_profiles_classify_by_name_and_exact_port() -> None:
+    module = load_generator_module()
+    compose = {
+        "services": {
+            "postgres": {},
+            "prometheus": {},
+            "proxy": {"ports": ["${PROXY_PORT:-8443}:443"]},
+            # Substring matches of 80/3000 used to make these web-facing
+            "api": {"ports": ["8080:8080"]},
+            "worker": {"ports": ["13000:13000"]},
+        }
+    }
+    result = module.NetworkConfigGenerator().generate(compose, "inari")
+
+    assert set(result["networks"]) == {"sushi_web_tier", "sushi_app_tier", "sushi_data_tier", "sushi_mgmt_tier"}
+    networks = {name: service["networks"] for name, service in result["services"].items()}
+    assert networks == {
+        "postgres": ["sushi_data_tier"],
+        "prometheus": ["sushi_mgmt_tier", "sushi_app_tier"],
+        "proxy": ["sushi_web_tier", "sushi_app_tier"],
+        "api": ["sushi_app_tier"],
+        "worker": ["sushi_app_tier"],
+    }
+
+
+def test_manifest_profiles_follow_contract_assignments() -> None:
+    module = load_generator_module()
+    generator = module.NetworkConfigGenerator.from_manifests(CORE)
+    contracts = load_manifest(CORE / "contracts.yml")
+
+    assert {"chirashi", "temaki", "inari", "business-confidential", "legal-privilege", "open-research"} <= set(
+        generator.profiles
+    )
+    compose = {"services": {"postgres": {}, "caddy": {}, "unknown-sidecar": {"ports": ["9999:9999"]}}}
+    for profile in ("chirashi", "temaki", "inari"):
+        result = generator.generate({"services": {k: dict(v) for k, v in compose["services"].items()}}, profile)
+        assert result["networks"] == contracts["network_profiles"][profile]["networks"]
+        services = result["services"]
+        assert services["postgres"]["networks"] == contracts["services"]["futomaki.postgres"]["networks"][profile]
+        assert services["caddy"]["networks"] == contracts["services"]["hosomaki.caddy"]["networks"][profile]
+        # Services the contracts do not place stay on defined, internal-only networks
+        for network in services["unknown-sidecar"]["networks"]:
+            assert result["networks"][network].get("internal", profile == "chirashi")
+
+    template = generator.generate({"services": {"redis": {}}}, "legal-privilege")
+    assert template["services"]["redis"]["networks"] == ["sushi_storage", "sushi_audit"]
+
+    with pytest.raises(ValueError, match="Unknown profile"):
+        generator.generate({"services": {}}, "missing")
@@ -0,0 +1,110 @@
+"""Tests for host port conflict detection (sushi-kitchen-api/app/port_allocation.py)."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = ROOT / "sushi-kitchen-api"
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from app.port_allocation import check_ports, collect_bindings, find_conflicts, parse_port_entry  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    ("entry", "expected"),
+    [
+        ("8080:80", ("", 8080, 8080, "tcp", None, False)),
+        ("${WEB_PORT:-13000}:3000", ("", 13000, 13000, "tcp", "WEB_PORT", False)),
+        ("127.0.0.1:5432:5432", ("127.0.0.1", 5432, 5432, "tcp", None, False)),
+        ("[::1]:9000-9002:9000-9002/udp", ("::1", 9000, 9002, "udp", None, False)),
+        ("7000-7010:80", ("", 7000, 7010, "tcp", None, True)),
+        ({"target": 80, "published": "8081", "protocol": "udp", "host_ip": "10.0.0.5"},
+         ("10.0.0.5", 8081, 8081, "udp", None, False)),
+    ],
+)
+def test_port_entries_parse_into_host_intervals(entry, expected) -> None:
+    (binding,) = parse_port_entry("svc", entry)
+    assert (binding.host_ip, binding.start, binding.end, binding.protocol, binding.variable, binding.flexible) == expected
+
+
+def test_unpublished_and_unparseable_entries() -> None:
+    assert parse_port_entry("svc", "80") == []
+    assert parse_port_entry("svc", {"target": 80}) == []
+    bindings, problems = collect_bindings({"a": {"ports": ["${PORT}:80", "70000:80", "9000-9001:80-82"]}})
+    assert bindings == []
+    assert len(problems) == 3
+
+
+def test_overlapping_ranges_conflict_per_protocol() -> None:
+    services = {
+        "api": {"ports": ["8000-8010:8000-8010"]},
+        "web": {"ports": ["8005:80"]},
+        # Same number over udp does not clash with tcp
+        "dns": {"ports": ["8005:53/udp"]},
+        "after": {"ports": ["8011:80"]},
+    }
+    conflicts = find_conflicts(collect_bindings(services)[0])
+
+    assert [(c.first.service, c.second.service, c.start, c.end) for c in conflicts] == [("api", "web", 8005, 8005)]
+    assert not conflicts[0].potential
+
+
+def test_host_ip_scopes_bindings() -> None:
+    services = {
+        "local": {"ports": ["127.0.0.1:8080:80"]},
+        "lan": {"ports": ["10.0.0.5:8080:80"]},
+    }
+    assert check_ports(services)["errors"] == []
+
+    services["any"] = {"ports": ["8080:8080"]}
+    errors = check_ports(services)["errors"]
+    assert len(errors) == 2
+    assert all("'any'" in error for error in errors)
+
+
+def test_flexible_ranges_are_potential_conflicts() -> None:
+    report = check_ports({"pool": {"ports": ["9000-9005:80"]}, "fixed": {"ports": ["9003:9003"]}})
+    assert report["errors"] == []
+    assert report["warnings"] and report["warnings"][0].startswith("Potential port conflict on 9003/tcp")
+
+
+def test_suggestions_skip_every_published_port() -> None:
+    services = {
+        "a": {"ports": ["${A_PORT:-8080}:80"]},
+        "b": {"ports": ["${B_PORT:-8080}:80"]},
+        "c": {"ports": ["8081:81", "[::1]:8082:82"]},
+        "d": {"ports": ["8080:80/udp"]},
+    }
+    report = check_ports(services, suggest=True)
+
+    assert len(report["errors"]) == 1
+    assert report["suggestions"] == [
+        {"service": "b", "port": "${B_PORT:-8080}:80", "suggested": "${B_PORT:-8083}:80", "host_port": 8083}
+    ]
+
+
+def test_validate_configuration_reports_port_conflicts() -> None:
+    pytest.importorskip("prometheus_client")
+    from app.orchestrators.manifest_orchestrator import ManifestOrchestrator
+
+    orchestrator = ManifestOrchestrator(str(ROOT), engine="subprocess")
+    compose = {
+        "services": {
+            "tgi": {"ports": ["8080:80"], "networks": ["sushi_net"]},
+            "vscode-server": {"ports": ["8080:8080"], "networks": ["sushi_net"]},
+        },
+        "networks": {"sushi_net": {}},
+    }
+    result = asyncio.run(orchestrator.validate_configuration(compose, suggest_ports=True))
+
+    assert result["valid"] is False
+    assert result["errors"] == [
+        "Port conflict on 8080/tcp: 'tgi' (8080:80) and 'vscode-server' (8080:8080)"
+    ]
+    assert result["port_suggestions"][0]["suggested"] == "8081:8080"
@@ -0,0 +1,97 @@
+"""Tests for budget-aware resolution (resource_budget.py)."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from generate_compose import ManifestResolver  # noqa: E402
+from resource_budget import HostBudget  # noqa: E402
+
+
+def _resolver(prefer_lightweight: bool = True) -> ManifestResolver:
+    contracts = {
+        "capabilities": {"cap.db": {"providers": ["svc.big-db", "svc.small-db"]}, "cap.llm": {}},
+        "services": {
+            "svc.app": {
+                "requires": ["cap.db", "cap.llm"],
+                "resource_requirements": {"cpu_cores": 1, "memory_mb": 512, "storage_gb": 1},
+            },
+            "svc.big-db": {
+                "provides": ["cap.db"],
+                "resource_requirements": {"cpu_cores": 2, "memory_mb": 4096, "storage_gb": 100},
+            },
+            "svc.small-db": {
+                "provides": ["cap.db"],
+                "resource_requirements": {"cpu_cores": 1, "memory_mb": 1024, "storage_gb": 10},
+            },
+            # The GPU rule marks svc.gpu-llm even though it declares no VRAM
+            "svc.gpu-llm": {"provides": ["cap.llm"], "resource_requirements": {"cpu_cores": 1, "memory_mb": 1024}},
+            "svc.cpu-llm": {"provides": ["cap.llm"], "resource_requirements": {"cpu_cores": 2, "memory_mb": 4096}},
+        },
+        "dependency_resolution": {
+            "prefer_lightweight": prefer_lightweight,
+            "default_providers": {"cap.db": "svc.big-db", "cap.llm": "svc.gpu-llm"},
+            "scaling_rules": {"gpu-services": {"services": ["svc.gpu-llm"]}},
+        },
+    }
+    platters = {
+        "platters": [
+            {
+                "id": "platter.app",
+                "additional_services": ["svc.app"],
+                "resource_requirements": {"cpu_cores": 8, "memory_gb": 4, "gpu_vram_gb": 8, "gpu_required": True},
+            }
+        ]
+    }
+    return ManifestResolver(contracts, {}, {}, platters, {}, {})
+
+
+def test_budget_parses_units() -> None:
+    assert HostBudget.parse("cpu=4, memory=8G, disk=1T, vram=512") == HostBudget(4, 8192, 1024, 512)
+    assert HostBudget.parse("ram=2048,storage=500M") == HostBudget(memory_mb=2048, storage_gb=500 / 1024)
+    assert HostBudget.from_platter({"cpu_cores": 2, "memory_gb": 4, "gpu_vram_gb": 0}) == HostBudget(2, 4096, None, 0)
+    for text in ("cpu=4G", "gpu", "memory=lots", "network=1G"):
+        with pytest.raises(ValueError):
+            HostBudget.parse(text)
+
+
+def test_budget_picks_cheapest_providers_that_fit() -> None:
+    resolver = _resolver()
+    assert resolver.resolve_services(["svc.app"]) == ["svc.app", "svc.big-db", "svc.gpu-llm"]
+
+    services, report = resolver.resolve_within_budget(["platter.app"], HostBudget.parse("cpu=4,memory=6G,vram=0"))
+    assert services == ["svc.app", "svc.cpu-llm", "svc.small-db"]
+    assert report.fits
+    assert report.used == {"cpu_cores": 4, "memory_mb": 5632, "storage_gb": 11, "gpu_memory_mb": 0}
+    assert report.headroom == {"cpu_cores": 0, "memory_mb": 512, "storage_gb": None, "gpu_memory_mb": 0}
+    assert report.warnings == (
+        "platter.app declares cpu_cores 8 cores > 4 cores",
+        "platter.app declares gpu_memory_mb 8192 MB > 0 MB",
+        "platter.app requires a GPU",
+    )
+
+
+def test_budget_report_says_by_how_much_it_is_exceeded() -> None:
+    # Without prefer_lightweight the preferred provider stays unless it cannot fit
+    resolver = _resolver(prefer_lightweight=False)
+    services, report = resolver.resolve_within_budget(["svc.app"], HostBudget.parse("cpu=3,memory=4G,vram=0"))
+
+    assert services == ["svc.app", "svc.big-db", "svc.cpu-llm"]
+    assert not report.fits
+    assert report.headroom["cpu_cores"] == -2
+    assert report.problems == (
+        "Needs 5 cores of cpu_cores but the budget has 3 cores (2 over)",
+        "Needs 8704 MB of memory_mb but the budget has 4096 MB (4608 over)",
+    )
+    assert report.to_dict()["fits"] is False
+
+    _, report = resolver.resolve_within_budget(["svc.app", "svc.gpu-llm"], HostBudget(gpu_memory_mb=0))
+    assert report.gpu_services == ("svc.gpu-llm",)
+    assert report.problems == ("GPU services need VRAM but the budget has none: svc.gpu-llm",)
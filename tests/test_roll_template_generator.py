@@ -1,6 +1,8 @@
 import importlib.util
+import sys
 from pathlib import Path
 
+import pytest
 import yaml
 
 
@@ -12,6 +14,8 @@ def load_generator_module():
     if spec is None or spec.loader is None:
         raise RuntimeError("Unable to load roll generator module")
     module = importlib.util.module_from_spec(spec)
+    # dataclasses resolves string annotations through sys.modules
+    sys.modules[spec.name] = module
     spec.loader.exec_module(module)
     return module
 
@@ -74,22 +78,6 @@ def test_generate_roll_body_highlights_related_services(tmp_path):
     assert len(related_lines) >= 3
     assert "## ⚙️ Deployment checklist" in body
     assert "generate_compose.py" in body
-=======
-"""Tests for the roll narrative template generator."""
-
-from __future__ import annotations
-
-import sys
-from pathlib import Path
-
-import pytest
-
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
-
-from docs.manifest.narratives.rolls.generate_roll import RollTemplateGenerator
-
 
 @pytest.mark.parametrize(
     ("roll_id", "expected_service_key", "unexpected_prefix"),
@@ -99,16 +87,18 @@ from docs.manifest.narratives.rolls.generate_roll import RollTemplateGenerator
     ],
 )
 def test_integration_snippet_uses_compose_service_key(
-    roll_id: str, expected_service_key: str, unexpected_prefix: str
+    tmp_path, roll_id: str, expected_service_key: str, unexpected_prefix: str
 ) -> None:
     """Ensure configuration snippets render Docker Compose keys correctly."""
 
-    generator = RollTemplateGenerator(roll_id)
-    integration_notes = generator._integration_metadata()
+    module = load_generator_module()
+    output_path = module.RollTemplateGenerator().write_roll(roll_id, tmp_path)
+    front_matter, _ = extract_front_matter(output_path.read_text(encoding="utf-8"))
 
-    snippets = integration_notes["configuration_snippets"]
+    snippets = front_matter["integration_notes"]["configuration_snippets"]
     assert snippets, "Expected at least one configuration snippet"
 
     example = snippets[0]["example"]
     assert f"  {expected_service_key}:" in example
-    assert unexpected_prefix not in example
+    assert all(unexpected_prefix not in snippet["example"] for snippet in snippets)
+    assert all(f"  {roll_id}:" not in snippet["example"] for snippet in snippets)
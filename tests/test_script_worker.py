@@ -0,0 +1,61 @@
+"""Tests for the JSON-lines worker mode of the command-line scripts."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from script_worker import run_call  # noqa: E402
+
+CORE = ROOT / "docs" / "manifest" / "core"
+
+
+def test_run_call_maps_exits_to_return_codes() -> None:
+    def main(argv):
+        print("out", argv)
+        if argv == ["message"]:
+            raise SystemExit("boom")
+        if argv == ["fail"]:
+            raise ValueError("bad")
+        return 3 if argv else None
+
+    assert run_call(main, []) == {"returncode": 0, "stdout": "out []\n", "stderr": ""}
+    assert run_call(main, ["x"])["returncode"] == 3
+    assert run_call(main, ["message"])["stderr"] == "boom\n"
+    failed = run_call(main, ["fail"])
+    assert failed["returncode"] == 1 and "ValueError: bad" in failed["stderr"]
+
+
+def test_worker_serves_calls_like_separate_runs(tmp_path: Path) -> None:
+    script = ROOT / "scripts" / "generate-compose.py"
+    argv = ["--platter=platter.hosomaki-core", "--manifest-dir", str(CORE)]
+    single = subprocess.run([sys.executable, str(script), *argv], capture_output=True, text=True, check=True)
+
+    requests = [
+        {"id": 1, "argv": argv},
+        {"id": 2, "argv": ["--platter=platter.unknown", "--manifest-dir", str(CORE)]},
+        {"id": 3, "argv": argv},
+    ]
+    worker = subprocess.run(
+        [sys.executable, str(script), "--worker"],
+        input="".join(json.dumps(request) + "\n" for request in requests),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = [json.loads(line) for line in worker.stdout.splitlines()]
+
+    assert lines[0]["ready"] is True and lines[0]["script"] == "generate-compose.py"
+    responses = lines[1:]
+    assert [response["id"] for response in responses] == [1, 2, 3]
+    assert responses[0]["returncode"] == 0
+    assert responses[0]["stdout"] == single.stdout
+    assert responses[0]["stderr"] == single.stderr
+    assert responses[1]["returncode"] == 1 and "not found" in responses[1]["stderr"]
+    assert responses[2] == {**responses[0], "id": 3}
@@ -0,0 +1,57 @@
+"""Cold-start budget for the generator CLIs (see benchmarks/startup.py)."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+STARTUP_PATH = ROOT / "benchmarks" / "startup.py"
+
+
+def load_startup_module():
+    spec = importlib.util.spec_from_file_location("startup_benchmark", STARTUP_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Unable to load the start-up benchmark")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+startup = load_startup_module()
+
+
+def test_importtime_output_is_parsed_per_module() -> None:
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _json",
+            "import time:       880 |       1000 | json",
+        ]
+    )
+    profile = startup.ImportProfile.parse(stderr, 0)
+    baseline = startup.ImportProfile({"_json": 100}, 0)
+    assert profile.added(baseline) == {"json": 880}
+
+
+def test_timing_ceilings_are_opt_in() -> None:
+    result = {"modules": ["json"], "import_ms": 50.0}
+    budget = {"forbidden": ["json"], "max_import_ms": 10.0}
+    assert startup.check("cli", result, budget, timing=False) == ["cli: imports json at start-up"]
+    assert len(startup.check("cli", result, budget)) == 2
+
+
+@pytest.mark.parametrize("name", sorted(startup.ENTRY_POINTS))
+def test_entry_point_within_startup_budget(name: str) -> None:
+    """Forbidden imports always; ms ceilings only with SUSHI_STARTUP_BUDGET=1."""
+    argv = startup.ENTRY_POINTS[name]
+    if not startup.compiles(ROOT / argv[0]):
+        pytest.skip(f"{argv[0]} does not compile")
+    timing = startup.timing_enabled()
+    result = startup.measure(argv, runs=5 if timing else 1)
+    budget = startup.load_budget()[name]
+    assert startup.check(name, result, budget, startup.budget_scale(), timing=timing) == []
@@ -0,0 +1,72 @@
+"""Tests for the synthetic manifest generator."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from generate_compose import ManifestResolver  # noqa: E402
+
+GENERATOR_PATH = ROOT / "scripts" / "generate-synthetic-manifests.py"
+
+
+def load_generator_module():
+    spec = importlib.util.spec_from_file_location("synthetic_manifests", GENERATOR_PATH)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Unable to load synthetic manifest generator")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_catalog_shape_is_deterministic_and_has_requested_cycles() -> None:
+    module = load_generator_module()
+    spec = module.SyntheticSpec(
+        services=60, capability_fanout=2, dependency_depth=3, cycles=2,
+        combos=6, bundle_depth=3, bentos=2, platters=2, seed=7,
+    )
+    documents = module.generate_catalog(spec)
+    assert documents == module.generate_catalog(spec)
+
+    contracts = documents["contracts.yml"]
+    assert len(contracts["services"]) == 60
+    assert all(len(cap["providers"]) <= 2 for cap in contracts["capabilities"].values())
+
+    combos = {combo["id"]: combo for combo in documents["combos.yml"]["combos"]}
+    nested = [combo for combo in combos.values() if any(ref in combos for ref in combo["includes"])]
+    assert nested
+
+    # A leaf that requires a top-layer capability pulls in the whole chain.
+    top_layer_caps = {cap for cap in contracts["capabilities"] if cap.startswith("cap.syn-c-")}
+    cyclic = [
+        service_id
+        for service_id, contract in contracts["services"].items()
+        if contract["provides"][0].startswith("cap.syn-a-") and set(contract.get("requires", [])) & top_layer_caps
+    ]
+    assert len(cyclic) == 2
+    resolver = ManifestResolver(
+        contracts, documents["combos.yml"], documents["bento-box.yml"], documents["platters.yml"], {}, {}
+    )
+    resolved = resolver.resolve_services([cyclic[0]])
+    assert cyclic[0] in resolved
+    assert {contracts["services"][service]["provides"][0][:10] for service in resolved} == {
+        "cap.syn-a-", "cap.syn-b-", "cap.syn-c-"
+    }
+
+
+def test_catalog_validates_against_schemas() -> None:
+    pytest.importorskip("jsonschema")
+    module = load_generator_module()
+    documents = module.generate_catalog(module.SyntheticSpec(services=200, cycles=3))
+    assert module.validate_catalog(documents, module.SCHEMA_DIR) == []
+
+    too_many = module.generate_catalog(module.SyntheticSpec(services=200, combos=51))
+    assert any(error.startswith("combos.yml") for error in module.validate_catalog(too_many, module.SCHEMA_DIR))